@@ -0,0 +1,118 @@
+"""
+CAMPOS ESPARSOS (?fields=)
+
+PESSOA 2 EXPLICA:
+- O cliente escolhe os campos: /api/movies/?fields=id,titulo,poster
+- O MESMO conjunto de campos decide:
+    * o que o serializer devolve (o JSON fica menor)
+    * quais colunas o banco lê (.only(): o SELECT fica menor)
+- Sem ?fields= vale a lista do próprio serializer
+  (MovieListSerializer nunca lê sinopse, backdrop nem elenco)
+- Campos desconhecidos são ignorados; nenhum conhecido → todos
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+
+PARAMETRO = 'fields'
+
+
+def campos_pedidos(request):
+    """
+    ?fields=id,titulo → ['id', 'titulo'] (ou None se não veio)
+    """
+    if request is None:
+        return None
+    valor = request.GET.get(PARAMETRO)
+    if not valor:
+        return None
+    return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+
+class CamposDinamicosMixin:
+    """
+    Serializer que aceita campos=[...] (ou lê ?fields= do request no context)
+
+    Uso: MovieSerializer(filmes, many=True, campos=['id', 'titulo'])
+    """
+
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is None:
+            campos = campos_pedidos(self.context.get('request'))
+        if campos:
+            escolhidos = set(campos) & set(self.fields)
+            if escolhidos:
+                for nome in set(self.fields) - escolhidos:
+                    self.fields.pop(nome)
+
+
+def colunas(serializer, model, extras=(), relacionados=()):
+    """
+    Colunas do model que o serializer realmente lê (para .only())
+
+    - Campo com source 'poster' → coluna poster
+    - Campo com source 'filme.titulo' → coluna filme (a FK)
+      e, se 'filme' estiver em relacionados (select_related),
+      só a coluna titulo do filme (filme__titulo)
+    - source='*' ou métodos → ignorados
+    extras: campos que precisam vir mesmo assim (ex.: os da ordenação);
+    'filme__titulo' entra como está (exige select_related('filme'))
+    """
+    nomes = {model._meta.pk.name}
+    nomes.update(e for e in extras if '__' in e)
+    extras = [e for e in extras if '__' not in e]
+    fontes = [campo.source for campo in serializer.fields.values()] + [e.lstrip('-') for e in extras]
+    for fonte in fontes:
+        if not fonte or fonte == '*':
+            continue
+        nome = fonte.split('.')[0].split('__')[0]
+        if '.' in fonte and nome in relacionados:
+            nomes.add(fonte.replace('.', '__'))
+        if nome == 'pk':
+            continue
+        try:
+            campo = model._meta.get_field(nome)
+        except FieldDoesNotExist:
+            continue
+        if campo.concrete:
+            nomes.add(campo.name)
+    return sorted(nomes)
+
+
+def projetar(queryset, serializer, extras=()):
+    """
+    queryset.only(...) com as colunas do serializer + extras
+
+    A ordenação do queryset/model entra sempre (a paginação por
+    cursor lê esses valores de cada item). Relações com select_related
+    trazem só as colunas usadas (sem N+1 e sem a linha inteira)
+    """
+    ordenacao = list(queryset.query.order_by or queryset.model._meta.ordering)
+    relacionados = queryset.query.select_related
+    relacionados = list(relacionados) if isinstance(relacionados, dict) else []
+    nomes = colunas(serializer, queryset.model, [*extras, *ordenacao], relacionados)
+
+    # Relação que nenhum campo pedido usa sai do JOIN
+    usados = {nome.split('__')[0] for nome in nomes if '__' in nome}
+    if set(relacionados) - usados:
+        queryset = queryset.select_related(None)
+        if usados:
+            queryset = queryset.select_related(*usados)
+    return queryset.only(*nomes)
+
+
+class CamposEsparsosMixin:
+    """
+    Para views genéricas do DRF: ?fields= vale para o serializer E o queryset
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer()
+        if hasattr(self, 'get_ordering'):
+            ordering = self.get_ordering() or ()
+        else:
+            ordering = getattr(self, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        return projetar(queryset, serializer, ordering)
@@ -0,0 +1,184 @@
+"""
+INSTRUMENTAÇÃO DAS REQUISIÇÕES (SQL + tempos)
+
+PESSOA 2 EXPLICA:
+- Conta e cronometra cada consulta SQL da requisição
+  (connection.execute_wrapper: o Django chama a nossa função em volta
+  de cada execute, sem mexer nas views)
+- Manda o header Server-Timing (aparece no DevTools do navegador):
+    Server-Timing: db;dur=12.3;desc="5 queries", serialize;dur=4.0, view;dur=20.1, render;dur=3.2, total;dur=24.0
+    * db: tempo somado das consultas
+    * serialize: serializer.data (objetos → dicts), inclusive as
+      consultas feitas durante (QuerySet lido pelo serializer)
+    * view: a view inteira (inclui o db e o serialize)
+    * render: os dicts virando JSON (depois que a view retorna)
+    Resposta vinda do cache não serializa: sem "serialize"
+- Requisição lenta (> INSTRUMENTACAO_LENTO_MS) → log com as
+  consultas mais demoradas
+- A MESMA consulta (mesmo formato, parâmetros diferentes) repetida
+  várias vezes numa requisição → log de "provável N+1"
+  (ex.: um SELECT do filme para cada review da lista)
+
+Custo: só as requisições sorteadas (INSTRUMENTACAO_AMOSTRA, de 0 a 1)
+são medidas; as outras pagam um random()
+"""
+
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('streamflix.sql')
+
+# "IN (%s, %s, %s)" e "IN (%s)" têm o mesmo formato
+PLACEHOLDERS_RE = re.compile(r'%s(?:\s*,\s*%s)+')
+NUMEROS_RE = re.compile(r'\b\d+\b')
+
+CONSULTAS_NO_LOG = 3
+TAMANHO_SQL_NO_LOG = 300
+
+# Medicao da requisição em andamento (os serializers não recebem
+# sempre o request no context)
+medicao_atual = ContextVar('medicao_atual', default=None)
+
+
+def formato(sql):
+    """
+    SQL sem os valores: consultas iguais a menos dos parâmetros
+    caem no mesmo formato
+    """
+    return NUMEROS_RE.sub('N', PLACEHOLDERS_RE.sub('%s', sql))
+
+
+class Medicao:
+    """
+    Consultas e marcas de tempo de UMA requisição
+    """
+
+    def __init__(self):
+        self.consultas = []
+        self.inicio = time.perf_counter()
+        self.fim_da_view = None
+        self.serializacao = None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append((sql, time.perf_counter() - inicio))
+
+    def tempo_db(self):
+        return sum(duracao for _, duracao in self.consultas)
+
+    def repetidas(self, limite):
+        """
+        [(formato, vezes)] dos formatos repetidos >= limite vezes
+        """
+        contagem = Counter(formato(sql) for sql, _ in self.consultas)
+        return [(sql, vezes) for sql, vezes in contagem.most_common() if vezes >= limite]
+
+    def mais_lentas(self, quantidade=CONSULTAS_NO_LOG):
+        return sorted(self.consultas, key=lambda consulta: consulta[1], reverse=True)[:quantidade]
+
+
+class SerializacaoMedidaMixin:
+    """
+    Serializer que soma o tempo do .data na Medicao da requisição
+
+    Vai nos serializers de saída e no ListaRapidaSerializer (many=True
+    chama o to_representation do filho, não o .data: nada conta duas vezes)
+    """
+
+    @property
+    def data(self):
+        medicao = medicao_atual.get()
+        if medicao is None:
+            return super().data
+        inicio = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            medicao.serializacao = (medicao.serializacao or 0.0) + time.perf_counter() - inicio
+
+
+class InstrumentacaoMiddleware:
+    """
+    Middleware: Server-Timing + log de lentas + detector de N+1
+
+    Configuração (settings):
+        INSTRUMENTACAO_AMOSTRA     fração das requisições medidas (0 a 1)
+        INSTRUMENTACAO_LENTO_MS    a partir de quanto a requisição é "lenta"
+        INSTRUMENTACAO_N_MAIS_UM   repetições do mesmo formato para avisar
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        amostra = getattr(settings, 'INSTRUMENTACAO_AMOSTRA', 1.0)
+        if amostra <= 0 or (amostra < 1 and random.random() >= amostra):
+            return self.get_response(request)
+
+        medicao = Medicao()
+        request._medicao_sql = medicao
+        token = medicao_atual.set(medicao)
+        try:
+            with ExitStack() as pilha:
+                for alias in connections:
+                    pilha.enter_context(connections[alias].execute_wrapper(medicao))
+                response = self.get_response(request)
+        finally:
+            medicao_atual.reset(token)
+        fim = time.perf_counter()
+
+        self.registrar(request, response, medicao, fim)
+        return response
+
+    def process_template_response(self, request, response):
+        # Chamado quando a view já retornou e antes do render()
+        medicao = getattr(request, '_medicao_sql', None)
+        if medicao is not None:
+            medicao.fim_da_view = time.perf_counter()
+        return response
+
+    def registrar(self, request, response, medicao, fim):
+        total_ms = (fim - medicao.inicio) * 1000
+        db_ms = medicao.tempo_db() * 1000
+        quantidade = len(medicao.consultas)
+
+        metricas = [f'db;dur={db_ms:.1f};desc="{quantidade} queries"']
+        if medicao.serializacao is not None:
+            metricas.append(f'serialize;dur={medicao.serializacao * 1000:.1f}')
+        if medicao.fim_da_view is not None:
+            view_ms = (medicao.fim_da_view - medicao.inicio) * 1000
+            metricas.append(f'view;dur={view_ms:.1f}')
+            metricas.append(f'render;dur={total_ms - view_ms:.1f}')
+        metricas.append(f'total;dur={total_ms:.1f}')
+
+        repetidas = medicao.repetidas(getattr(settings, 'INSTRUMENTACAO_N_MAIS_UM', 5))
+        if repetidas:
+            sql, vezes = repetidas[0]
+            metricas.append(f'nmais1;desc="{vezes}x a mesma consulta"')
+            logger.warning(
+                'Provável N+1 em %s %s: %d consultas com o mesmo formato: %s',
+                request.method, request.path, vezes, sql[:TAMANHO_SQL_NO_LOG],
+            )
+
+        response['Server-Timing'] = ', '.join(metricas)
+
+        if total_ms >= getattr(settings, 'INSTRUMENTACAO_LENTO_MS', 500):
+            lentas = '\n'.join(
+                f'  {duracao * 1000:.1f}ms  {sql[:TAMANHO_SQL_NO_LOG]}'
+                for sql, duracao in medicao.mais_lentas()
+            )
+            logger.warning(
+                'Requisição lenta: %s %s %.1fms (db %.1fms em %d consultas)\n%s',
+                request.method, request.path, total_ms, db_ms, quantidade, lentas,
+            )
@@ -0,0 +1,180 @@
+"""
+MÉTRICAS (/metrics no formato do Prometheus)
+
+PESSOA 2 EXPLICA:
+- Cada requisição soma nos contadores/histogramas, por ROTA
+  (o name= do urls.py: movie-list, movie-reviews, ...):
+    * streamflix_http_requests_total{rota, metodo, status}
+    * streamflix_http_request_duration_seconds{rota, metodo}  (histograma)
+    * streamflix_http_response_size_bytes{rota}                (histograma)
+    * streamflix_db_queries_per_request{rota}                  (histograma)
+    * streamflix_db_duration_seconds{rota}                     (histograma)
+- Banco: streamflix_db_connections_total{alias, tipo}
+    tipo="aberta" (conexão nova) ou "reutilizada" (CONN_MAX_AGE)
+- Cache de respostas: streamflix_cache_requests_total{resultado}
+    resultado = hits / misses / esperas (ver movies/cache.py)
+    hit ratio no Prometheus:
+    rate(streamflix_cache_requests_total{resultado="hits"}[5m])
+      / ignoring(resultado) sum without(resultado)(rate(streamflix_cache_requests_total{resultado=~"hits|misses"}[5m]))
+
+Vários workers do gunicorn: cada processo grava os valores em arquivos
+na pasta PROMETHEUS_MULTIPROC_DIR e o /metrics soma todos
+(configurado em gunicorn.conf.py). Sem essa variável (runserver,
+testes), vale a memória do processo.
+
+METRICAS_TOKEN (opcional): exige "Authorization: Bearer <token>"
+"""
+
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+SEM_ROTA = 'sem_rota'
+
+REQUISICOES = Counter(
+    'streamflix_http_requests', 'Requisições por rota',
+    ['rota', 'metodo', 'status'],
+)
+LATENCIA = Histogram(
+    'streamflix_http_request_duration_seconds', 'Tempo de resposta por rota',
+    ['rota', 'metodo'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+TAMANHO = Histogram(
+    'streamflix_http_response_size_bytes', 'Tamanho do corpo da resposta por rota',
+    ['rota'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+CONSULTAS = Histogram(
+    'streamflix_db_queries_per_request', 'Consultas SQL por requisição',
+    ['rota'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+TEMPO_DB = Histogram(
+    'streamflix_db_duration_seconds', 'Tempo somado das consultas SQL por requisição',
+    ['rota'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CONEXOES = Counter(
+    'streamflix_db_connections', 'Requisições que abriram ou reutilizaram conexão',
+    ['alias', 'tipo'],
+)
+CACHE = Counter(
+    'streamflix_cache_requests', 'Leituras do cache de respostas',
+    ['resultado'],
+)
+
+_local = threading.local()
+
+
+@receiver(connection_created)
+def marcar_conexao_nova(sender, connection, **kwargs):
+    _local.novas = getattr(_local, 'novas', set()) | {connection.alias}
+
+
+def registrar_cache(resultado):
+    """
+    Chamado por movies/cache.py: hits, misses ou esperas
+    """
+    CACHE.labels(resultado).inc()
+
+
+class ContadorSQL:
+    """
+    execute_wrapper mínimo: quantidade, tempo e quais bancos
+    """
+
+    def __init__(self):
+        self.quantidade = 0
+        self.duracao = 0.0
+        self.aliases = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracao += time.perf_counter() - inicio
+            self.quantidade += 1
+            self.aliases.add(context['connection'].alias)
+
+
+def nome_da_rota(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.url_name if match else None) or SEM_ROTA
+
+
+def tamanho(response):
+    if response.streaming:
+        return int(response.get('Content-Length') or 0) or None
+    return len(response.content)
+
+
+class MetricasMiddleware:
+    """
+    Soma cada requisição nas métricas (todas, sem amostragem)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = ContadorSQL()
+        _local.novas = set()
+        inicio = time.perf_counter()
+        with ExitStack() as pilha:
+            for alias in connections:
+                pilha.enter_context(connections[alias].execute_wrapper(contador))
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+
+        rota = nome_da_rota(request)
+        REQUISICOES.labels(rota, request.method, str(response.status_code)).inc()
+        LATENCIA.labels(rota, request.method).observe(duracao)
+        bytes_resposta = tamanho(response)
+        if bytes_resposta is not None:
+            TAMANHO.labels(rota).observe(bytes_resposta)
+        CONSULTAS.labels(rota).observe(contador.quantidade)
+        TEMPO_DB.labels(rota).observe(contador.duracao)
+        for alias in contador.aliases:
+            CONEXOES.labels(alias, 'aberta' if alias in _local.novas else 'reutilizada').inc()
+        return response
+
+
+def registro():
+    """
+    Registro com os valores de todos os workers (ou só deste processo)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro_workers = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro_workers)
+        return registro_workers
+    return REGISTRY
+
+
+def autorizado(request):
+    """
+    Sem METRICAS_TOKEN: liberado. Com: exige "Authorization: Bearer <token>"
+    (vale também para /api/movies/cache/stats/)
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    return not token or request.headers.get('Authorization') == f'Bearer {token}'
+
+
+def metricas(request):
+    """
+    GET /metrics
+    """
+    if not autorizado(request):
+        return HttpResponse(status=401)
+    return HttpResponse(generate_latest(registro()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,253 @@
+"""
+PAGINAÇÃO POR CURSOR (KEYSET)
+
+PESSOA 2 EXPLICA:
+- A paginação por número de página faz COUNT(*) + OFFSET a cada página
+  (a página 500 lê e descarta 10.000 linhas antes de responder)
+- Por cursor, cada página continua de onde a anterior parou:
+    WHERE (ano, titulo, id) "depois de" (2023, 'Barbie', 2)
+  usando o índice composto da ordenação → página 500 custa igual à página 1
+- O cursor vai no link "next"/"previous" (o cliente não monta nada)
+
+Quem ainda precisa de número de página manda ?page=N
+(o total vem de um COUNT guardado em cache até o catálogo mudar)
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Por quanto tempo o total (COUNT) do modo ?page= fica em cache
+TOTAL_CACHE_SEGUNDOS = getattr(settings, 'PAGINACAO_TOTAL_CACHE_SEGUNDOS', 60)
+
+# Maior inteiro que cabe numa coluna inteira (64 bits com sinal)
+INTEIRO_64 = 2 ** 63
+
+
+class PaginatorComTotalEmCache(Paginator):
+    """
+    Paginator do Django que guarda o COUNT(*) em cache
+
+    A chave é o SQL da consulta (filtros diferentes → totais diferentes)
+    mais a geração do catálogo (qualquer escrita gera um total novo)
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or not TOTAL_CACHE_SEGUNDOS:
+            return super().count
+
+        from movies.cache import versao_catalogo
+
+        sql, params = query.sql_with_params()
+        resumo = hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+        chave = f'paginacao:total:{versao_catalogo()}:{resumo}'
+        total = cache.get(chave)
+        if total is None:
+            total = self.object_list.count()
+            cache.set(chave, total, TOTAL_CACHE_SEGUNDOS)
+        return total
+
+
+class PaginaComTotalPagination(PageNumberPagination):
+    """
+    Paginação por número de página (?page=N), com total em cache
+
+    Usada quando o cliente pede ?page= numa lista com cursor
+    """
+    django_paginator_class = PaginatorComTotalEmCache
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor usando a ordenação da view/modelo + id
+
+    Ordenação: view.get_ordering() → view.ordering → order_by do queryset
+    → Meta.ordering
+    O id entra no fim como desempate (mesma direção do último campo)
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+
+        # Compatibilidade: ?page=N usa a paginação antiga
+        if self.page_query_param in request.query_params:
+            self.por_pagina = PaginaComTotalPagination()
+            return self.por_pagina.paginate_queryset(queryset, request, view)
+        self.por_pagina = None
+
+        self.ordering = self.get_ordering(queryset, view)
+        self.modelo = queryset.model
+        cursor = self.decode_cursor(request)
+        self.reverso = bool(cursor and cursor['r'])
+
+        ordering = self.ordering
+        if self.reverso:
+            ordering = [inverter(campo) for campo in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self.filtro_depois_de(ordering, cursor['v']))
+
+        # Busca 1 a mais só para saber se existe próxima página
+        itens = list(queryset[:self.page_size + 1])
+        tem_mais = len(itens) > self.page_size
+        itens = itens[:self.page_size]
+
+        if self.reverso:
+            itens.reverse()
+            self.tem_anterior = tem_mais
+            self.tem_proxima = True
+        else:
+            self.tem_anterior = cursor is not None
+            self.tem_proxima = tem_mais
+
+        self.itens = itens
+        return itens
+
+    def get_ordering(self, queryset, view):
+        if hasattr(view, 'get_ordering'):
+            ordering = view.get_ordering()
+        else:
+            ordering = getattr(view, 'ordering', None)
+        if ordering is None:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        ordering = list(ordering)
+
+        nomes = {campo.lstrip('-') for campo in ordering}
+        if not nomes & {'id', 'pk'}:
+            desc = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-id' if desc else 'id')
+        return ordering
+
+    def filtro_depois_de(self, ordering, valores):
+        """
+        Monta o "depois de" para vários campos:
+            a > x  OU  (a = x E b > y)  OU  (a = x E b = y E id > z)
+        (com < nos campos em ordem decrescente)
+        """
+        filtro = Q()
+        iguais = {}
+        for campo, valor in zip(ordering, valores):
+            nome = campo.lstrip('-')
+            lookup = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= Q(**iguais, **{f'{nome}__{lookup}': valor})
+            iguais[nome] = valor
+        return filtro
+
+    # ---------- cursor ----------
+
+    def decode_cursor(self, request):
+        codificado = request.query_params.get(self.cursor_query_param)
+        if not codificado:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(codificado.encode()).decode())
+            valores = cursor.get('v')
+            if not isinstance(valores, list) or len(valores) != len(self.ordering):
+                raise ValueError
+            # Cursor adulterado ("abc" no lugar de um ano, um dict...):
+            # cada valor passa pelo campo da ordenação ANTES da consulta
+            valores = [
+                self.converter(campo.lstrip('-'), valor)
+                for campo, valor in zip(self.ordering, valores)
+            ]
+            return {'v': valores, 'r': bool(cursor.get('r'))}
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, AttributeError,
+                ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def converter(self, nome, valor):
+        """
+        Valor do cursor → tipo do campo (to_python + validadores,
+        ex.: faixa do inteiro no banco); erro se não servir
+        """
+        if valor is None:
+            raise ValueError
+        modelo = self.modelo
+        partes = nome.split('__')
+        for parte in partes[:-1]:
+            modelo = modelo._meta.get_field(parte).related_model
+        campo = modelo._meta.pk if partes[-1] == 'pk' else modelo._meta.get_field(partes[-1])
+        valor = campo.to_python(valor)
+        campo.run_validators(valor)
+        # O SQLite não declara faixa para os inteiros (validadores vazios)
+        if isinstance(valor, int) and not -INTEIRO_64 <= valor < INTEIRO_64:
+            raise ValueError
+        return valor
+
+    def encode_cursor(self, item, reverso):
+        valores = [valor_cursor(getattr(item, campo.lstrip('-'))) for campo in self.ordering]
+        dados = json.dumps({'v': valores, 'r': int(reverso)}, separators=(',', ':'))
+        codificado = base64.urlsafe_b64encode(dados.encode()).decode()
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, codificado)
+
+    def get_next_link(self):
+        if not self.tem_proxima or not self.itens:
+            return None
+        return self.encode_cursor(self.itens[-1], reverso=False)
+
+    def get_previous_link(self):
+        if not self.tem_anterior or not self.itens:
+            return None
+        return self.encode_cursor(self.itens[0], reverso=True)
+
+    # ---------- resposta ----------
+
+    def get_paginated_response(self, data):
+        if self.por_pagina is not None:
+            return self.por_pagina.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def inverter(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def valor_cursor(valor):
+    """
+    Valor do campo → algo que cabe em JSON e volta igual no filtro
+    """
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
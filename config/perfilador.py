@@ -0,0 +1,273 @@
+"""
+PERFILADOR (onde o tempo de UMA requisição é gasto)
+
+PESSOA 2 EXPLICA:
+- O Server-Timing (config/instrumentacao.py) diz "db 12ms, view 80ms",
+  mas não diz ONDE dentro da view (DRF, ORM, serializer...)
+- Aqui a requisição roda com um perfilador por amostragem: um thread
+  olha a pilha de chamadas do thread da requisição a cada
+  PERFIL_INTERVALO_MS e conta quanto tempo cada pilha apareceu
+  (não mexe no código medido; custo baixo)
+- O resultado vira um arquivo speedscope (https://www.speedscope.app)
+  em PERFIL_DIR, com um id; a resposta traz "X-Perfil-Id: <id>"
+
+Quando perfilar:
+- Header "X-Perfil: <token>" (token assinado com a SECRET_KEY, gerado
+  por "python manage.py token_perfil"; vale PERFIL_VALIDADE_SEGUNDOS)
+- ?_perfil=1 de um usuário staff logado
+- PERFIL_AMOSTRA_1_EM_N=N: 1 em cada N requisições vai para o disco
+  (tráfego de verdade; a resposta não muda)
+
+Buscar o resultado (mesmo token ou staff):
+    GET /perfis                          → últimos perfis
+    GET /perfis/<id>                     → JSON do speedscope
+    GET /perfis/<id>?formato=collapsed   → pilhas "a;b;c microssegundos"
+                                           (flamegraph.pl, inferno...)
+"""
+
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+
+HEADER = 'X-Perfil'
+PARAMETRO = '_perfil'
+SAL = 'streamflix.perfil'
+EXTENSAO = '.speedscope.json'
+ID_RE = re.compile(r'^[0-9]{20}-[0-9a-f]{8}$')
+
+
+def gerar_token():
+    return signing.TimestampSigner(salt=SAL).sign('perfil')
+
+
+def token_valido(request):
+    token = request.headers.get(HEADER)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=SAL).unsign(
+            token, max_age=getattr(settings, 'PERFIL_VALIDADE_SEGUNDOS', 3600)
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def eh_staff(request):
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+class Amostrador:
+    """
+    Perfilador por amostragem de UM thread
+
+    pilhas: Counter {(frame, frame, ...): segundos} da raiz para a
+    folha; cada frame é (função, arquivo, linha da definição)
+    """
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self.duracao = 0.0
+        self._parar = threading.Event()
+
+    def __enter__(self):
+        # A pilha acaba neste frame: o que está acima (servidor,
+        # middlewares de fora) não entra
+        self._alvo = threading.get_ident()
+        self._raiz = sys._getframe(1)
+        self._inicio = time.perf_counter()
+        self._thread = threading.Thread(target=self._rodar, name='perfilador', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self.duracao = time.perf_counter() - self._inicio
+        return False
+
+    def _rodar(self):
+        anterior = time.perf_counter()
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self._alvo)
+            agora = time.perf_counter()
+            if frame is not None and not self._parar.is_set():
+                # Peso = tempo real desde a última amostra (o GIL
+                # pode atrasar o thread do perfilador)
+                self.registrar(frame, agora - anterior)
+            anterior = agora
+
+    def registrar(self, frame, peso):
+        pilha = []
+        while frame is not None and frame is not self._raiz:
+            codigo = frame.f_code
+            pilha.append((codigo.co_qualname, codigo.co_filename, codigo.co_firstlineno))
+            frame = frame.f_back
+        if frame is None:
+            # Já saiu do frame raiz (fim da requisição)
+            return
+        pilha.reverse()
+        self.pilhas[tuple(pilha)] += peso
+        self.amostras += 1
+
+    def speedscope(self, nome):
+        """
+        Formato "sampled" do speedscope, em milissegundos
+        """
+        frames = []
+        indices = {}
+        amostras = []
+        pesos = []
+        for pilha, segundos in self.pilhas.most_common():
+            caminho = []
+            for frame in pilha:
+                if frame not in indices:
+                    indices[frame] = len(frames)
+                    funcao, arquivo, linha = frame
+                    frames.append({'name': funcao, 'file': arquivo, 'line': linha})
+                caminho.append(indices[frame])
+            amostras.append(caminho)
+            pesos.append(round(segundos * 1000, 3))
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'exporter': 'streamflix',
+            'name': nome,
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': nome,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(self.duracao * 1000, 3),
+                'samples': amostras,
+                'weights': pesos,
+            }],
+        }
+
+
+def collapsed(dados):
+    """
+    speedscope → "raiz;...;folha microssegundos" (uma pilha por linha)
+    """
+    frames = [
+        f'{frame["name"]} ({os.path.basename(frame["file"])}:{frame["line"]})'
+        for frame in dados['shared']['frames']
+    ]
+    linhas = []
+    for perfil in dados['profiles']:
+        for caminho, peso in zip(perfil['samples'], perfil['weights']):
+            linhas.append(f'{";".join(frames[i] for i in caminho)} {round(peso * 1000)}')
+    return '\n'.join(linhas) + '\n'
+
+
+# ---------- arquivos ----------
+
+def pasta():
+    return Path(getattr(settings, 'PERFIL_DIR'))
+
+
+def salvar(amostrador, request, response):
+    perfil_id = f'{timezone.now():%Y%m%d%H%M%S%f}-{secrets.token_hex(4)}'
+    nome = f'{request.method} {request.get_full_path()} → {response.status_code}'
+    destino = pasta()
+    destino.mkdir(parents=True, exist_ok=True)
+    (destino / f'{perfil_id}{EXTENSAO}').write_text(
+        json.dumps(amostrador.speedscope(nome), ensure_ascii=False), encoding='utf-8'
+    )
+    limpar(destino)
+    return perfil_id
+
+
+def limpar(destino):
+    """
+    Mantém só os PERFIL_MAXIMO_ARQUIVOS mais novos (o id começa pela data)
+    """
+    maximo = getattr(settings, 'PERFIL_MAXIMO_ARQUIVOS', 500)
+    arquivos = sorted(destino.glob(f'*{EXTENSAO}'))
+    for antigo in arquivos[:max(0, len(arquivos) - maximo)]:
+        antigo.unlink(missing_ok=True)
+
+
+class PerfilMiddleware:
+    """
+    Perfila a requisição quando pedido (token, staff) ou sorteado (1 em N)
+
+    Vai no FIM do MIDDLEWARE: depois do AuthenticationMiddleware
+    (request.user) e em volta só da view
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pedido = token_valido(request) or (PARAMETRO in request.GET and eh_staff(request))
+        um_em = getattr(settings, 'PERFIL_AMOSTRA_1_EM_N', 0)
+        sorteado = um_em > 0 and random.randrange(um_em) == 0
+        if not (pedido or sorteado) or request.path_info.startswith(reverse('perfis')):
+            return self.get_response(request)
+
+        intervalo = getattr(settings, 'PERFIL_INTERVALO_MS', 5) / 1000
+        with Amostrador(intervalo) as amostrador:
+            response = self.get_response(request)
+        perfil_id = salvar(amostrador, request, response)
+        if pedido:
+            response['X-Perfil-Id'] = perfil_id
+        return response
+
+
+# ---------- consulta ----------
+
+def autorizado(request):
+    return token_valido(request) or eh_staff(request)
+
+
+def perfis(request):
+    """
+    GET /perfis → [{id, nome, duracao_ms, amostras}] (mais novos primeiro)
+    """
+    if not autorizado(request):
+        return JsonResponse({'detail': 'Sem permissão.'}, status=403)
+    resultados = []
+    for arquivo in sorted(pasta().glob(f'*{EXTENSAO}'), reverse=True)[:50]:
+        dados = json.loads(arquivo.read_text(encoding='utf-8'))
+        perfil = dados['profiles'][0]
+        resultados.append({
+            'id': arquivo.name[:-len(EXTENSAO)],
+            'nome': dados['name'],
+            'duracao_ms': perfil['endValue'],
+            'amostras': len(perfil['samples']),
+        })
+    return JsonResponse({'results': resultados})
+
+
+def perfil(request, perfil_id):
+    """
+    GET /perfis/<id>[?formato=collapsed]
+    """
+    if not autorizado(request):
+        return JsonResponse({'detail': 'Sem permissão.'}, status=403)
+    arquivo = pasta() / f'{perfil_id}{EXTENSAO}'
+    if not ID_RE.match(perfil_id) or not arquivo.exists():
+        raise Http404
+    if request.GET.get('formato') == 'collapsed':
+        return HttpResponse(collapsed(json.loads(arquivo.read_text(encoding='utf-8'))), content_type='text/plain; charset=utf-8')
+    response = HttpResponse(arquivo.read_bytes(), content_type='application/json')
+    response['Content-Disposition'] = f'attachment; filename="{perfil_id}{EXTENSAO}"'
+    return response
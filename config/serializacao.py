@@ -0,0 +1,191 @@
+"""
+SERIALIZAÇÃO RÁPIDA PARA LISTAS (só leitura)
+
+PESSOA 2 EXPLICA:
+- Com many=True o DRF chama, para CADA item e CADA campo,
+  get_attribute() + to_representation() (muito trabalho repetido)
+- Aqui os conversores de cada campo são montados UMA vez por lista:
+    * Decimal → texto já com as casas decimais certas
+    * datetime → ISO 8601 no fuso do projeto
+    * int/str → int()/str()
+- Se o que chega é um QuerySet, as linhas vêm direto de values_list()
+  (nem cria os objetos Movie/Review); se é uma lista (página),
+  os valores são lidos dos objetos com attrgetter
+- O JSON sai IGUAL ao do ModelSerializer (tem teste comparando)
+
+Serializer com algum campo que não dá para "compilar"
+(SerializerMethodField, source='*', ...) usa o caminho normal do DRF.
+
+Uso:
+    class Meta:
+        list_serializer_class = ListaRapidaSerializer
+"""
+
+import decimal
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import fields, relations, serializers
+from rest_framework.settings import api_settings
+
+from .instrumentacao import SerializacaoMedidaMixin
+
+
+class ListaRapidaSerializer(SerializacaoMedidaMixin, serializers.ListSerializer):
+    """
+    ListSerializer com caminho rápido para leitura
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+
+        plano = self.plano()
+        if plano is None:
+            return super().to_representation(data)
+
+        nomes, caminhos, getters, conversores = plano
+        if isinstance(data, models.QuerySet):
+            linhas = data.values_list(*caminhos)
+        else:
+            linhas = (tuple(getter(item) for getter in getters) for item in data)
+
+        pares = list(zip(nomes, conversores))
+        return [
+            {nome: None if valor is None else converter(valor)
+             for (nome, converter), valor in zip(pares, linha)}
+            for linha in linhas
+        ]
+
+    def plano(self):
+        """
+        (nomes, caminhos do values_list, getters, conversores) ou None
+        """
+        model = getattr(getattr(self.child, 'Meta', None), 'model', None)
+        if model is None:
+            return None
+
+        nomes, caminhos, getters, conversores = [], [], [], []
+        for campo in self.child._readable_fields:
+            caminho = resolver(model, campo)
+            if caminho is None:
+                return None
+            lookup, atributo = caminho
+            nomes.append(campo.field_name)
+            caminhos.append(lookup)
+            getters.append(attrgetter(atributo))
+            conversores.append(conversor(campo))
+        return nomes, caminhos, getters, conversores
+
+
+def resolver(model, campo):
+    """
+    Campo do serializer → ('filme__titulo', 'filme.titulo') ou None
+
+    Só aceita colunas do banco, atravessando FKs que não podem ser nulas
+    (com FK nula o DRF trataria o None no meio do caminho)
+    """
+    if campo.source == '*' or isinstance(campo, serializers.SerializerMethodField):
+        return None
+    if isinstance(campo, relations.RelatedField) and not isinstance(campo, relations.PrimaryKeyRelatedField):
+        return None
+
+    atual = model
+    partes = campo.source_attrs
+    for i, parte in enumerate(partes):
+        try:
+            campo_model = atual._meta.get_field(parte)
+        except FieldDoesNotExist:
+            return None
+        if not campo_model.concrete:
+            return None
+
+        ultimo = i == len(partes) - 1
+        if campo_model.is_relation:
+            if ultimo:
+                # FK no fim: só o id (PrimaryKeyRelatedField)
+                if not isinstance(campo, relations.PrimaryKeyRelatedField) or campo.pk_field is not None:
+                    return None
+                atributos = [*partes[:-1], campo_model.attname]
+                return '__'.join(partes), '.'.join(atributos)
+            if campo_model.null:
+                return None
+            atual = campo_model.related_model
+        elif not ultimo:
+            return None
+
+    return '__'.join(partes), '.'.join(partes)
+
+
+def conversor(campo):
+    """
+    Função valor → JSON de um campo (montada uma vez por lista)
+
+    Faz o mesmo que campo.to_representation(), sem repetir
+    as verificações de configuração a cada valor
+    """
+    tipo = type(campo)
+
+    if isinstance(campo, relations.PrimaryKeyRelatedField):
+        return mesmo_valor
+    if tipo is fields.IntegerField:
+        return int
+    if tipo is fields.CharField:
+        return str
+    if tipo is fields.ChoiceField:
+        return conversor_escolha(campo)
+    if tipo is fields.DecimalField:
+        return conversor_decimal(campo)
+    if tipo is fields.DateTimeField:
+        return conversor_data_hora(campo)
+    return campo.to_representation
+
+
+def mesmo_valor(valor):
+    return valor
+
+
+def conversor_escolha(campo):
+    mapa = campo.choice_strings_to_values
+
+    def converter(valor):
+        if valor == '':
+            return valor
+        return mapa.get(str(valor), valor)
+    return converter
+
+
+def conversor_decimal(campo):
+    coerce_to_string = getattr(campo, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or campo.localize or campo.decimal_places is None:
+        return campo.to_representation
+
+    expoente = decimal.Decimal('.1') ** campo.decimal_places
+    contexto = decimal.getcontext().copy()
+    if campo.max_digits is not None:
+        contexto.prec = campo.max_digits
+    arredondamento = campo.rounding
+
+    def converter(valor):
+        if not isinstance(valor, decimal.Decimal):
+            valor = decimal.Decimal(str(valor).strip())
+        return '{:f}'.format(valor.quantize(expoente, rounding=arredondamento, context=contexto))
+    return converter
+
+
+def conversor_data_hora(campo):
+    formato = getattr(campo, 'format', api_settings.DATETIME_FORMAT)
+    fuso = campo.timezone if hasattr(campo, 'timezone') else campo.default_timezone()
+    if formato is None or formato.lower() != fields.ISO_8601 or fuso is None:
+        return campo.to_representation
+
+    def converter(valor):
+        if isinstance(valor, str) or not timezone.is_aware(valor):
+            return campo.to_representation(valor)
+        texto = valor.astimezone(fuso).isoformat()
+        if texto.endswith('+00:00'):
+            texto = texto[:-6] + 'Z'
+        return texto
+    return converter
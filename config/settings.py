@@ -2,7 +2,7 @@
 SETTINGS.PY - Configurações do Django
 
 PESSOA 1 EXPLICA:
-- INSTALLED_APPS: registra os apps (movies, reviews)
+- INSTALLED_APPS: registra os apps (movies, reviews, people)
 - DATABASES: SQLite (banco local)
 - DEBUG: True = mostra erros detalhados
 
@@ -14,6 +14,7 @@ PESSOA 2 EXPLICA:
 
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,9 +45,14 @@ INSTALLED_APPS = [
     # Nossos apps
     'movies',
     'reviews',
+    'people',
 ]
 
 MIDDLEWARE = [
+    # Primeiros: medem a requisição inteira
+    # (ver config/metricas.py e config/instrumentacao.py)
+    'config.metricas.MetricasMiddleware',
+    'config.instrumentacao.InstrumentacaoMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -56,6 +62,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Último: precisa do request.user e perfila só a view
+    # (ver config/perfilador.py)
+    'config.perfilador.PerfilMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -88,6 +97,85 @@ DATABASES = {
     )
 }
 
+# Cache (respostas da API, ver movies/cache.py)
+# As VERSÕES do cache moram nele: quem invalida (workers, comandos como
+# import_movies e calcular_similares) precisa enxergar o mesmo cache
+# CACHE_URL:
+#   file:///tmp/cache    → arquivos em disco (padrão; compartilhado entre
+#                          workers e comandos da mesma máquina)
+#   redis://host:6379/0  → Redis (precisa do pacote "redis"; várias máquinas)
+#   locmem://            → memória do processo (só 1 processo; o gunicorn
+#                          com mais de 1 worker recusa, ver gunicorn.conf.py)
+CACHE_URL = os.environ.get(
+    'CACHE_URL', f"file://{Path(tempfile.gettempdir()) / 'streamflix-cache'}"
+)
+
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('file://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL[len('file://'):],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'streamflix',
+        }
+    }
+
+# Tempo máximo de uma resposta no cache (é invalidada antes se algo mudar)
+RESPOSTA_CACHE_SEGUNDOS = int(os.environ.get('RESPOSTA_CACHE_SEGUNDOS', 300))
+
+# Autocomplete (movies/autocomplete.py): de quanto em quanto tempo cada
+# worker confere se o catálogo mudou (e remonta o índice em memória)
+AUTOCOMPLETE_TTL_SEGUNDOS = float(os.environ.get('AUTOCOMPLETE_TTL_SEGUNDOS', 30))
+
+# Instrumentação (config/instrumentacao.py): Server-Timing, log de
+# requisições lentas e de prováveis N+1
+# - amostra: fração das requisições medidas (0 desliga, 1 mede todas)
+INSTRUMENTACAO_AMOSTRA = float(os.environ.get('INSTRUMENTACAO_AMOSTRA', 1.0 if DEBUG else 0.1))
+INSTRUMENTACAO_LENTO_MS = float(os.environ.get('INSTRUMENTACAO_LENTO_MS', 500))
+INSTRUMENTACAO_N_MAIS_UM = int(os.environ.get('INSTRUMENTACAO_N_MAIS_UM', 5))
+
+# /metrics (config/metricas.py): se definido, exige "Authorization: Bearer <token>"
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+
+# Perfilador (config/perfilador.py): header X-Perfil assinado ou
+# ?_perfil=1 de staff; PERFIL_AMOSTRA_1_EM_N=N grava 1 em cada N (0 desliga)
+PERFIL_DIR = Path(os.environ.get('PERFIL_DIR', Path(tempfile.gettempdir()) / 'streamflix-perfis'))
+PERFIL_AMOSTRA_1_EM_N = int(os.environ.get('PERFIL_AMOSTRA_1_EM_N', 0))
+PERFIL_INTERVALO_MS = float(os.environ.get('PERFIL_INTERVALO_MS', 5))
+PERFIL_VALIDADE_SEGUNDOS = int(os.environ.get('PERFIL_VALIDADE_SEGUNDOS', 3600))
+PERFIL_MAXIMO_ARQUIVOS = int(os.environ.get('PERFIL_MAXIMO_ARQUIVOS', 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'streamflix': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Rankings (ver movies.models.ParametrosRanking e o comando compactar_rankings)
+# - peso: quantas avaliações "na média" cada filme ganha de partida
+# - meia-vida: depois desse tempo uma review vale metade na tendência
+# - janela: reviews mais velhas que isso saem da tendência
+RANKING_PESO_PRIOR = float(os.environ.get('RANKING_PESO_PRIOR', 10))
+RANKING_MEIA_VIDA_HORAS = float(os.environ.get('RANKING_MEIA_VIDA_HORAS', 72))
+RANKING_JANELA_DIAS = float(os.environ.get('RANKING_JANELA_DIAS', 30))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -102,6 +190,18 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Imagens dos filmes (poster/backdrop) salvas em disco pelo hash
+# O disco do container do Railway é apagado a cada deploy: crie um
+# volume no serviço (Settings → Volumes, montado em /data, por exemplo);
+# o Railway avisa onde em RAILWAY_VOLUME_MOUNT_PATH e as imagens vão
+# para <volume>/media. MEDIA_ROOT explícito vence
+VOLUME = os.environ.get('RAILWAY_VOLUME_MOUNT_PATH')
+MEDIA_URL = '/media/'
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT') or (Path(VOLUME) / 'media' if VOLUME else BASE_DIR / 'media'))
+# No Railway sem volume nem MEDIA_ROOT as imagens se perderiam:
+# a migração que tira as imagens do banco se recusa a rodar
+MEDIA_PERSISTENTE = bool(VOLUME or os.environ.get('MEDIA_ROOT') or not os.environ.get('RAILWAY_ENVIRONMENT'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS - Permite qualquer origem (desenvolvimento)
@@ -113,7 +213,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Cursor (keyset) por padrão; ?page=N continua funcionando
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
 }
 CSRF_TRUSTED_ORIGINS = [
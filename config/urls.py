@@ -5,13 +5,23 @@ Conecta endereços web aos apps:
 - /admin/ → Painel administrativo
 - /api/movies/ → App de filmes
 - /api/reviews/ → App de avaliações
+- /api/people/ → App de pessoas (elenco)
+- /metrics → Métricas para o Prometheus
+- /perfis → Perfis de requisições (config/perfilador.py)
 """
 
 from django.contrib import admin
 from django.urls import path, include
 
+from config.metricas import metricas
+from config.perfilador import perfil, perfis
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/movies/', include('movies.urls')),
     path('api/reviews/', include('reviews.urls')),
+    path('api/people/', include('people.urls')),
+    path('metrics', metricas, name='metrics'),
+    path('perfis', perfis, name='perfis'),
+    path('perfis/<str:perfil_id>', perfil, name='perfil'),
 ]
\ No newline at end of file
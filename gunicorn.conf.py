@@ -0,0 +1,42 @@
+"""
+GUNICORN.CONF.PY - Configuração do gunicorn (lida automaticamente
+quando o gunicorn roda na pasta do projeto)
+
+PESSOA 2 EXPLICA:
+- Cada worker é um processo separado: as métricas do /metrics
+  (config/metricas.py) ficam em arquivos numa pasta compartilhada
+  e o /metrics soma todos
+- A pasta é limpa quando o gunicorn sobe (valores de execuções
+  antigas não entram na conta)
+- Worker que morre: os contadores dele continuam valendo, só os
+  valores "ao vivo" dele são descartados
+- CACHE_URL=locmem:// com mais de 1 worker: recusa subir (cada worker
+  teria as próprias versões do cache e as invalidações de um não
+  chegariam aos outros; ver movies/cache.py)
+"""
+
+import os
+import shutil
+import tempfile
+
+# Antes de qualquer import do prometheus_client (os workers herdam)
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'streamflix-metricas')
+)
+
+
+def on_starting(server):
+    if os.environ.get('CACHE_URL', '').startswith('locmem') and server.cfg.workers > 1:
+        raise RuntimeError(
+            'CACHE_URL=locmem:// não funciona com vários workers: '
+            'use file:// ou redis:// (ou --workers 1)'
+        )
+    pasta = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.makedirs(pasta, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
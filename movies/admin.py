@@ -21,7 +21,7 @@ class MovieAdmin(admin.ModelAdmin):
         'ano',              # Ano
         'genero',           # Gênero
         'nota_media',       # Nota
-        'total_avaliacoes'  # Qtd avaliações
+        'total_avaliacoes'  # Qtd avaliações (contador salvo, sem COUNT por linha)
     ]
     
     # Filtros laterais
@@ -31,4 +31,8 @@ class MovieAdmin(admin.ModelAdmin):
     search_fields = ['titulo', 'sinopse']
     
     # Ordenação padrão
-    ordering = ['-ano', 'titulo']
\ No newline at end of file
+    ordering = ['-ano', 'titulo']
+    
+    # Calculados pelas avaliações e rankings (não editar na mão;
+    # o save() do admin não grava esses campos)
+    readonly_fields = sorted(Movie.CAMPOS_CONTADORES)
\ No newline at end of file
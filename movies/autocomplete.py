@@ -0,0 +1,184 @@
+"""
+MOVIES/AUTOCOMPLETE.PY - Sugestões enquanto o usuário digita
+
+PESSOA 1 EXPLICA:
+- A caixa de busca pede sugestões a cada tecla: não dá para ir ao
+  banco toda vez
+- Cada worker monta (na primeira vez que precisa) um índice em memória:
+    * uma lista ORDENADA de chaves: títulos e nomes do elenco sem acento,
+      a partir de cada palavra ("o poderoso chefao", "poderoso chefao",
+      "chefao"), para "chef" achar "O Poderoso Chefão"
+    * cada chave aponta para um item (filme ou pessoa)
+- Buscar um prefixo = duas buscas binárias (bisect) na lista:
+  tudo entre elas começa com o prefixo
+- Os itens são numerados do mais popular para o menos popular
+  (filmes: total de avaliações; pessoas: soma das avaliações dos
+  seus filmes), então os N melhores são os N menores números
+- Prefixo curto ("a") casa com muita coisa: o resultado dele é
+  calculado uma vez e guardado
+
+Atualização:
+- A cada AUTOCOMPLETE_TTL_SEGUNDOS uma consulta barata
+  (quantidade de filmes + último updated_at, pelo índice) diz se
+  o catálogo mudou; só então o índice é remontado
+- Enquanto um thread remonta, os outros seguem usando o índice antigo
+- Fora isso, nenhuma consulta ao banco
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+
+from .models import Movie
+from .texto import palavras
+
+# Maior caractere Unicode: "prefixo" <= chave < "prefixo" + FIM
+FIM = '\U0010ffff'
+
+LIMITE_PADRAO = 8
+LIMITE_MAXIMO = 20
+
+# Chaves a partir das primeiras N palavras de cada título/nome
+PALAVRAS_POR_ITEM = 6
+
+# Intervalo maior que isso: resultado guardado por prefixo
+VARREDURA_MAXIMA = 2000
+
+
+def normalizar(texto):
+    return ' '.join(palavras(texto))
+
+
+def chaves(texto):
+    """
+    "O Poderoso Chefão" → ["o poderoso chefao", "poderoso chefao", "chefao"]
+    """
+    partes = palavras(texto)
+    return [' '.join(partes[i:]) for i in range(min(len(partes), PALAVRAS_POR_ITEM))]
+
+
+class IndiceAutocomplete:
+    """
+    Índice de prefixos (imutável depois de montado)
+
+    itens: [(tipo, id, rótulo, ano ou None, popularidade)]
+    """
+
+    def __init__(self, itens, versao=None):
+        self.versao = versao
+        # Mais popular primeiro; empate pelo rótulo (ordem estável)
+        self.itens = sorted(itens, key=lambda item: (-item[4], normalizar(item[2]), item[0], item[1]))
+
+        entradas = sorted(
+            (chave, posicao)
+            for posicao, item in enumerate(self.itens)
+            for chave in chaves(item[2])
+        )
+        self.chaves = [chave for chave, _ in entradas]
+        self.posicoes = [posicao for _, posicao in entradas]
+        self.populares = {}
+
+    def __len__(self):
+        return len(self.itens)
+
+    def buscar(self, texto, limite=LIMITE_PADRAO):
+        prefixo = normalizar(texto)
+        if not prefixo:
+            return []
+
+        inicio = bisect_left(self.chaves, prefixo)
+        fim = bisect_left(self.chaves, prefixo + FIM, inicio)
+
+        if fim - inicio > VARREDURA_MAXIMA:
+            melhores = self.populares.get(prefixo)
+            if melhores is None:
+                melhores = heapq.nsmallest(LIMITE_MAXIMO, set(self.posicoes[inicio:fim]))
+                self.populares[prefixo] = melhores
+            melhores = melhores[:limite]
+        else:
+            melhores = heapq.nsmallest(limite, set(self.posicoes[inicio:fim]))
+
+        return [self.formatar(self.itens[posicao]) for posicao in melhores]
+
+    @staticmethod
+    def formatar(item):
+        tipo, item_id, rotulo, ano, _ = item
+        if tipo == 'filme':
+            return {'tipo': tipo, 'id': item_id, 'titulo': rotulo, 'ano': ano}
+        return {'tipo': tipo, 'id': item_id, 'nome': rotulo}
+
+
+def versao_banco():
+    """
+    (quantidade de filmes, último updated_at): muda com qualquer filme
+    criado, alterado, apagado ou avaliado
+    """
+    resultado = Movie.objects.aggregate(total=Count('id'), ultimo=Max('updated_at'))
+    return resultado['total'], resultado['ultimo']
+
+
+def montar(versao=None):
+    from people.models import Pessoa
+
+    itens = [
+        ('filme', movie_id, titulo, ano, total)
+        for movie_id, titulo, ano, total in Movie.objects.values_list(
+            'id', 'titulo', 'ano', 'total_avaliacoes'
+        ).iterator(chunk_size=5000)
+    ]
+    pessoas = Pessoa.objects.annotate(
+        popularidade=Sum('participacoes__filme__total_avaliacoes'),
+    ).values_list('id', 'nome', 'popularidade')
+    itens.extend(
+        ('pessoa', pessoa_id, nome, None, popularidade or 0)
+        for pessoa_id, nome, popularidade in pessoas.iterator(chunk_size=5000)
+    )
+    return IndiceAutocomplete(itens, versao)
+
+
+# ---------- índice do worker ----------
+
+_trava = threading.Lock()
+_estado = {'indice': None, 'verificado_em': 0.0}
+
+
+def indice():
+    """
+    Índice deste worker (monta na 1ª vez; confere a versão a cada TTL)
+    """
+    atual = _estado['indice']
+    ttl = getattr(settings, 'AUTOCOMPLETE_TTL_SEGUNDOS', 30)
+    if atual is not None and time.monotonic() - _estado['verificado_em'] < ttl:
+        return atual
+
+    # Sem índice: espera quem está montando. Com índice: se outro
+    # thread já está conferindo, usa o antigo mesmo
+    if not _trava.acquire(blocking=atual is None):
+        return atual
+    try:
+        atual = _estado['indice']
+        if atual is None or time.monotonic() - _estado['verificado_em'] >= ttl:
+            versao = versao_banco()
+            if atual is None or atual.versao != versao:
+                _estado['indice'] = montar(versao)
+            _estado['verificado_em'] = time.monotonic()
+        return _estado['indice']
+    finally:
+        _trava.release()
+
+
+def descartar():
+    """
+    Esquece o índice deste worker (o próximo uso monta de novo)
+    """
+    with _trava:
+        _estado['indice'] = None
+        _estado['verificado_em'] = 0.0
+
+
+def sugerir(texto, limite=LIMITE_PADRAO):
+    return indice().buscar(texto, limite)
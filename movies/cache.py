@@ -0,0 +1,236 @@
+"""
+MOVIES/CACHE.PY - Cache das respostas de leitura
+
+PESSOA 1 EXPLICA:
+- O catálogo muda pouco e é lido o tempo todo
+- As respostas GET ficam guardadas no cache do Django (CACHES)
+- A chave tem um número de VERSÃO:
+    * "geração do catálogo": muda a cada filme/review salvo ou deletado
+      (listas, gênero, ano)
+    * "versão do filme": muda quando AQUELE filme ou suas reviews mudam
+      (detalhe, reviews do filme)
+- Mudou a versão → a chave antiga nunca mais é usada (expira sozinha)
+- Se várias requisições pedirem a mesma chave vazia ao mesmo tempo,
+  só uma calcula; as outras esperam o resultado (sem "estouro da manada")
+
+Funciona com arquivo (padrão) ou Redis, compartilhados por todos os
+workers e pelos comandos (import_movies, recompute_ratings...): a
+versão que um sobe, os outros enxergam. Memória local só serve para
+um processo (ver CACHE_URL e gunicorn.conf.py)
+"""
+
+import hashlib
+import os
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+from rest_framework.response import Response
+
+from config.metricas import registrar_cache
+
+PREFIXO = 'streamflix'
+CHAVE_CATALOGO = f'{PREFIXO}:catalogo:geracao'
+
+# Quanto tempo uma resposta fica no cache (mesmo sem mudanças)
+TIMEOUT = getattr(settings, 'RESPOSTA_CACHE_SEGUNDOS', 300)
+
+# Trava de "só um calcula": tempo máximo da trava e da espera
+TRAVA_SEGUNDOS = 10
+ESPERA_SEGUNDOS = 2.0
+INTERVALO_ESPERA = 0.02
+
+ESTATISTICAS = ('hits', 'misses', 'esperas')
+
+
+def chave_filme(movie_id):
+    return f'{PREFIXO}:filme:{movie_id}:versao'
+
+
+def chave_estatistica(nome):
+    return f'{PREFIXO}:stats:{nome}'
+
+
+# ---------- versões ----------
+
+def versao(chave):
+    """
+    Versão atual (cria se não existir)
+
+    Começa no relógio em ms: se o cache for apagado, a nova versão
+    continua maior que todas as anteriores (nunca reaproveita chave velha)
+    """
+    valor = cache.get(chave)
+    if valor is None:
+        cache.add(chave, int(time.time() * 1000), None)
+        valor = cache.get(chave)
+    return valor
+
+
+def incrementar(chave):
+    try:
+        return cache.incr(chave)
+    except ValueError:
+        # Chave não existe (cache reiniciado): cria já maior que antes
+        cache.add(chave, int(time.time() * 1000), None)
+        return cache.get(chave)
+
+
+def versao_catalogo():
+    return versao(CHAVE_CATALOGO)
+
+
+def versao_filme(movie_id):
+    return versao(chave_filme(movie_id))
+
+
+def invalidar(movie_ids=()):
+    """
+    Sobe a geração do catálogo e a versão dos filmes informados
+
+    Chama agora E depois do commit: assim uma leitura que aconteça
+    entre o save e o commit não deixa dado velho na versão nova
+    """
+    movie_ids = list(movie_ids)
+
+    def subir():
+        incrementar(CHAVE_CATALOGO)
+        for movie_id in movie_ids:
+            incrementar(chave_filme(movie_id))
+
+    subir()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(subir)
+
+
+# ---------- leitura com trava ----------
+
+def adquirir_trava(trava):
+    """
+    Tenta pegar a trava; retorna uma função para soltar (ou None)
+
+    cache.add é atômico na memória local e no Redis, mas NÃO no
+    FileBasedCache: lá a trava é um arquivo criado com O_EXCL
+    """
+    backend = caches['default']
+    if not isinstance(backend, FileBasedCache):
+        if cache.add(trava, 1, TRAVA_SEGUNDOS):
+            return lambda: cache.delete(trava)
+        return None
+
+    os.makedirs(backend._dir, exist_ok=True)
+    caminho = os.path.join(backend._dir, hashlib.md5(trava.encode()).hexdigest() + '.trava')
+    for _ in range(2):
+        try:
+            os.close(os.open(caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lambda: os.path.exists(caminho) and os.remove(caminho)
+        except FileExistsError:
+            # Trava esquecida por um processo que morreu
+            try:
+                if time.time() - os.path.getmtime(caminho) < TRAVA_SEGUNDOS:
+                    return None
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+    return None
+
+
+def registrar(nome):
+    registrar_cache(nome)
+    try:
+        cache.incr(chave_estatistica(nome))
+    except ValueError:
+        cache.add(chave_estatistica(nome), 0, None)
+        try:
+            cache.incr(chave_estatistica(nome))
+        except ValueError:
+            pass
+
+
+def estatisticas():
+    valores = cache.get_many([chave_estatistica(nome) for nome in ESTATISTICAS])
+    dados = {nome: valores.get(chave_estatistica(nome), 0) for nome in ESTATISTICAS}
+    total = dados['hits'] + dados['misses']
+    dados['hit_ratio'] = round(dados['hits'] / total, 4) if total else 0.0
+    return dados
+
+
+def obter_ou_calcular(chave, calcular, timeout=TIMEOUT):
+    """
+    Lê do cache; se não tiver, só UMA requisição calcula (single-flight)
+
+    As outras esperam até ESPERA_SEGUNDOS pelo valor;
+    se demorar demais, calculam por conta própria
+    """
+    valor = cache.get(chave)
+    if valor is not None:
+        registrar('hits')
+        return valor
+
+    registrar('misses')
+    soltar = adquirir_trava(f'{chave}:trava')
+
+    if soltar is not None:
+        try:
+            valor = calcular()
+            cache.set(chave, valor, timeout)
+        finally:
+            soltar()
+        return valor
+
+    # Outra requisição já está calculando: espera o resultado
+    prazo = time.monotonic() + ESPERA_SEGUNDOS
+    while time.monotonic() < prazo:
+        time.sleep(INTERVALO_ESPERA)
+        valor = cache.get(chave)
+        if valor is not None:
+            registrar('esperas')
+            return valor
+
+    return calcular()
+
+
+def chave_resposta(request, escopo, versao_atual):
+    """
+    Chave da resposta: escopo + versão + host + caminho com query string
+
+    O host entra porque as URLs de imagem são absolutas
+    """
+    url = f'{request.get_host()}{request.get_full_path()}'
+    resumo = hashlib.md5(url.encode()).hexdigest()
+    return f'{PREFIXO}:resposta:{escopo}:{versao_atual}:{resumo}'
+
+
+def resposta_em_cache(escopo='catalogo', kwarg_filme='pk'):
+    """
+    Decorator para o get() das views: guarda (status, dados) no cache
+
+    escopo='catalogo' → versão = geração do catálogo
+    escopo='filme'    → versão do filme cujo id vem em kwargs[kwarg_filme]
+
+    Uso:
+        @resposta_em_cache()
+        def get(self, request, *args, **kwargs):
+            ...
+    """
+    def decorador(get):
+        @wraps(get)
+        def get_em_cache(view, request, *args, **kwargs):
+            if escopo == 'filme':
+                movie_id = kwargs[kwarg_filme]
+                versao_atual = f'{movie_id}:{versao_filme(movie_id)}'
+            else:
+                versao_atual = versao_catalogo()
+            chave = chave_resposta(request, escopo, versao_atual)
+
+            def calcular():
+                response = get(view, request, *args, **kwargs)
+                return response.status_code, response.data
+
+            status_code, data = obter_ou_calcular(chave, calcular)
+            return Response(data, status=status_code)
+        return get_em_cache
+    return decorador
@@ -0,0 +1,74 @@
+"""
+MOVIES/CONDICIONAL.PY - GET condicional (ETag / Last-Modified / 304)
+
+PESSOA 1 EXPLICA:
+- Na primeira visita a API manda "ETag" (uma impressão digital da resposta)
+  e "Last-Modified" (quando o dado mudou)
+- Na próxima, o navegador manda de volta If-None-Match / If-Modified-Since
+- Se nada mudou, a resposta é 304 (sem corpo, sem serializar nada)
+
+Detalhe do filme e reviews do filme: ETag vem do BANCO (updated_at +
+contadores das avaliações, uma consulta pequena pela chave primária),
+não do cache: zerar o cache ou gravar por outro processo não deixa
+ETag velho. Editar só o comentário de uma review também mexe no
+updated_at do filme (ver reviews/models.py)
+Last-Modified tem resolução de 1 segundo; quando o cliente manda os
+dois, o Django confere o ETag primeiro
+Listas (todos, gênero, ano): ETag vem da geração do catálogo
+(ver movies/cache.py), sem ir ao banco
+"""
+
+import hashlib
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .cache import versao_catalogo
+from .models import Movie
+
+
+def url_da_requisicao(request):
+    return f'{request.get_host()}{request.get_full_path()}'
+
+
+def validadores_filme(request, movie_id):
+    """
+    (updated_at, soma_notas, total_avaliacoes) do filme, ou None
+
+    Guardado no request: etag e last_modified usam a mesma consulta
+    """
+    memo = request.__dict__.setdefault('_validadores_filme', {})
+    if movie_id not in memo:
+        memo[movie_id] = (
+            Movie.objects.filter(pk=movie_id)
+            .values_list('updated_at', 'soma_notas', 'total_avaliacoes')
+            .first()
+        )
+    return memo[movie_id]
+
+
+def condicional_filme(kwarg_filme='pk'):
+    """
+    Decorator para o get() de views de UM filme
+    """
+    def etag(request, *args, **kwargs):
+        validadores = validadores_filme(request, kwargs[kwarg_filme])
+        if validadores is None:
+            return None
+        updated_at, soma, total = validadores
+        dados = f'{updated_at.isoformat()}:{soma}:{total}'
+        return hashlib.md5(f'{dados}:{url_da_requisicao(request)}'.encode()).hexdigest()
+
+    def ultima_modificacao(request, *args, **kwargs):
+        validadores = validadores_filme(request, kwargs[kwarg_filme])
+        return validadores[0] if validadores else None
+
+    return method_decorator(condition(etag_func=etag, last_modified_func=ultima_modificacao))
+
+
+def etag_catalogo(request, *args, **kwargs):
+    return hashlib.md5(f'{versao_catalogo()}:{url_da_requisicao(request)}'.encode()).hexdigest()
+
+
+# Decorator para o get() das listas
+condicional_catalogo = method_decorator(condition(etag_func=etag_catalogo))
@@ -0,0 +1,149 @@
+"""
+MOVIES/FILTROS.PY - Filtros da lista de filmes
+
+PESSOA 1 EXPLICA:
+- Os mesmos filtros valem para a lista (/api/movies/) e para as
+  facetas (/api/movies/facets/):
+    genero   → ignora acentos e maiúsculas ("acao" acha "Ação")
+    ano_min, ano_max, nota_min
+- Valor inválido → erro 400 com o nome do parâmetro
+- facetas(): quantos filmes existem por gênero, década e nota
+  (para montar a barra de filtros)
+"""
+
+from decimal import ROUND_CEILING, Decimal
+
+from django.db.models import CharField, Count, F, IntegerField, Min, Value
+from django.db.models.functions import Cast, Floor
+from rest_framework.exceptions import ValidationError
+
+from .texto import dobrar
+
+# Faixa do IntegerField (ano) e do DecimalField(3, 1) (nota_media)
+ANO_LIMITE = 2 ** 31
+NOTA_LIMITE = Decimal('100')
+
+
+def ano(valor):
+    numero = int(valor)
+    if not -ANO_LIMITE <= numero < ANO_LIMITE:
+        raise ValueError(valor)
+    return numero
+
+
+def nota(valor):
+    """
+    "4.25" → 4.3: as notas têm 1 casa, então nota >= 4.25 é o mesmo
+    que nota >= 4.3 (e o valor cabe no DecimalField)
+    """
+    numero = Decimal(valor)
+    if not numero.is_finite():
+        raise ValueError(valor)
+    numero = numero.quantize(Decimal('0.1'), rounding=ROUND_CEILING)
+    if abs(numero) >= NOTA_LIMITE:
+        raise ValueError(valor)
+    return numero
+
+
+# (parâmetro, lookup, conversão)
+# A conversão recusa o que o banco não aceitaria: a consulta só roda
+# depois (QuerySet preguiçoso), fora do try de filtrar()
+FILTROS = [
+    ('ano_min', 'ano__gte', ano),
+    ('ano_max', 'ano__lte', ano),
+    ('nota_min', 'nota_media__gte', nota),
+]
+
+
+def filtrar(queryset, filtros, ignorar=()):
+    """
+    Aplica os filtros pedidos (um dict/QueryDict de parâmetros)
+
+    ignorar: parâmetros que não entram (as facetas ignoram o próprio filtro)
+    """
+    genero = (filtros.get('genero') or '').strip()
+    if genero and 'genero' not in ignorar:
+        queryset = queryset.filter(genero_normalizado=dobrar(genero))
+
+    erros = {}
+    for parametro, lookup, converter in FILTROS:
+        valor = filtros.get(parametro)
+        if valor in (None, '') or parametro in ignorar:
+            continue
+        try:
+            queryset = queryset.filter(**{lookup: converter(valor)})
+        except (ValueError, ArithmeticError):
+            erros[parametro] = 'Número inválido'
+    if erros:
+        raise ValidationError(erros)
+
+    return queryset
+
+
+# ---------- facetas ----------
+
+# Faceta → parâmetros que ela ignora (a contagem de cada gênero
+# não pode depender do gênero já escolhido)
+IGNORAR_POR_FACETA = {
+    'genero': ('genero',),
+    'decada': ('ano_min', 'ano_max'),
+    'nota': ('nota_min',),
+}
+
+
+def facetas(filtros):
+    """
+    Contagens por gênero, década e faixa de nota (uma consulta: UNION ALL
+    de três GROUP BY)
+
+    Retorna:
+        {'generos': [{'genero': 'Ação', 'total': 12}, ...],
+         'decadas': [{'decada': 1990, 'total': 7}, ...],
+         'notas': [{'nota_min': 4, 'total': 20}, ...]}
+    "notas" é acumulado (nota_min=4 conta todos com nota ≥ 4),
+    igual ao filtro nota_min
+    """
+    from .models import Movie
+
+    def base(faceta):
+        return filtrar(Movie.objects.order_by(), filtros, IGNORAR_POR_FACETA[faceta])
+
+    def agrupar(queryset, faceta, chave, rotulo):
+        return (
+            queryset.annotate(chave=chave)
+            .values('chave')
+            .annotate(faceta=Value(faceta), rotulo=rotulo, total=Count('id'))
+            .values_list('faceta', 'chave', 'rotulo', 'total')
+        )
+
+    texto = CharField()
+    generos = agrupar(base('genero'), 'genero', F('genero_normalizado'), Min('genero'))
+    decadas = agrupar(
+        base('decada'), 'decada',
+        Cast(F('ano') / 10 * 10, texto), Cast(Value(''), texto),
+    )
+    notas = agrupar(
+        base('nota'), 'nota',
+        Cast(Cast(Floor('nota_media'), IntegerField()), texto), Cast(Value(''), texto),
+    )
+
+    resultado = {'generos': [], 'decadas': [], 'notas': []}
+    por_nota = {}
+    for faceta, chave, rotulo, total in generos.union(decadas, notas, all=True):
+        if faceta == 'genero':
+            resultado['generos'].append({'genero': rotulo, 'total': total})
+        elif faceta == 'decada':
+            resultado['decadas'].append({'decada': int(chave), 'total': total})
+        else:
+            por_nota[int(chave)] = total
+
+    resultado['generos'].sort(key=lambda g: (-g['total'], dobrar(g['genero'])))
+    resultado['decadas'].sort(key=lambda d: d['decada'])
+
+    acumulado = 0
+    for nota in sorted(por_nota, reverse=True):
+        acumulado += por_nota[nota]
+        resultado['notas'].append({'nota_min': nota, 'total': acumulado})
+    resultado['notas'].reverse()
+
+    return resultado
@@ -0,0 +1,120 @@
+"""
+BENCH_SERIALIZERS.PY - Mede a serialização das listas
+
+Compara, em linhas por segundo (consulta ao banco incluída):
+- DRF padrão (ListSerializer + to_representation por item)
+- Caminho rápido a partir dos objetos (lista/página)
+- Caminho rápido a partir do QuerySet (values_list)
+
+Cria filmes/reviews de teste numa transação que é desfeita no fim
+(o banco não muda). Confere também que o JSON sai idêntico.
+
+Uso:
+    python manage.py bench_serializers
+    python manage.py bench_serializers --linhas 5000 --repeticoes 10
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from movies.models import Movie
+from movies.serializers import MovieListSerializer
+from reviews.models import Review
+from reviews.serializers import ReviewSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compara a serialização padrão do DRF com o caminho rápido das listas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--linhas',
+            type=int,
+            default=2000,
+            help='Quantidade de filmes e de reviews serializados (padrão: 2000)',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Quantas vezes cada medição roda; vale a melhor (padrão: 5)',
+        )
+
+    def handle(self, *args, **options):
+        linhas = options['linhas']
+        self.repeticoes = options['repeticoes']
+
+        with transaction.atomic():
+            self.criar_dados(linhas)
+
+            filmes = Movie.objects.only('id', 'titulo', 'ano', 'genero', 'poster', 'nota_media')[:linhas]
+            reviews = Review.objects.select_related('filme')[:linhas]
+
+            self.comparar('🎬 MovieListSerializer', MovieListSerializer, filmes)
+            self.comparar('⭐ ReviewSerializer', ReviewSerializer, reviews)
+
+            transaction.set_rollback(True)
+
+    def criar_dados(self, linhas):
+        faltam = linhas - Movie.objects.count()
+        if faltam > 0:
+            Movie.objects.bulk_create(
+                Movie(
+                    titulo=f'Bench {i}', ano=1950 + i % 75, genero='Drama',
+                    sinopse='...', poster='https://exemplo.com/p.jpg',
+                    nota_media='3.5',
+                )
+                for i in range(faltam)
+            )
+        faltam = linhas - Review.objects.count()
+        if faltam > 0:
+            ids = list(Movie.objects.values_list('id', flat=True)[:linhas])
+            Review.objects.bulk_create(
+                Review(usuario=f'u{i}', filme_id=ids[i % len(ids)], nota=1 + i % 5, comentario='Bom')
+                for i in range(faltam)
+            )
+
+    def medir(self, funcao):
+        melhor = None
+        for _ in range(self.repeticoes):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            duracao = time.perf_counter() - inicio
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        return melhor, resultado
+
+    def comparar(self, titulo, serializer_class, queryset):
+        # .all() = QuerySet novo a cada vez (a consulta entra na medição)
+        def padrao():
+            return serializers.ListSerializer(list(queryset.all()), child=serializer_class()).data
+
+        def rapido_objetos():
+            return serializer_class(list(queryset.all()), many=True).data
+
+        def rapido_values():
+            return serializer_class(queryset.all(), many=True).data
+
+        self.stdout.write(f'\n{titulo}')
+        base = None
+        saidas = []
+        for nome, funcao in [
+            ('DRF padrão', padrao),
+            ('rápido (objetos)', rapido_objetos),
+            ('rápido (values_list)', rapido_values),
+        ]:
+            duracao, dados = self.medir(funcao)
+            saidas.append(JSONRenderer().render(dados))
+            por_segundo = len(dados) / duracao if duracao else 0
+            base = base or por_segundo
+            self.stdout.write(
+                f'   {nome:<22} {por_segundo:>12,.0f} linhas/s   ({por_segundo / base:.1f}x)'
+            )
+
+        if all(saida == saidas[0] for saida in saidas):
+            self.stdout.write(self.style.SUCCESS('   ✅ JSON idêntico nos três caminhos'))
+        else:
+            self.stdout.write(self.style.ERROR('   ❌ JSON diferente entre os caminhos!'))
@@ -0,0 +1,397 @@
+"""
+BENCHMARK.PY - Mede as rotas da API (vazão e latência)
+
+Chama a aplicação WSGI de verdade (middlewares, cache, banco), sem
+servidor HTTP no meio, com N threads ao mesmo tempo. Para cada rota
+e cada nível de concorrência mede:
+- requisições por segundo
+- latência p50 / p95 / p99 (ms)
+- status das respostas (erros 5xx contam à parte)
+
+O resultado sai em JSON (com o commit atual) para comparar execuções:
+    python manage.py seed_synthetic --filmes 100000 --reviews 1000000
+    python manage.py benchmark --saida antes.json
+    (muda o código)
+    python manage.py benchmark --saida depois.json --comparar antes.json
+
+Uso:
+    python manage.py benchmark
+    python manage.py benchmark --concorrencia 1,8,32 --requisicoes 500
+    python manage.py benchmark --rotas movie-list,movie-detail
+    python manage.py benchmark --escrita   (inclui POST/DELETE: altera o banco!)
+"""
+
+import io
+import json
+import logging
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from movies import media
+from movies.models import Movie
+from people.models import Pessoa
+from reviews.models import Review
+
+# Apps cujas rotas o benchmark cobre (avisa se alguma ficar sem cenário)
+APPS = ['movies.urls', 'reviews.urls', 'people.urls']
+
+AMOSTRA = 200
+
+
+def percentil(ordenados, p):
+    """
+    Percentil por posição (nearest-rank) de uma lista já ordenada
+    """
+    if not ordenados:
+        return None
+    posicao = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[posicao]
+
+
+def amostrar_ids(queryset, quantidade=AMOSTRA, seed=0):
+    """
+    Ids espalhados pela tabela (sem ORDER BY RANDOM(), que lê tudo)
+    """
+    limites = queryset.order_by().values_list('pk', flat=True)
+    menor = limites.order_by('pk').first()
+    maior = limites.order_by('-pk').first()
+    if menor is None:
+        return []
+    rng = random.Random(seed)
+    ids = set()
+    for _ in range(quantidade):
+        alvo = rng.randint(menor, maior)
+        ids.add(limites.filter(pk__gte=alvo).order_by('pk').first())
+    return sorted(ids)
+
+
+class Amostra:
+    """
+    Valores reais do banco usados para montar as URLs
+    """
+
+    def __init__(self):
+        self.filmes = amostrar_ids(Movie.objects.all())
+        self.reviews = amostrar_ids(Review.objects.all())
+        self.pessoas = amostrar_ids(Pessoa.objects.all())
+        dados = list(Movie.objects.filter(pk__in=self.filmes).values_list('titulo', 'genero', 'ano', 'poster'))
+        self.palavras = sorted({palavra for titulo, *_ in dados for palavra in titulo.split() if len(palavra) > 2})
+        self.generos = sorted({genero.split(' / ')[0] for _, genero, _, _ in dados})
+        self.anos = sorted({ano for _, _, ano, _ in dados})
+        self.imagens = sorted({poster for *_, poster in dados if media.eh_referencia(poster)})
+        # Reviews criadas para o cenário de DELETE
+        self.apagaveis = []
+        self.trava = threading.Lock()
+
+
+def rota(nome, *args, **params):
+    caminho = reverse(nome, args=args)
+    return ('GET', caminho, urlencode(params), None)
+
+
+def cenarios(amostra):
+    """
+    nome da rota → função(rng) que devolve (método, caminho, query, corpo)
+
+    Rota sem dados na amostra (ex.: nenhuma imagem salva) fica de fora
+    """
+    a = amostra
+    leitura = {
+        'movie-list': lambda r: rota('movie-list', ordering=r.choice(['-ano', '-nota_media', 'titulo'])),
+        'movie-detail': lambda r: rota('movie-detail', r.choice(a.filmes)),
+        'movie-similar': lambda r: rota('movie-similar', r.choice(a.filmes)),
+        'movie-search': lambda r: rota('movie-search', q=r.choice(a.palavras)),
+        'movie-autocomplete': lambda r: rota('movie-autocomplete', q=r.choice(a.palavras)[:r.randint(1, 4)]),
+        'movie-by-genre': lambda r: rota('movie-by-genre', r.choice(a.generos)),
+        'movie-by-year': lambda r: rota('movie-by-year', r.choice(a.anos)),
+        'movie-top-rated': lambda r: rota('movie-top-rated'),
+        'movie-trending': lambda r: rota('movie-trending'),
+        'movie-facets': lambda r: rota('movie-facets', genero=r.choice(a.generos)),
+        'movie-batch': lambda r: rota('movie-batch', ids=','.join(map(str, r.sample(a.filmes, min(10, len(a.filmes)))))),
+        'movie-media': lambda r: rota('movie-media', r.choice(a.imagens)),
+        'movie-cache-stats': lambda r: rota('movie-cache-stats'),
+        'review-list': lambda r: rota('review-list'),
+        'review-detail': lambda r: rota('review-detail', r.choice(a.reviews)),
+        'movie-reviews': lambda r: rota('movie-reviews', r.choice(a.filmes)),
+        'people-list': lambda r: rota('people-list', q=r.choice(a.palavras)[:3]),
+        'people-movies': lambda r: rota('people-movies', r.choice(a.pessoas)),
+    }
+    escrita = {
+        'movie-create': lambda r: ('POST', reverse('movie-create'), '', {
+            'titulo': f'Benchmark {r.random()}', 'ano': 2020, 'genero': 'Drama',
+            'sinopse': '...', 'poster': 'https://exemplo.com/benchmark.jpg', 'elenco': [],
+        }),
+        'review-create': lambda r: ('POST', reverse('review-create'), '', {
+            'usuario': 'benchmark', 'filme': r.choice(a.filmes), 'nota': r.randint(1, 5),
+        }),
+        'review-delete': lambda r: ('DELETE', reverse('review-delete', args=[apagavel(a)]), '', None),
+    }
+    vazios = {
+        'movie-detail': a.filmes, 'movie-similar': a.filmes, 'movie-search': a.palavras,
+        'movie-autocomplete': a.palavras, 'movie-by-genre': a.generos, 'movie-by-year': a.anos,
+        'movie-facets': a.generos, 'movie-batch': a.filmes, 'movie-media': a.imagens,
+        'review-detail': a.reviews, 'movie-reviews': a.filmes, 'people-list': a.palavras,
+        'people-movies': a.pessoas, 'review-create': a.filmes, 'movie-create': [True],
+    }
+    todos = {**leitura, **escrita}
+    return {nome: funcao for nome, funcao in todos.items() if vazios.get(nome, [True])}, set(escrita)
+
+
+def apagavel(amostra):
+    with amostra.trava:
+        return amostra.apagaveis.pop()
+
+
+def rotas_dos_apps():
+    from importlib import import_module
+
+    nomes = set()
+    for modulo in APPS:
+        for padrao in import_module(modulo).urlpatterns:
+            if padrao.name:
+                nomes.add(padrao.name)
+    return nomes
+
+
+class Command(BaseCommand):
+    help = 'Mede vazão e latência (p50/p95/p99) de cada rota da API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concorrencia',
+            default='1,8,32',
+            help='Níveis de concorrência (threads), separados por vírgula (padrão: 1,8,32)',
+        )
+        parser.add_argument(
+            '--requisicoes',
+            type=int,
+            default=200,
+            help='Requisições por rota em cada nível (padrão: 200)',
+        )
+        parser.add_argument(
+            '--aquecimento',
+            type=int,
+            default=5,
+            help='Requisições não medidas antes de cada rota (padrão: 5)',
+        )
+        parser.add_argument(
+            '--rotas',
+            default='',
+            help='Só estas rotas (nomes do urls.py, separados por vírgula)',
+        )
+        parser.add_argument(
+            '--escrita',
+            action='store_true',
+            help='Inclui as rotas de escrita (cria filmes e reviews no banco)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Semente das URLs sorteadas (padrão: 0)',
+        )
+        parser.add_argument(
+            '--saida',
+            help='Arquivo JSON com os resultados',
+        )
+        parser.add_argument(
+            '--comparar',
+            help='JSON de uma execução anterior: mostra a diferença',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            niveis = [int(n) for n in options['concorrencia'].split(',') if n.strip()]
+        except ValueError:
+            raise CommandError('--concorrencia deve ser uma lista de números (ex.: 1,8,32)')
+        requisicoes = options['requisicoes']
+        self.seed = options['seed']
+
+        amostra = Amostra()
+        disponiveis, de_escrita = cenarios(amostra)
+
+        for nome in sorted(rotas_dos_apps() - set(disponiveis)):
+            self.stdout.write(self.style.WARNING(f'  ⚠️  Rota sem cenário (ou sem dados na amostra): {nome}'))
+
+        escolhidas = [nome.strip() for nome in options['rotas'].split(',') if nome.strip()]
+        if escolhidas:
+            desconhecidas = set(escolhidas) - set(disponiveis)
+            if desconhecidas:
+                raise CommandError(f'Rotas sem cenário: {", ".join(sorted(desconhecidas))}')
+        else:
+            escolhidas = [nome for nome in disponiveis if options['escrita'] or nome not in de_escrita]
+
+        if 'review-delete' in escolhidas:
+            # Uma review por DELETE medido (criadas pelo save(): contadores certos)
+            quantidade = (requisicoes + options['aquecimento']) * len(niveis)
+            filme = Movie.objects.get(pk=amostra.filmes[0]) if amostra.filmes else None
+            if filme is None:
+                escolhidas.remove('review-delete')
+            for _ in range(quantidade if filme else 0):
+                amostra.apagaveis.append(Review.objects.create(usuario='benchmark', filme=filme, nota=3).pk)
+
+        app = get_wsgi_application()
+        resultado = {
+            'commit': commit_atual(),
+            'data': timezone.now().isoformat(),
+            'banco': connection.vendor,
+            'filmes': Movie.objects.count(),
+            'reviews': Review.objects.count(),
+            'requisicoes_por_nivel': requisicoes,
+            'rotas': {},
+        }
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🏁 Benchmark: {len(escolhidas)} rotas × concorrência {niveis} '
+            f'({resultado["filmes"]} filmes, {resultado["reviews"]} reviews)\n'
+        ))
+        self.stdout.write(f'   {"rota":<22}{"conc.":>6}{"req/s":>10}{"p50":>9}{"p95":>9}{"p99":>9}  erros')
+
+        # Erros 5xx entram na contagem; o traceback de cada um só atrapalharia
+        logger = logging.getLogger('django.request')
+        nivel_log = logger.level
+        logger.setLevel(logging.CRITICAL)
+        try:
+            self.medir_rotas(app, escolhidas, disponiveis, niveis, requisicoes, options['aquecimento'], resultado)
+        finally:
+            logger.setLevel(nivel_log)
+
+        if options['comparar']:
+            self.comparar(resultado, options['comparar'])
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'\n💾 Resultados em {options["saida"]}'))
+        else:
+            self.stdout.write('\n' + json.dumps(resultado, ensure_ascii=False))
+
+    def medir_rotas(self, app, escolhidas, disponiveis, niveis, requisicoes, aquecimento, resultado):
+        for nome in escolhidas:
+            gerar = disponiveis[nome]
+            resultado['rotas'][nome] = {}
+            for nivel in niveis:
+                medida = self.medir(app, gerar, nivel, requisicoes, aquecimento)
+                resultado['rotas'][nome][str(nivel)] = medida
+                self.stdout.write(
+                    f'   {nome:<22}{nivel:>6}{medida["rps"]:>10.1f}'
+                    f'{medida["p50_ms"]:>9.2f}{medida["p95_ms"]:>9.2f}{medida["p99_ms"]:>9.2f}'
+                    f'  {medida["erros"]}'
+                )
+
+    def medir(self, app, gerar, nivel, quantidade, aquecimento):
+        rng = random.Random(self.seed)
+        pedidos = [gerar(rng) for _ in range(quantidade + aquecimento)]
+
+        for pedido in pedidos[:aquecimento]:
+            chamar(app, pedido)
+
+        # Cada thread tem a própria conexão com o banco (o Django
+        # fecha/reaproveita no fim de cada requisição, como no servidor)
+        inicio = time.perf_counter()
+        if nivel == 1:
+            respostas = [chamar(app, pedido) for pedido in pedidos[aquecimento:]]
+        else:
+            with ThreadPoolExecutor(max_workers=nivel) as executor:
+                respostas = list(executor.map(lambda pedido: chamar(app, pedido), pedidos[aquecimento:]))
+        duracao = time.perf_counter() - inicio
+
+        latencias = sorted(latencia * 1000 for _, latencia in respostas)
+        status = Counter(codigo for codigo, _ in respostas)
+        return {
+            'rps': round(len(respostas) / duracao, 2) if duracao else 0,
+            'p50_ms': round(percentil(latencias, 50), 3),
+            'p95_ms': round(percentil(latencias, 95), 3),
+            'p99_ms': round(percentil(latencias, 99), 3),
+            'media_ms': round(sum(latencias) / len(latencias), 3),
+            'erros': sum(total for codigo, total in status.items() if codigo >= 500),
+            'status': {str(codigo): total for codigo, total in sorted(status.items())},
+        }
+
+    def comparar(self, atual, caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 Comparando com {anterior.get("commit") or caminho} (negativo = mais rápido)'
+        ))
+        for nome, niveis in atual['rotas'].items():
+            for nivel, medida in niveis.items():
+                antes = anterior.get('rotas', {}).get(nome, {}).get(nivel)
+                if not antes:
+                    continue
+                self.stdout.write(
+                    f'   {nome:<22}{nivel:>6}  p95 {variacao(antes["p95_ms"], medida["p95_ms"])}'
+                    f'   req/s {variacao(antes["rps"], medida["rps"])}'
+                )
+
+
+def variacao(antes, depois):
+    if not antes:
+        return '   n/a'
+    return f'{(depois - antes) / antes * 100:+6.1f}%'
+
+
+def chamar(app, pedido):
+    """
+    Uma requisição pela aplicação WSGI → (status, segundos)
+    """
+    metodo, caminho, query, corpo = pedido
+    dados = json.dumps(corpo).encode() if corpo is not None else b''
+    environ = {
+        'REQUEST_METHOD': metodo,
+        # PEP 3333: o caminho vai decodificado, como bytes UTF-8 lidos em latin-1
+        'PATH_INFO': unquote(caminho).encode().decode('iso-8859-1'),
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(dados)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(dados),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    codigo = []
+
+    def start_response(status, headers, exc_info=None):
+        codigo.append(int(status.split()[0]))
+
+    inicio = time.perf_counter()
+    resposta = app(environ, start_response)
+    try:
+        for _ in resposta:
+            pass
+    finally:
+        if hasattr(resposta, 'close'):
+            resposta.close()
+    return codigo[0], time.perf_counter() - inicio
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
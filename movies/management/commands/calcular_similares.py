@@ -0,0 +1,66 @@
+"""
+CALCULAR_SIMILARES.PY - Pré-calcula os "filmes parecidos"
+
+Monta os vetores de gênero, elenco e reviews de todos os filmes e
+guarda os K vizinhos mais parecidos de cada um (tabela FilmeSimilar).
+Ver movies/similares.py.
+
+Uso:
+    python manage.py calcular_similares
+    python manage.py calcular_similares --incremental
+    python manage.py calcular_similares --k 30 --bloco 200
+
+Rode --incremental com frequência (ex.: a cada hora) e o completo
+de vez em quando (ex.: uma vez por semana)
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.similares import BLOCO_PADRAO, K_PADRAO, calcular
+
+
+class Command(BaseCommand):
+    help = 'Calcula os filmes similares (top-K por filme)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Só os filmes cujo gênero, elenco ou reviews mudaram',
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=K_PADRAO,
+            help=f'Vizinhos guardados por filme (padrão: {K_PADRAO})',
+        )
+        parser.add_argument(
+            '--bloco',
+            type=int,
+            default=BLOCO_PADRAO,
+            help=f'Filmes calculados por vez; menor = menos memória (padrão: {BLOCO_PADRAO})',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+
+        def progresso(feitos, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  🔄 {feitos}/{total} filmes')
+
+        total = calcular(
+            k=options['k'],
+            bloco=options['bloco'],
+            incremental=options['incremental'],
+            progresso=progresso,
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ Similares calculados!'
+                f'\n   🎬 {total} filmes recalculados'
+                f'\n   ⏱️  {time.monotonic() - inicio:.1f}s'
+            )
+        )
@@ -0,0 +1,30 @@
+"""
+COMPACTAR_RANKINGS.PY - Manutenção periódica dos rankings
+
+Recalcula a média do catálogo (nota bayesiana), move a época da
+tendência para agora e refaz a tendência a partir das reviews da
+janela (quem ficou fora dela vai a zero).
+Rode uma vez por dia (cron / scheduler da hospedagem).
+
+Uso:
+    python manage.py compactar_rankings
+"""
+
+from django.core.management.base import BaseCommand
+
+from movies.rankings import compactar
+
+
+class Command(BaseCommand):
+    help = 'Compacta os rankings (nota bayesiana e tendência) dos filmes'
+
+    def handle(self, *args, **options):
+        resumo = compactar()
+
+        linhas = [
+            '\n✅ Rankings compactados!',
+            f'   ⭐ Média do catálogo: {resumo["media"]:.2f}',
+            f'   🧹 {resumo["zerados"]} filmes saíram da tendência',
+            f'   🔄 {resumo["recalculados"]} filmes com tendência recalculada',
+        ]
+        self.stdout.write(self.style.SUCCESS('\n'.join(linhas)))
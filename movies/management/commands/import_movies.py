@@ -2,75 +2,281 @@
 IMPORT_MOVIES.PY - Script para importar filmes do JSON
 
 COMPATÍVEL COM FORMATO EM INGLÊS E PORTUGUÊS!
+
+Uso:
+    python manage.py import_movies
+    python manage.py import_movies catalogo.json --bulk --batch-size 1000
+    cat catalogo.ndjson | python manage.py import_movies -
+
+O arquivo é lido registro por registro (array JSON ou NDJSON),
+sem carregar tudo na memória. Se a importação cair no meio,
+rodar de novo continua do último lote gravado (arquivo .checkpoint).
 """
 
+import io
 import json
+import os
+import sys
 from django.core.management.base import BaseCommand
+from django.db import reset_queries, transaction
+from django.utils import timezone
+from movies.cache import invalidar
 from movies.models import Movie
+from movies.media import armazenar_imagem
+from movies.search import get_backend
+from movies.texto import dobrar
+from people.elenco import sincronizar as sincronizar_elenco
+
+# Campos atualizados quando o filme já existe
+CAMPOS_ATUALIZAVEIS = [
+    'genero', 'genero_normalizado', 'sinopse', 'poster', 'backdrop', 'elenco', 'trailer',
+    'duracao', 'similares_desatualizados', 'updated_at',
+]
+
+
+# Tamanho de cada leitura do arquivo (caracteres)
+TAMANHO_BLOCO = 1 << 16
+
+# Maior registro aceito: passou disso sem fechar o objeto, o JSON
+# está quebrado (não lê o resto do arquivo para a memória)
+TAMANHO_MAXIMO_REGISTRO = 1 << 24
+
+SEPARADORES = ' \t\r\n,'
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+class LoteFalhou(Exception):
+    """
+    Um lote não foi gravado (rollback): a importação para e o
+    checkpoint fica no último lote gravado
+    """
+
+
+def ler_registros(arquivo, tamanho_bloco=TAMANHO_BLOCO, tamanho_maximo=TAMANHO_MAXIMO_REGISTRO):
+    """
+    Lê registros JSON um a um, sem carregar o arquivo inteiro
+
+    Aceita:
+    - array JSON:  [{...}, {...}, ...]
+    - NDJSON:      {...}\n{...}\n...
+
+    EXPLICAÇÃO:
+    - Lê blocos de 64 KB e decodifica um objeto por vez (raw_decode)
+    - Se o objeto ainda não chegou inteiro, lê mais um bloco
+    - Só o registro atual (e o resto do bloco) fica na memória
+    - Registro que passa de tamanho_maximo sem fechar → erro na hora
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    fim_arquivo = False
+    em_array = None
+
+    def ler_mais():
+        nonlocal buffer, pos, fim_arquivo
+        bloco = arquivo.read(tamanho_bloco)
+        if not bloco:
+            fim_arquivo = True
+        buffer = buffer[pos:] + bloco
+        pos = 0
+
+    while True:
+        # Pula espaços, quebras de linha e vírgulas entre registros
+        while True:
+            while pos < len(buffer) and buffer[pos] in SEPARADORES:
+                pos += 1
+            if pos < len(buffer) or fim_arquivo:
+                break
+            ler_mais()
+
+        if pos >= len(buffer):
+            if em_array:
+                raise json.JSONDecodeError('Array JSON não foi fechado', buffer, pos)
+            return
+
+        if em_array is None:
+            em_array = buffer[pos] == '['
+            if em_array:
+                pos += 1
+                continue
+
+        if em_array and buffer[pos] == ']':
+            return
+
+        while True:
+            try:
+                registro, fim = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError:
+                # Registro cortado no fim do bloco: lê mais e tenta de novo
+                if fim_arquivo:
+                    raise
+                if len(buffer) - pos > tamanho_maximo:
+                    raise json.JSONDecodeError(
+                        f'Registro com mais de {tamanho_maximo} caracteres', buffer, pos
+                    )
+                ler_mais()
+
+        pos = fim
+        yield registro
+
+
+class Checkpoint:
+    """
+    Guarda quantos registros já foram gravados no banco
+
+    Arquivo JSON ao lado do catálogo (ex: movies.json.checkpoint).
+    Só vale para o MESMO arquivo (mesmo tamanho e data de modificação).
+    """
+
+    def __init__(self, caminho, origem):
+        self.caminho = caminho
+        self.origem = origem
+
+    def assinatura(self):
+        if self.origem == '-':
+            return {'arquivo': '-'}
+        info = os.stat(self.origem)
+        return {
+            'arquivo': os.path.abspath(self.origem),
+            'tamanho': info.st_size,
+            'modificado': info.st_mtime,
+        }
+
+    def carregar(self):
+        """
+        Quantos registros pular (0 se não há checkpoint válido)
+        """
+        if not self.caminho or not os.path.exists(self.caminho):
+            return 0
+        try:
+            with open(self.caminho, encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if dados.get('origem') != self.assinatura():
+            return 0
+        return int(dados.get('registros', 0))
+
+    def salvar(self, registros):
+        if not self.caminho:
+            return
+        temporario = f'{self.caminho}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'origem': self.assinatura(), 'registros': registros}, f)
+        # Troca atômica: um crash nunca deixa o checkpoint pela metade
+        os.replace(temporario, self.caminho)
+
+    def apagar(self):
+        if self.caminho and os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+def normalizar_registro(movie_data):
+    """
+    Registro do JSON (inglês ou português) → (titulo, ano, defaults)
+    """
+    # Compatível com formato em INGLÊS ou PORTUGUÊS
+    titulo = movie_data.get('title') or movie_data.get('titulo')
+    ano = movie_data.get('year') or movie_data.get('ano') or movie_data.get('Ano')
+    genero = movie_data.get('genre') or movie_data.get('genero') or movie_data.get('Gênero')
+    sinopse = movie_data.get('synopsis') or movie_data.get('sinopse')
+    elenco = movie_data.get('cast') or movie_data.get('elenco', [])
+    trailer = movie_data.get('trailer') or movie_data.get('Trailer', '')
+
+    if not titulo or not ano:
+        raise RegistroInvalido('Filme sem título ou ano')
+
+    try:
+        ano = int(ano)
+    except (TypeError, ValueError):
+        raise RegistroInvalido(f'Ano inválido: {ano}')
+
+    defaults = {
+        'genero': genero or 'Desconhecido',
+        'sinopse': sinopse or '',
+        # data URI vira arquivo em disco (só a referência vai pro banco)
+        'poster': armazenar_imagem(movie_data.get('poster', '')),
+        'backdrop': armazenar_imagem(movie_data.get('backdrop', '')),
+        'elenco': elenco,
+        'trailer': trailer,
+        'duracao': movie_data.get('duracao'),
+    }
+    return titulo, ano, defaults
+
 
 class Command(BaseCommand):
-    help = 'Importa filmes do arquivo movies.json'
-    
+    help = 'Importa filmes de um arquivo JSON/NDJSON (padrão: movies.json)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'arquivo',
+            nargs='?',
+            default='movies.json',
+            help='Arquivo com os filmes (array JSON ou NDJSON). Use "-" para ler da entrada padrão',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Importa em lotes (bulk_create/bulk_update), para catálogos grandes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de filmes por lote/transação (padrão: 500)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Arquivo de checkpoint (padrão: <arquivo>.checkpoint; desligado para "-")',
+        )
+        parser.add_argument(
+            '--reiniciar',
+            action='store_true',
+            help='Ignora o checkpoint e importa desde o primeiro registro',
+        )
+
     def handle(self, *args, **options):
-        file_path = 'movies.json'
-        
+        file_path = options['arquivo']
+        self.verbosity = options['verbosity']
+
+        caminho_checkpoint = options['checkpoint']
+        if caminho_checkpoint is None and file_path != '-':
+            caminho_checkpoint = f'{file_path}.checkpoint'
+        checkpoint = Checkpoint(caminho_checkpoint, file_path)
+
         try:
-            self.stdout.write('📂 Lendo arquivo movies.json...')
-            with open(file_path, 'r', encoding='utf-8') as f:
-                movies_data = json.load(f)
-            
-            created = 0
-            updated = 0
-            errors = 0
-            
-            for movie_data in movies_data:
-                try:
-                    # Compatível com formato em INGLÊS ou PORTUGUÊS
-                    titulo = movie_data.get('title') or movie_data.get('titulo')
-                    ano = movie_data.get('year') or movie_data.get('ano') or movie_data.get('Ano')
-                    genero = movie_data.get('genre') or movie_data.get('genero') or movie_data.get('Gênero')
-                    sinopse = movie_data.get('synopsis') or movie_data.get('sinopse')
-                    elenco = movie_data.get('cast') or movie_data.get('elenco', [])
-                    trailer = movie_data.get('trailer') or movie_data.get('Trailer', '')
-                    
-                    if not titulo or not ano:
-                        errors += 1
-                        self.stdout.write(
-                            self.style.ERROR(f'  ✗ Filme sem título ou ano')
-                        )
-                        continue
-                    
-                    movie, was_created = Movie.objects.update_or_create(
-                        titulo=titulo,
-                        ano=ano,
-                        defaults={
-                            'genero': genero or 'Desconhecido',
-                            'sinopse': sinopse or '',
-                            'poster': movie_data.get('poster', ''),
-                            'backdrop': movie_data.get('backdrop', ''),
-                            'elenco': elenco,
-                            'trailer': trailer,
-                            'duracao': movie_data.get('duracao'),
-                        }
-                    )
-                    
-                    if was_created:
-                        created += 1
-                        self.stdout.write(
-                            self.style.SUCCESS(f'  ✓ Criado: {movie.titulo} ({movie.ano})')
-                        )
-                    else:
-                        updated += 1
-                        self.stdout.write(
-                            self.style.WARNING(f'  ↻ Atualizado: {movie.titulo} ({movie.ano})')
-                        )
-                
-                except Exception as e:
-                    errors += 1
+            if options['reiniciar']:
+                checkpoint.apagar()
+
+            nome = 'entrada padrão' if file_path == '-' else file_path
+            self.stdout.write(f'📂 Lendo {nome}...')
+
+            with self.abrir(file_path) as f:
+                registros = enumerate(ler_registros(f), 1)
+
+                pular = checkpoint.carregar()
+                if pular:
                     self.stdout.write(
-                        self.style.ERROR(f'  ✗ Erro: {str(e)}')
+                        self.style.WARNING(f'⏩ Retomando do checkpoint: pulando {pular} registros')
+                    )
+                    registros = ((i, r) for i, r in registros if i > pular)
+
+                if options['bulk']:
+                    created, updated, errors = self.importar_em_lotes(
+                        registros, options['batch_size'], checkpoint
+                    )
+                else:
+                    created, updated, errors = self.importar_um_a_um(
+                        registros, options['batch_size'], checkpoint
                     )
-            
+
+            # Terminou tudo: o checkpoint não serve mais
+            checkpoint.apagar()
+
             # Mensagem final
             self.stdout.write(
                 self.style.SUCCESS(
@@ -81,16 +287,170 @@ class Command(BaseCommand):
                     f'\n   📁 Total: {Movie.objects.count()} filmes no banco'
                 )
             )
-            
+
         except FileNotFoundError:
             self.stdout.write(
-                self.style.ERROR('❌ Arquivo movies.json não encontrado na raiz do projeto!')
+                self.style.ERROR(f'❌ Arquivo {file_path} não encontrado!')
+            )
+        except json.JSONDecodeError as e:
+            self.stdout.write(
+                self.style.ERROR(f'❌ Erro ao ler JSON ({e.msg}). Verifique o formato do arquivo.')
             )
-        except json.JSONDecodeError:
+        except LoteFalhou as e:
             self.stdout.write(
-                self.style.ERROR('❌ Erro ao ler JSON. Verifique o formato do arquivo.')
+                self.style.ERROR(f'❌ {e}\n   Rode de novo para continuar deste lote (checkpoint).')
             )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'❌ Erro: {str(e)}')
-            )
\ No newline at end of file
+            )
+
+    def abrir(self, file_path):
+        if file_path == '-':
+            # Não fecha o stdin de verdade ao sair do "with"
+            stdin = getattr(sys.stdin, 'buffer', None)
+            if stdin is None:
+                return io.StringIO(sys.stdin.read())
+            return io.TextIOWrapper(stdin, encoding='utf-8', closefd=False)
+        return open(file_path, 'r', encoding='utf-8')
+
+    def importar_um_a_um(self, registros, batch_size, checkpoint):
+        """
+        Modo padrão: um update_or_create por filme (mostra cada linha)
+
+        Cada filme já é gravado na hora; o checkpoint é salvo
+        a cada batch_size registros
+        """
+        created = 0
+        updated = 0
+        errors = 0
+
+        for indice, movie_data in registros:
+            try:
+                titulo, ano, defaults = normalizar_registro(movie_data)
+
+                movie, was_created = Movie.objects.update_or_create(
+                    titulo=titulo,
+                    ano=ano,
+                    defaults=defaults,
+                )
+
+                if was_created:
+                    created += 1
+                    self.stdout.write(
+                        self.style.SUCCESS(f'  ✓ Criado: {movie.titulo} ({movie.ano})')
+                    )
+                else:
+                    updated += 1
+                    self.stdout.write(
+                        self.style.WARNING(f'  ↻ Atualizado: {movie.titulo} ({movie.ano})')
+                    )
+
+            except Exception as e:
+                errors += 1
+                self.stdout.write(
+                    self.style.ERROR(f'  ✗ Erro: {str(e)}')
+                )
+
+            if indice % batch_size == 0:
+                checkpoint.salvar(indice)
+                # Com DEBUG=True o Django guarda todo SQL executado
+                reset_queries()
+
+        return created, updated, errors
+
+    def importar_em_lotes(self, registros, batch_size, checkpoint):
+        """
+        Modo --bulk
+
+        EXPLICAÇÃO:
+        - Junta batch_size registros e busca as chaves (titulo, ano)
+          que já existem no banco em 1 query por lote
+        - Separa o lote em "novos" (bulk_create) e "existentes" (bulk_update)
+        - Cada lote roda numa transação (1 commit por lote, não por filme)
+        - Depois do commit, salva o checkpoint
+        - Lote que falha (erro do banco): para tudo sem mexer no
+          checkpoint; rodar de novo recomeça desse lote
+        - Mostra só um resumo por lote
+        """
+        created = 0
+        updated = 0
+        errors = 0
+        lote = {}
+        numero = 0
+        ultimo = 0
+
+        def gravar():
+            nonlocal created, updated, numero
+            numero += 1
+            try:
+                criados, atualizados = self.gravar_lote(lote, batch_size)
+            except Exception as e:
+                # Nada do lote foi gravado: o checkpoint NÃO avança
+                # (o --resume tenta este lote de novo)
+                raise LoteFalhou(f'Lote {numero} não foi gravado: {e}') from e
+            created += criados
+            updated += atualizados
+            self.stdout.write(
+                f'  📦 Lote {numero}: {criados} criados, {atualizados} atualizados '
+                f'({created + updated} no total)'
+            )
+            checkpoint.salvar(ultimo)
+            # Com DEBUG=True o Django guarda todo SQL executado
+            reset_queries()
+
+        for indice, movie_data in registros:
+            ultimo = indice
+            try:
+                titulo, ano, defaults = normalizar_registro(movie_data)
+            except Exception as e:
+                errors += 1
+                if self.verbosity > 1:
+                    self.stdout.write(self.style.ERROR(f'  ✗ Erro: {str(e)}'))
+                continue
+
+            # Mesmo filme repetido no lote: vale o último
+            lote[(titulo, ano)] = defaults
+            if len(lote) >= batch_size:
+                gravar()
+                lote = {}
+
+        if lote:
+            gravar()
+
+        return created, updated, errors
+
+    def gravar_lote(self, lote, batch_size):
+        agora = timezone.now()
+        novos = []
+        atualizar = []
+
+        # Chaves do lote que já existem no banco (1 query)
+        titulos = {titulo for titulo, _ in lote}
+        existentes = {
+            (titulo, ano): pk
+            for pk, titulo, ano in Movie.objects.filter(titulo__in=titulos).values_list('id', 'titulo', 'ano')
+        }
+
+        for (titulo, ano), defaults in lote.items():
+            movie = Movie(titulo=titulo, ano=ano, updated_at=agora, **defaults)
+            # bulk_* não chama save(): normaliza o gênero aqui
+            movie.genero_normalizado = dobrar(movie.genero)
+            pk = existentes.get((titulo, ano))
+            if pk is None:
+                novos.append(movie)
+            else:
+                movie.pk = pk
+                atualizar.append(movie)
+
+        with transaction.atomic():
+            Movie.objects.bulk_create(novos, batch_size=batch_size)
+            Movie.objects.bulk_update(atualizar, CAMPOS_ATUALIZAVEIS, batch_size=batch_size)
+
+            # bulk_* não dispara sinais: atualiza o índice de busca,
+            # as pessoas do elenco e invalida o cache aqui
+            get_backend().indexar_varios(novos + atualizar)
+            sincronizar_elenco(novos + atualizar)
+            invalidar(movie.pk for movie in atualizar)
+
+        return len(novos), len(atualizar)
@@ -0,0 +1,27 @@
+"""
+REBUILD_SEARCH_INDEX.PY - Refaz o índice de busca
+
+Útil depois de importar filmes direto no banco
+ou se o índice ficar fora de sincronia.
+
+Uso:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from movies.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de filmes'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        self.stdout.write(f'🔎 Reconstruindo índice ({backend.__class__.__name__})...')
+
+        with transaction.atomic():
+            total = backend.reconstruir()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} filmes indexados'))
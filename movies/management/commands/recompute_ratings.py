@@ -0,0 +1,108 @@
+"""
+RECOMPUTE_RATINGS.PY - Corrige os contadores de avaliações
+
+Recalcula soma_notas, total_avaliacoes, nota_media e nota_bayesiana
+de cada filme a partir das reviews e corrige só os que estiverem diferentes.
+
+Uso:
+    python manage.py recompute_ratings
+    python manage.py recompute_ratings --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from movies.cache import invalidar
+from movies.models import Movie, ParametrosRanking, calcular_media
+
+CAMPOS = ['soma_notas', 'total_avaliacoes', 'nota_media', 'nota_bayesiana']
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de avaliações (soma/total/média) dos filmes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Só mostra quantos filmes estão divergentes, sem corrigir',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de filmes corrigidos por transação (padrão: 500)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        # Um único SELECT agrupado: contadores atuais + valores reais
+        filmes = (
+            Movie.objects
+            .only('id', 'titulo', 'ano', *CAMPOS)
+            .annotate(
+                soma_real=Coalesce(Sum('reviews__nota'), 0),
+                total_real=Count('reviews'),
+            )
+            .order_by('id')
+        )
+
+        parametros = ParametrosRanking.atual()
+
+        verificados = 0
+        corrigidos = 0
+        pendentes = []
+
+        for movie in filmes.iterator(chunk_size=batch_size):
+            verificados += 1
+            media_real = calcular_media(movie.soma_real, movie.total_real)
+            bayesiana_real = parametros.nota_bayesiana(movie.soma_real, movie.total_real)
+
+            if (
+                movie.soma_notas == movie.soma_real
+                and movie.total_avaliacoes == movie.total_real
+                and movie.nota_media == media_real
+                and abs(movie.nota_bayesiana - bayesiana_real) < 1e-9
+            ):
+                continue
+
+            corrigidos += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'  ↻ {movie.titulo} ({movie.ano}): '
+                        f'{movie.total_avaliacoes} → {movie.total_real} avaliações, '
+                        f'média {movie.nota_media} → {media_real}'
+                    )
+                )
+
+            movie.soma_notas = movie.soma_real
+            movie.total_avaliacoes = movie.total_real
+            movie.nota_media = media_real
+            movie.nota_bayesiana = bayesiana_real
+            pendentes.append(movie)
+
+            if len(pendentes) >= batch_size and not dry_run:
+                self._salvar(pendentes)
+                pendentes = []
+
+        if pendentes and not dry_run:
+            self._salvar(pendentes)
+
+        acao = 'divergentes' if dry_run else 'corrigidos'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ Verificação concluída!'
+                f'\n   📊 {verificados} filmes verificados'
+                f'\n   🔄 {corrigidos} filmes {acao}'
+            )
+        )
+
+    def _salvar(self, filmes):
+        with transaction.atomic():
+            Movie.objects.bulk_update(filmes, CAMPOS)
+            invalidar(movie.pk for movie in filmes)
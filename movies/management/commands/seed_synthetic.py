@@ -0,0 +1,277 @@
+"""
+SEED_SYNTHETIC.PY - Gera um catálogo sintético para medir desempenho
+
+O mesmo --seed gera sempre o mesmo catálogo (dá para comparar medições
+entre commits). Distribuições parecidas com um catálogo de verdade:
+- gêneros com pesos diferentes (muito drama, pouco documentário),
+  alguns filmes com dois gêneros ("Ação / Aventura")
+- anos concentrados nos mais recentes
+- elenco tirado de um "mundo" de atores em que poucos aparecem muito
+- reviews com cauda longa: poucos filmes têm muitas, a maioria tem poucas;
+  as notas giram em torno da "qualidade" de cada filme; as datas
+  se concentram nos últimos meses
+
+Tudo entra com bulk_create em lotes (índice de busca e pessoas
+do elenco junto). No fim, rankings recalculados e cache invalidado.
+
+Uso:
+    python manage.py seed_synthetic
+    python manage.py seed_synthetic --filmes 1000000 --reviews 20000000 --lote 5000
+
+Use um banco separado (DATABASE_URL): os filmes se somam aos que existem
+"""
+
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from movies.cache import invalidar
+from movies.models import Movie, calcular_media
+from movies.rankings import compactar
+from movies.search import get_backend
+from movies.texto import dobrar
+from people.elenco import sincronizar as sincronizar_elenco
+from reviews.models import Review
+
+# (gênero, peso)
+GENEROS = [
+    ('Drama', 22), ('Comédia', 15), ('Ação', 12), ('Suspense', 8),
+    ('Terror', 7), ('Romance', 7), ('Ficção Científica', 6), ('Animação', 5),
+    ('Aventura', 5), ('Documentário', 5), ('Crime', 4), ('Fantasia', 4),
+]
+CHANCE_DOIS_GENEROS = 0.2
+
+INICIO_ANOS, FIM_ANOS, ANO_MAIS_COMUM = 1920, 2025, 2018
+
+SUBSTANTIVOS = [
+    'Noite', 'Cidade', 'Sombra', 'Rei', 'Vida', 'Casa', 'Mar', 'Fogo', 'Tempo',
+    'Luz', 'Guerra', 'Amor', 'Estrada', 'Segredo', 'Jardim', 'Ilha', 'Lenda',
+    'Caçador', 'Última Chance', 'Herança', 'Fronteira', 'Promessa', 'Viagem',
+]
+COMPLEMENTOS = [
+    'Perdida', 'Proibido', 'do Norte', 'Sem Fim', 'Eterna', 'de Vidro',
+    'das Sombras', 'Selvagem', 'do Silêncio', 'Infinito', 'de Ferro',
+    'em Chamas', 'Escondido', 'do Amanhã', 'de Inverno', 'Dourada',
+]
+NOMES = [
+    'Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Heitor',
+    'Isabela', 'João', 'Karina', 'Lucas', 'Marina', 'Nicolas', 'Olívia',
+    'Paulo', 'Renata', 'Sérgio', 'Tatiana', 'Vítor', 'Yasmin', 'Zeca',
+]
+SOBRENOMES = [
+    'Almeida', 'Barbosa', 'Cardoso', 'Duarte', 'Esteves', 'Ferreira', 'Gomes',
+    'Holanda', 'Ibrahim', 'Jardim', 'Klein', 'Lima', 'Machado', 'Nogueira',
+    'Oliveira', 'Pereira', 'Queiroz', 'Rocha', 'Santos', 'Teixeira', 'Vieira',
+]
+
+# Popularidade do filme de posição r: 1 / (r + 1) ** EXPOENTE
+EXPOENTE_POPULARIDADE = 0.8
+DIAS_DE_REVIEWS = 365
+
+
+@contextmanager
+def sem_auto_now_add(model, campo):
+    """
+    bulk_create respeita o created_at gerado (auto_now_add sobrescreveria)
+    """
+    field = model._meta.get_field(campo)
+    anterior = field.auto_now_add
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = anterior
+
+
+class Gerador:
+    """
+    Gera filmes e reviews (só objetos; quem grava é o comando)
+    """
+
+    def __init__(self, seed, filmes, reviews):
+        self.rng = random.Random(seed)
+        self.agora = timezone.now()
+        self.filmes = filmes
+
+        generos, pesos = zip(*GENEROS)
+        self.generos = list(generos)
+        self.pesos_generos = list(pesos)
+
+        self.atores = max(50, filmes // 4)
+        self.usuarios = max(100, reviews // 20)
+
+        # Posição de popularidade de cada filme (embaralhada: não depende do id)
+        self.posicoes = list(range(filmes))
+        self.rng.shuffle(self.posicoes)
+        soma = sum(1 / (r + 1) ** EXPOENTE_POPULARIDADE for r in range(filmes))
+        self.reviews_por_peso = reviews / soma if soma else 0
+
+    def nome_ator(self, indice):
+        nome = NOMES[indice % len(NOMES)]
+        sobrenome = SOBRENOMES[(indice // len(NOMES)) % len(SOBRENOMES)]
+        volta = indice // (len(NOMES) * len(SOBRENOMES))
+        if volta:
+            return f'{nome} {chr(65 + volta % 26)}{"" if volta < 26 else volta // 26}. {sobrenome}'
+        return f'{nome} {sobrenome}'
+
+    def escolher_ator(self):
+        # Poucos atores aparecem muito (índices baixos)
+        return self.nome_ator(int(self.atores * self.rng.random() ** 3))
+
+    def genero(self):
+        primeiro, segundo = self.rng.choices(self.generos, weights=self.pesos_generos, k=2)
+        if primeiro != segundo and self.rng.random() < CHANCE_DOIS_GENEROS:
+            return f'{primeiro} / {segundo}'
+        return primeiro
+
+    def filme(self, i):
+        rng = self.rng
+        titulo = f'{rng.choice(SUBSTANTIVOS)} {rng.choice(COMPLEMENTOS)}'
+        if rng.random() < 0.1:
+            titulo += f' {rng.randint(2, 5)}'
+        elenco = []
+        for _ in range(rng.randint(3, 8)):
+            ator = self.escolher_ator()
+            if ator not in elenco:
+                elenco.append(ator)
+        return Movie(
+            titulo=titulo,
+            ano=int(rng.triangular(INICIO_ANOS, FIM_ANOS, ANO_MAIS_COMUM)),
+            genero=self.genero(),
+            sinopse=f'{titulo}: filme sintético número {i}.',
+            poster=f'https://exemplo.com/sintetico/{i}.jpg',
+            elenco=elenco,
+            duracao=max(60, min(240, int(rng.gauss(110, 20)))),
+        )
+
+    def quantidade_reviews(self, i):
+        esperado = self.reviews_por_peso / (self.posicoes[i] + 1) ** EXPOENTE_POPULARIDADE
+        inteiro = math.floor(esperado)
+        return inteiro + (self.rng.random() < esperado - inteiro)
+
+    def reviews(self, quantidade):
+        """
+        [(usuario, nota, created_at)] de um filme
+        """
+        rng = self.rng
+        qualidade = rng.gauss(3.4, 0.6)
+        segundos = DIAS_DE_REVIEWS * 86400
+        return [
+            (
+                f'usuario{int(self.usuarios * rng.random() ** 2)}',
+                max(1, min(5, round(rng.gauss(qualidade, 0.9)))),
+                self.agora - timedelta(seconds=segundos * rng.random() ** 2),
+            )
+            for _ in range(quantidade)
+        ]
+
+
+class Command(BaseCommand):
+    help = 'Gera um catálogo sintético reproduzível (filmes, elenco e reviews)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filmes',
+            type=int,
+            default=10000,
+            help='Quantidade de filmes (padrão: 10000)',
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=100000,
+            help='Quantidade aproximada de reviews (padrão: 100000)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semente: o mesmo valor gera o mesmo catálogo (padrão: 42)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Filmes gravados por transação (padrão: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        total_filmes = options['filmes']
+        lote = options['lote']
+        gerador = Gerador(options['seed'], total_filmes, options['reviews'])
+        inicio = time.monotonic()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🎲 Gerando {total_filmes} filmes e ~{options["reviews"]} reviews '
+            f'(seed {options["seed"]})\n'
+        ))
+
+        criados_filmes = 0
+        criados_reviews = 0
+        with sem_auto_now_add(Review, 'created_at'):
+            for comeco in range(0, total_filmes, lote):
+                filmes, reviews = self.gravar_lote(gerador, range(comeco, min(comeco + lote, total_filmes)))
+                criados_filmes += filmes
+                criados_reviews += reviews
+                self.stdout.write(
+                    f'  📦 {criados_filmes}/{total_filmes} filmes, {criados_reviews} reviews '
+                    f'({time.monotonic() - inicio:.0f}s)'
+                )
+
+        self.stdout.write('  🏆 Recalculando rankings...')
+        compactar()
+        invalidar()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ Catálogo sintético pronto!'
+                f'\n   🎬 {criados_filmes} filmes'
+                f'\n   ⭐ {criados_reviews} reviews'
+                f'\n   ⏱️  {time.monotonic() - inicio:.1f}s'
+            )
+        )
+
+    def gravar_lote(self, gerador, indices):
+        filmes = []
+        notas = []
+        for i in indices:
+            movie = gerador.filme(i)
+            reviews = gerador.reviews(gerador.quantidade_reviews(i))
+            # Contadores já certos: bulk_create não passa por registrar_avaliacao
+            movie.soma_notas = sum(nota for _, nota, _ in reviews)
+            movie.total_avaliacoes = len(reviews)
+            movie.nota_media = calcular_media(movie.soma_notas, movie.total_avaliacoes)
+            filmes.append(movie)
+            notas.append(reviews)
+
+        with transaction.atomic():
+            # bulk_* não chama save() nem sinais: derivados, índice de
+            # busca e pessoas do elenco aqui (como no import_movies --bulk)
+            for movie in filmes:
+                movie.genero_normalizado = dobrar(movie.genero)
+            Movie.objects.bulk_create(filmes, batch_size=500)
+            get_backend().indexar_varios(filmes)
+            sincronizar_elenco(filmes)
+
+            total = 0
+            pendentes = []
+            for movie, reviews in zip(filmes, notas):
+                for usuario, nota, criada_em in reviews:
+                    pendentes.append(Review(
+                        usuario=usuario, filme_id=movie.pk, nota=nota,
+                        comentario='', created_at=criada_em,
+                    ))
+                if len(pendentes) >= 5000:
+                    Review.objects.bulk_create(pendentes, batch_size=5000)
+                    total += len(pendentes)
+                    pendentes = []
+            Review.objects.bulk_create(pendentes, batch_size=5000)
+            total += len(pendentes)
+
+        return len(filmes), total
@@ -0,0 +1,29 @@
+"""
+TOKEN_PERFIL.PY - Gera o token do header X-Perfil
+
+Com ele, qualquer requisição pode ser perfilada em produção sem
+deploy (ver config/perfilador.py). Assinado com a SECRET_KEY: vale
+só neste ambiente e por PERFIL_VALIDADE_SEGUNDOS.
+
+Uso:
+    python manage.py token_perfil
+    curl -H "X-Perfil: <token>" -i "https://.../api/movies/search/?q=..."
+    curl -H "X-Perfil: <token>" "https://.../perfis/<X-Perfil-Id>" > perfil.json
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from config.perfilador import HEADER, gerar_token
+
+
+class Command(BaseCommand):
+    help = 'Gera um token para perfilar requisições (header X-Perfil)'
+
+    def handle(self, *args, **options):
+        token = gerar_token()
+        minutos = settings.PERFIL_VALIDADE_SEGUNDOS // 60
+        self.stdout.write(self.style.SUCCESS(f'\n🔑 Token de perfil (vale {minutos} min):\n'))
+        self.stdout.write(f'   {token}\n')
+        self.stdout.write(f'   curl -i -H "{HEADER}: {token}" <url>')
+        self.stdout.write('   → header X-Perfil-Id na resposta; abra /perfis/<id> no https://www.speedscope.app')
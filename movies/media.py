@@ -0,0 +1,168 @@
+"""
+MOVIES/MEDIA.PY - Armazenamento de imagens (poster/backdrop)
+
+PESSOA 1 EXPLICA:
+- Antes o poster ficava inteiro no banco como "data:image/jpeg;base64,..."
+- Agora a imagem é decodificada e salva em disco (MEDIA_ROOT)
+- O nome do arquivo é o hash SHA-256 do conteúdo (mesma imagem = mesmo arquivo)
+- No banco fica só a referência curta: "<hash>.jpg"
+- A API devolve uma URL que o navegador/CDN pode guardar em cache para sempre
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+# data:image/jpeg;base64,/9j/4AAQ...
+DATA_URI_RE = re.compile(
+    r'^data:(?P<mime>image/[\w.+-]+);base64,(?P<dados>.*)$',
+    re.DOTALL,
+)
+
+# <hash sha256>.<extensão>
+REFERENCIA_RE = re.compile(r'^(?P<hash>[0-9a-f]{64})\.(?P<ext>[a-z0-9]+)$')
+
+EXTENSOES = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+    'image/avif': 'avif',
+}
+
+CONTENT_TYPES = {
+    'jpg': 'image/jpeg',
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'gif': 'image/gif',
+    'avif': 'image/avif',
+}
+
+# Pasta dentro do MEDIA_ROOT
+PASTA = 'imagens'
+
+
+class ImagemInvalida(ValueError):
+    """
+    Data URI mal formado (base64 quebrado ou tipo não suportado)
+    """
+
+
+def eh_data_uri(valor):
+    return bool(valor) and valor.startswith('data:')
+
+
+def eh_referencia(valor):
+    return bool(valor) and REFERENCIA_RE.match(valor) is not None
+
+
+def caminho(referencia):
+    """
+    Caminho do arquivo dentro do storage
+
+    Usa os 2 primeiros caracteres do hash como subpasta
+    para não colocar milhares de arquivos no mesmo diretório
+    """
+    return f'{PASTA}/{referencia[:2]}/{referencia}'
+
+
+def armazenar_data_uri(valor):
+    """
+    Decodifica um data URI e salva o arquivo no storage
+
+    Retorna a referência curta ("<hash>.<ext>")
+    Se o arquivo já existe (mesmo conteúdo), não grava de novo
+    """
+    match = DATA_URI_RE.match(valor.strip())
+    if not match:
+        raise ImagemInvalida('Data URI inválido')
+
+    ext = EXTENSOES.get(match.group('mime').lower())
+    if not ext:
+        raise ImagemInvalida(f'Tipo de imagem não suportado: {match.group("mime")}')
+
+    try:
+        conteudo = base64.b64decode(match.group('dados'), validate=False)
+    except (binascii.Error, ValueError):
+        raise ImagemInvalida('Base64 inválido')
+
+    if not conteudo:
+        raise ImagemInvalida('Imagem vazia')
+
+    referencia = f'{hashlib.sha256(conteudo).hexdigest()}.{ext}'
+    nome = caminho(referencia)
+
+    # Deduplicação: o nome É o hash do conteúdo
+    if not default_storage.exists(nome):
+        default_storage.save(nome, ContentFile(conteudo))
+
+    return referencia
+
+
+def armazenar_imagem(valor):
+    """
+    Normaliza o valor de poster/backdrop antes de salvar no banco
+
+    - data URI → salva em disco e retorna a referência
+    - URL externa, referência ou vazio → mantém como está
+    """
+    if eh_data_uri(valor):
+        return armazenar_data_uri(valor)
+    return valor or ''
+
+
+def abrir(referencia):
+    return default_storage.open(caminho(referencia), 'rb')
+
+
+def conferir(referencia):
+    """
+    O arquivo existe e o conteúdo ainda bate com o hash do nome?
+
+    Usado antes de apagar o data URI do banco (migração): só troca
+    pela referência depois de ler o arquivo de volta
+    """
+    if not existe(referencia):
+        return False
+    with abrir(referencia) as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest() == REFERENCIA_RE.match(referencia).group('hash')
+
+
+def data_uri(referencia):
+    """
+    Caminho inverso: referência → "data:<tipo>;base64,..." (volta para o banco)
+    """
+    with abrir(referencia) as arquivo:
+        dados = base64.b64encode(arquivo.read()).decode('ascii')
+    return f'data:{content_type(referencia)};base64,{dados}'
+
+
+def existe(referencia):
+    return default_storage.exists(caminho(referencia))
+
+
+def content_type(referencia):
+    match = REFERENCIA_RE.match(referencia)
+    return CONTENT_TYPES.get(match.group('ext'), 'application/octet-stream')
+
+
+def url_imagem(valor, request=None):
+    """
+    Converte o valor salvo no banco em URL para a API
+
+    - referência → /api/movies/media/<hash>.<ext> (absoluta se tiver request)
+    - qualquer outra coisa (URL externa, dado antigo) → devolve igual
+    """
+    if not eh_referencia(valor):
+        return valor
+
+    url = reverse('movie-media', kwargs={'nome': valor})
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Q
+
+
+def mover_imagens_para_disco(apps, schema_editor):
+    """
+    Converte os data URIs (base64) já salvos em referências para arquivos
+
+    O data URI só sai do banco depois que o arquivo foi lido de volta e
+    bateu com o hash; em disco efêmero (ver MEDIA_PERSISTENTE em
+    config/settings.py) a migração falha antes de mexer em qualquer linha
+    """
+    from movies.media import ImagemInvalida, armazenar_imagem, conferir, eh_data_uri
+
+    Movie = apps.get_model('movies', 'Movie')
+    com_imagem = Movie.objects.filter(Q(poster__startswith='data:') | Q(backdrop__startswith='data:'))
+    if not com_imagem.exists():
+        return
+    if not getattr(settings, 'MEDIA_PERSISTENTE', True):
+        raise RuntimeError(
+            f'MEDIA_ROOT={settings.MEDIA_ROOT} não está num volume persistente: '
+            'as imagens sumiriam no próximo deploy. Monte um volume (Railway: '
+            'Settings → Volumes) ou defina MEDIA_ROOT e rode a migração de novo'
+        )
+
+    for movie in com_imagem.only('id', 'poster', 'backdrop').iterator(chunk_size=100):
+        alteracoes = {}
+        for campo in ('poster', 'backdrop'):
+            valor = getattr(movie, campo)
+            if eh_data_uri(valor):
+                try:
+                    referencia = armazenar_imagem(valor)
+                except ImagemInvalida:
+                    continue
+                if not conferir(referencia):
+                    raise RuntimeError(f'Imagem do filme {movie.pk} ({campo}) não foi gravada em {settings.MEDIA_ROOT}')
+                alteracoes[campo] = referencia
+        if alteracoes:
+            Movie.objects.filter(pk=movie.pk).update(**alteracoes)
+
+
+def trazer_imagens_de_volta(apps, schema_editor):
+    """
+    Volta: lê os arquivos e grava de novo o data URI no banco
+
+    Arquivo que sumiu faz a volta falhar (em vez de deixar o filme sem
+    imagem); os arquivos ficam no disco
+    """
+    from movies.media import conferir, data_uri, eh_referencia
+
+    Movie = apps.get_model('movies', 'Movie')
+    for movie in Movie.objects.only('id', 'poster', 'backdrop').iterator(chunk_size=100):
+        alteracoes = {}
+        for campo in ('poster', 'backdrop'):
+            valor = getattr(movie, campo)
+            if eh_referencia(valor):
+                if not conferir(valor):
+                    raise RuntimeError(f'Imagem {valor} do filme {movie.pk} ({campo}) não está em {settings.MEDIA_ROOT}')
+                alteracoes[campo] = data_uri(valor)
+        if alteracoes:
+            Movie.objects.filter(pk=movie.pk).update(**alteracoes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(mover_imagens_para_disco, trazer_imagens_de_volta),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 17:25
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+
+def preencher_contadores(apps, schema_editor):
+    """
+    Calcula soma/total a partir das reviews que já existem
+    """
+    from movies.models import calcular_media
+
+    Movie = apps.get_model('movies', 'Movie')
+    filmes = Movie.objects.annotate(
+        soma_real=Coalesce(Sum('reviews__nota'), 0),
+        total_real=Count('reviews'),
+    )
+    alterados = []
+    for movie in filmes.iterator(chunk_size=500):
+        movie.soma_notas = movie.soma_real
+        movie.total_avaliacoes = movie.total_real
+        movie.nota_media = calcular_media(movie.soma_real, movie.total_real)
+        alterados.append(movie)
+        if len(alterados) == 500:
+            Movie.objects.bulk_update(alterados, ['soma_notas', 'total_avaliacoes', 'nota_media'])
+            alterados = []
+    if alterados:
+        Movie.objects.bulk_update(alterados, ['soma_notas', 'total_avaliacoes', 'nota_media'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_imagens_em_disco'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='soma_notas',
+            field=models.PositiveIntegerField(default=0, verbose_name='Soma das notas'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='total_avaliacoes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total de avaliações'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
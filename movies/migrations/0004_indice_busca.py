@@ -0,0 +1,79 @@
+from django.db import migrations
+
+SQLITE_CRIAR = """
+CREATE VIRTUAL TABLE IF NOT EXISTS movies_movie_fts
+USING fts5(titulo, sinopse, tokenize = 'unicode61 remove_diacritics 2')
+"""
+
+SQLITE_APAGAR = 'DROP TABLE IF EXISTS movies_movie_fts'
+
+POSTGRES_CRIAR = [
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'pt_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION pt_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION pt_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    ALTER TABLE movies_movie ADD COLUMN busca tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('pt_unaccent'::regconfig, coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('pt_unaccent'::regconfig, coalesce(sinopse, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX movies_movie_busca_gin ON movies_movie USING gin (busca)',
+]
+
+POSTGRES_APAGAR = [
+    'DROP INDEX IF EXISTS movies_movie_busca_gin',
+    'ALTER TABLE movies_movie DROP COLUMN IF EXISTS busca',
+]
+
+
+def criar_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        from movies.texto import radicais
+
+        Movie = apps.get_model('movies', 'Movie')
+        schema_editor.execute(SQLITE_CRIAR)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO movies_movie_fts (rowid, titulo, sinopse) VALUES (%s, %s, %s)',
+                [
+                    (pk, ' '.join(radicais(titulo)), ' '.join(radicais(sinopse)))
+                    for pk, titulo, sinopse in Movie.objects.values_list('id', 'titulo', 'sinopse').iterator()
+                ],
+            )
+
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_CRIAR:
+            schema_editor.execute(sql)
+
+
+def apagar_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_APAGAR)
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_APAGAR:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_contadores_avaliacoes'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, apagar_indice),
+    ]
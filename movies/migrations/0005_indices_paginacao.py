@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_indice_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-ano', 'titulo', 'id'], name='movies_ano_titulo_id_idx'),
+        ),
+    ]
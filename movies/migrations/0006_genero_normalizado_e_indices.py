@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 17:42
+
+from django.db import migrations, models
+
+
+def preencher_genero_normalizado(apps, schema_editor):
+    """
+    "Ação" → "acao" nos filmes que já existem
+    """
+    from movies.texto import dobrar
+
+    Movie = apps.get_model('movies', 'Movie')
+    alterados = []
+    for movie in Movie.objects.only('id', 'genero').iterator(chunk_size=500):
+        movie.genero_normalizado = dobrar(movie.genero)
+        alterados.append(movie)
+        if len(alterados) == 500:
+            Movie.objects.bulk_update(alterados, ['genero_normalizado'])
+            alterados = []
+    if alterados:
+        Movie.objects.bulk_update(alterados, ['genero_normalizado'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='genero_normalizado',
+            field=models.CharField(default='', editable=False, max_length=100, verbose_name='Gênero (normalizado)'),
+        ),
+        migrations.RunPython(preencher_genero_normalizado, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['ano', 'id'], name='movies_ano_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['nota_media', 'id'], name='movies_nota_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['titulo', 'id'], name='movies_titulo_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['genero_normalizado', '-ano', 'titulo', 'id'], name='movies_gen_ano_titulo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['genero_normalizado', 'ano', 'id'], name='movies_gen_ano_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['genero_normalizado', 'nota_media', 'id'], name='movies_gen_nota_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['genero_normalizado', 'titulo', 'id'], name='movies_gen_titulo_id_idx'),
+        ),
+    ]
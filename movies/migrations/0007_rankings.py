@@ -0,0 +1,89 @@
+# Generated by Django 4.2 on 2026-10-18 17:45
+
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, Sum, Value
+
+
+def preencher_rankings(apps, schema_editor):
+    """
+    Cria os parâmetros (média do catálogo, época = agora) e calcula
+    nota_bayesiana e tendencia dos filmes que já existem
+    """
+    Movie = apps.get_model('movies', 'Movie')
+    Review = apps.get_model('reviews', 'Review')
+    ParametrosRanking = apps.get_model('movies', 'ParametrosRanking')
+
+    agora = time.time()
+    peso = float(getattr(settings, 'RANKING_PESO_PRIOR', 10))
+    meia_vida = float(getattr(settings, 'RANKING_MEIA_VIDA_HORAS', 72)) * 3600
+    janela = float(getattr(settings, 'RANKING_JANELA_DIAS', 30)) * 86400
+
+    totais = Movie.objects.aggregate(soma=Sum('soma_notas'), total=Sum('total_avaliacoes'))
+    media = totais['soma'] / totais['total'] if totais['total'] else 3.0
+    ParametrosRanking.objects.update_or_create(
+        pk=1, defaults={'media': media, 'peso': peso, 'epoca': agora},
+    )
+
+    Movie.objects.update(nota_bayesiana=ExpressionWrapper(
+        (Value(peso * media) + F('soma_notas')) / (Value(peso) + F('total_avaliacoes')),
+        output_field=FloatField(),
+    ))
+
+    inicio = datetime.fromtimestamp(agora - janela, tz=timezone.utc)
+    tendencias = defaultdict(float)
+    for filme_id, criada_em in Review.objects.filter(created_at__gte=inicio).values_list('filme_id', 'created_at'):
+        tendencias[filme_id] += 2 ** ((criada_em.timestamp() - agora) / meia_vida)
+    Movie.objects.bulk_update(
+        [Movie(pk=pk, tendencia=valor) for pk, valor in tendencias.items()],
+        ['tendencia'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_genero_normalizado_e_indices'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParametrosRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('media', models.FloatField(default=3.0, verbose_name='Média do catálogo')),
+                ('peso', models.FloatField(default=10.0, verbose_name='Peso da média (avaliações falsas)')),
+                ('epoca', models.FloatField(default=time.time, verbose_name='Época da tendência')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Parâmetros do ranking',
+                'verbose_name_plural': 'Parâmetros do ranking',
+            },
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='nota_bayesiana',
+            field=models.FloatField(default=0.0, verbose_name='Nota para o ranking'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='tendencia',
+            field=models.FloatField(default=0.0, verbose_name='Pontuação de tendência'),
+        ),
+        migrations.RunPython(preencher_rankings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['nota_bayesiana', 'id'], name='movies_bayes_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['tendencia', 'id'], name='movies_tendencia_id_idx'),
+        ),
+    ]
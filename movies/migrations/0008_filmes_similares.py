@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-18 17:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_rankings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmeSimilar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicao', models.PositiveSmallIntegerField(verbose_name='Posição')),
+                ('pontuacao', models.FloatField(verbose_name='Similaridade')),
+            ],
+            options={
+                'verbose_name': 'Filme similar',
+                'verbose_name_plural': 'Filmes similares',
+            },
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='similares_desatualizados',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Similares desatualizados'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('similares_desatualizados', True)), fields=['id'], name='movies_similares_pend_idx'),
+        ),
+        migrations.AddField(
+            model_name='filmesimilar',
+            name='filme',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similares', to='movies.movie', verbose_name='Filme'),
+        ),
+        migrations.AddField(
+            model_name='filmesimilar',
+            name='similar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='movies.movie', verbose_name='Filme similar'),
+        ),
+        migrations.AddConstraint(
+            model_name='filmesimilar',
+            constraint=models.UniqueConstraint(fields=('filme', 'posicao'), name='movies_similar_posicao_uniq'),
+        ),
+    ]
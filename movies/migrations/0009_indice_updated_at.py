@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_filmes_similares'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['updated_at'], name='movies_updated_at_idx'),
+        ),
+    ]
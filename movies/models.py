@@ -5,9 +5,27 @@ PESSOA 1 EXPLICA:
 - Define estrutura da tabela no banco
 - Cada campo vira uma coluna
 - nota_media é calculada automaticamente
+- soma_notas/total_avaliacoes são contadores atualizados a cada avaliação
+  (não precisa recalcular a média com todas as reviews)
+- genero_normalizado é o gênero sem acento e minúsculo ("Ação" → "acao"),
+  preenchido no save(): o filtro por gênero usa índice em qualquer banco
+- nota_bayesiana e tendencia são os rankings (top-rated e trending),
+  atualizados no mesmo UPDATE dos contadores (ver ParametrosRanking)
+- FilmeSimilar guarda os K filmes mais parecidos com cada filme
+  (calculados pelo comando calcular_similares)
 """
 
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
 from django.db import models
+from django.db.models import (
+    Case, DecimalField, ExpressionWrapper, F, FloatField, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce, Now, Power, Round
+
+from .texto import dobrar
 
 class Movie(models.Model):
     """
@@ -28,6 +46,14 @@ class Movie(models.Model):
         verbose_name="Gênero"
     )
     
+    # Preenchido no save() a partir de genero (não editar na mão)
+    genero_normalizado = models.CharField(
+        max_length=100,
+        editable=False,
+        default='',
+        verbose_name="Gênero (normalizado)"
+    )
+    
     sinopse = models.TextField(
         verbose_name="Sinopse"
     )
@@ -58,6 +84,36 @@ class Movie(models.Model):
         verbose_name="Nota Média"
     )
     
+    # Contadores das avaliações (nota_media = soma_notas / total_avaliacoes)
+    soma_notas = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Soma das notas"
+    )
+    
+    total_avaliacoes = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Total de avaliações"
+    )
+    
+    # Rankings (ver ParametrosRanking)
+    nota_bayesiana = models.FloatField(
+        default=0.0,
+        verbose_name="Nota para o ranking"
+    )
+    
+    tendencia = models.FloatField(
+        default=0.0,
+        verbose_name="Pontuação de tendência"
+    )
+    
+    # Gênero, elenco ou reviews mudaram: recalcular os similares
+    # (ver comando calcular_similares --incremental)
+    similares_desatualizados = models.BooleanField(
+        default=True,
+        editable=False,
+        verbose_name="Similares desatualizados"
+    )
+    
     duracao = models.IntegerField(
         null=True,
         blank=True,
@@ -82,16 +138,269 @@ class Movie(models.Model):
             models.Index(fields=['titulo']),
             models.Index(fields=['genero']),
             models.Index(fields=['ano']),
+            # Paginação por cursor na ordenação padrão (-ano, titulo, id)
+            models.Index(fields=['-ano', 'titulo', 'id'], name='movies_ano_titulo_id_idx'),
+            # ?ordering= da lista (ver ORDENACOES em movies/views.py);
+            # o banco lê o índice nos dois sentidos (ano e -ano)
+            models.Index(fields=['ano', 'id'], name='movies_ano_id_idx'),
+            models.Index(fields=['nota_media', 'id'], name='movies_nota_id_idx'),
+            models.Index(fields=['titulo', 'id'], name='movies_titulo_id_idx'),
+            # ?genero= com cada ordenação (igualdade primeiro, depois a ordem)
+            models.Index(fields=['genero_normalizado', '-ano', 'titulo', 'id'], name='movies_gen_ano_titulo_idx'),
+            models.Index(fields=['genero_normalizado', 'ano', 'id'], name='movies_gen_ano_id_idx'),
+            models.Index(fields=['genero_normalizado', 'nota_media', 'id'], name='movies_gen_nota_id_idx'),
+            models.Index(fields=['genero_normalizado', 'titulo', 'id'], name='movies_gen_titulo_id_idx'),
+            # Rankings (top-rated e trending), lidos de trás para frente
+            models.Index(fields=['nota_bayesiana', 'id'], name='movies_bayes_id_idx'),
+            models.Index(fields=['tendencia', 'id'], name='movies_tendencia_id_idx'),
+            # MAX(updated_at) sem varrer a tabela (versão do autocomplete)
+            models.Index(fields=['updated_at'], name='movies_updated_at_idx'),
+            # Só os filmes pendentes entram no índice (fica pequeno)
+            models.Index(
+                fields=['id'],
+                condition=models.Q(similares_desatualizados=True),
+                name='movies_similares_pend_idx',
+            ),
         ]
     
     def __str__(self):
         return f"{self.titulo} ({self.ano})"
     
-    def total_avaliacoes(self):
-        return self.reviews.count()
+    # Só registrar_avaliacao, recompute_ratings e compactar_rankings
+    # escrevem (UPDATE com F() ou em lote)
+    CAMPOS_CONTADORES = frozenset({
+        'soma_notas', 'total_avaliacoes', 'nota_media', 'nota_bayesiana', 'tendencia',
+    })
+    
+    def save(self, *args, **kwargs):
+        self.genero_normalizado = dobrar(self.genero)
+        self.similares_desatualizados = True
+        
+        # Filme já gravado (admin, carregar e salvar...): os contadores
+        # da instância podem estar velhos; gravar de volta desfaria as
+        # reviews feitas nesse meio tempo
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            adiados = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.CAMPOS_CONTADORES
+                and field.attname not in adiados
+            ]
+        
+        # save(update_fields=[...]) só grava os derivados se a origem mudou
+        elif update_fields is not None:
+            derivados = set()
+            if 'genero' in update_fields:
+                derivados |= {'genero_normalizado', 'similares_desatualizados'}
+            if 'elenco' in update_fields:
+                derivados.add('similares_desatualizados')
+            kwargs['update_fields'] = {*update_fields, *derivados}
+        
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def registrar_avaliacao(cls, movie_id, delta_soma, delta_total, criada_em=None):
+        """
+        Aplica uma avaliação nos contadores do filme
+        
+        EXPLICAÇÃO:
+        - Um único UPDATE com F() (o banco faz a conta, sem ler antes)
+        - Duas reviews ao mesmo tempo não sobrescrevem uma à outra
+        - Custo O(1): não depende de quantas reviews o filme tem
+        - No mesmo UPDATE: nota_bayesiana, a marca de "similares
+          desatualizados" e, se criada_em veio, o peso da review na
+          tendência (soma ao entrar, subtrai ao sair)
+        
+        Nova review: (nota, 1) | Review apagada: (-nota, -1)
+        Nota alterada: (nova - antiga, 0)
+        """
+        soma = F('soma_notas') + delta_soma
+        total = F('total_avaliacoes') + delta_total
+        
+        # No UPDATE, F() enxerga os valores ANTIGOS da linha
+        media = Round(
+            ExpressionWrapper(soma * Value(1.0) / total, output_field=FloatField()),
+            1,
+        )
+        
+        campos = {
+            'soma_notas': soma,
+            'total_avaliacoes': total,
+            'nota_media': Case(
+                When(total_avaliacoes__gt=-delta_total, then=media),
+                default=Value(Decimal('0.0')),
+                output_field=DecimalField(max_digits=3, decimal_places=1),
+            ),
+            'nota_bayesiana': ParametrosRanking.expressao_nota_bayesiana(soma, total),
+            'similares_desatualizados': Value(True),
+            'updated_at': Now(),
+        }
+        if criada_em is not None and delta_total:
+            peso = ParametrosRanking.expressao_peso_tendencia(criada_em)
+            campos['tendencia'] = F('tendencia') + delta_total * peso
+        
+        cls.objects.filter(pk=movie_id).update(**campos)
     
     def atualizar_nota_media(self):
-        from django.db.models import Avg
-        media = self.reviews.aggregate(Avg('nota'))['nota__avg']
-        self.nota_media = media if media else 0.0
-        self.save()
\ No newline at end of file
+        """
+        Recalcula os contadores a partir de TODAS as reviews
+        
+        Usado só para corrigir divergências (comando recompute_ratings)
+        """
+        from django.db.models import Count, Sum
+        agregado = self.reviews.aggregate(soma=Sum('nota'), total=Count('id'))
+        self.soma_notas = agregado['soma'] or 0
+        self.total_avaliacoes = agregado['total']
+        self.nota_media = calcular_media(self.soma_notas, self.total_avaliacoes)
+        self.nota_bayesiana = ParametrosRanking.atual().nota_bayesiana(
+            self.soma_notas, self.total_avaliacoes
+        )
+        self.save(update_fields=[
+            'soma_notas', 'total_avaliacoes', 'nota_media', 'nota_bayesiana', 'updated_at',
+        ])
+
+
+def calcular_media(soma, total):
+    """
+    Média com 1 casa decimal (mesmo arredondamento do banco)
+    """
+    if not total:
+        return Decimal('0.0')
+    return (Decimal(soma) / Decimal(total)).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+
+
+class ParametrosRanking(models.Model):
+    """
+    Parâmetros dos rankings (uma linha só, pk=1)
+    
+    PESSOA 1 EXPLICA:
+    
+    TOP-RATED (nota bayesiana):
+    - Um filme com UMA review nota 5 não pode passar um com 500 reviews 4.8
+    - Cada filme "começa" com `peso` avaliações falsas de nota `media`
+      (a média do catálogo):
+          nota_bayesiana = (peso × media + soma_notas) / (peso + total_avaliacoes)
+    - Com poucas reviews fica perto da média; com muitas, perto da nota real
+    
+    TRENDING (tendência com decaimento):
+    - Cada review vale 1 quando é nova e metade a cada RANKING_MEIA_VIDA_HORAS
+    - Truque da "época": em vez de diminuir TODOS os filmes com o tempo,
+      cada review nova soma 2^((criada_em - epoca) / meia_vida)
+      (reviews mais novas valem mais; a ORDEM é a mesma)
+    - Review apagada subtrai exatamente o que somou
+    - O comando compactar_rankings move a época para "agora"
+      (os números não crescem sem limite), zera o que ficou velho
+      e recalcula a média do catálogo
+    """
+    
+    media = models.FloatField(
+        default=3.0,
+        verbose_name="Média do catálogo"
+    )
+    
+    peso = models.FloatField(
+        default=10.0,
+        verbose_name="Peso da média (avaliações falsas)"
+    )
+    
+    # Segundos desde 1970 (timestamp)
+    epoca = models.FloatField(
+        default=time.time,
+        verbose_name="Época da tendência"
+    )
+    
+    atualizado_em = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Atualizado em"
+    )
+    
+    class Meta:
+        verbose_name = "Parâmetros do ranking"
+        verbose_name_plural = "Parâmetros do ranking"
+    
+    def __str__(self):
+        return f"média {self.media:.2f}, peso {self.peso:g}"
+    
+    @classmethod
+    def atual(cls):
+        parametros, _ = cls.objects.get_or_create(pk=1, defaults={'peso': peso_prior()})
+        return parametros
+    
+    def nota_bayesiana(self, soma, total):
+        return (self.peso * self.media + soma) / (self.peso + total)
+    
+    # ---------- expressões para o UPDATE (sem consulta a mais) ----------
+    
+    @classmethod
+    def valor(cls, campo, padrao):
+        return Coalesce(Subquery(cls.objects.filter(pk=1).values(campo)[:1]), Value(padrao))
+    
+    @classmethod
+    def expressao_nota_bayesiana(cls, soma, total):
+        peso = cls.valor('peso', peso_prior())
+        media = cls.valor('media', 3.0)
+        return ExpressionWrapper(
+            (peso * media + soma) / (peso + total),
+            output_field=FloatField(),
+        )
+    
+    @classmethod
+    def expressao_peso_tendencia(cls, criada_em):
+        momento = criada_em.timestamp()
+        expoente = (Value(momento) - cls.valor('epoca', momento)) / Value(meia_vida_segundos())
+        return Power(Value(2.0), expoente, output_field=FloatField())
+
+
+def peso_prior():
+    return float(getattr(settings, 'RANKING_PESO_PRIOR', 10))
+
+
+def meia_vida_segundos():
+    return float(getattr(settings, 'RANKING_MEIA_VIDA_HORAS', 72)) * 3600
+
+
+
+class FilmeSimilar(models.Model):
+    """
+    Vizinho de um filme na recomendação "filmes parecidos"
+    
+    PESSOA 1 EXPLICA:
+    - Cada filme tem até K linhas, ordenadas por posicao (0 = mais parecido)
+    - pontuacao = similaridade de cosseno (gênero + elenco + quem avaliou)
+    - Preenchido pelo comando calcular_similares (nunca na requisição)
+    - A API só lê: WHERE filme_id = X ORDER BY posicao (índice único)
+    """
+    
+    filme = models.ForeignKey(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name='similares',
+        verbose_name="Filme"
+    )
+    
+    similar = models.ForeignKey(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Filme similar"
+    )
+    
+    posicao = models.PositiveSmallIntegerField(
+        verbose_name="Posição"
+    )
+    
+    pontuacao = models.FloatField(
+        verbose_name="Similaridade"
+    )
+    
+    class Meta:
+        verbose_name = "Filme similar"
+        verbose_name_plural = "Filmes similares"
+        constraints = [
+            models.UniqueConstraint(fields=['filme', 'posicao'], name='movies_similar_posicao_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.filme_id} → {self.similar_id} ({self.pontuacao:.3f})"
@@ -0,0 +1,94 @@
+"""
+MOVIES/RANKINGS.PY - Manutenção dos rankings (top-rated e trending)
+
+PESSOA 1 EXPLICA:
+- No dia a dia cada review já atualiza nota_bayesiana e tendencia
+  (Movie.registrar_avaliacao, um UPDATE só)
+- compactar() roda de tempos em tempos (comando compactar_rankings):
+    1. recalcula a média do catálogo (o "prior" da nota bayesiana)
+       e reescreve nota_bayesiana de todos os filmes
+    2. move a época da tendência para agora e refaz a tendência de
+       todos do zero, só com as reviews da janela (os números voltam
+       a ficar pequenos)
+    3. quem só tem reviews mais velhas que a janela fica com zero
+- Refazer é exato: não depende de quantas reviews o filme tem nem
+  carrega erro de arredondamento (ou valor negativo) do dia a dia
+"""
+
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Sum, Value
+
+from .cache import invalidar
+from .models import Movie, ParametrosRanking, meia_vida_segundos, peso_prior
+
+# Média usada enquanto o catálogo não tem nenhuma review
+MEDIA_PADRAO = 3.0
+
+
+def janela_segundos():
+    return float(getattr(settings, 'RANKING_JANELA_DIAS', 30)) * 86400
+
+
+def tendencias_das_reviews(agora, meia_vida):
+    """
+    {movie_id: tendência} só com as reviews da janela, já na época "agora"
+    """
+    from reviews.models import Review
+
+    inicio = datetime.fromtimestamp(agora - janela_segundos(), tz=timezone.utc)
+    tendencias = defaultdict(float)
+    reviews = Review.objects.filter(created_at__gte=inicio).values_list('filme_id', 'created_at')
+    for filme_id, criada_em in reviews.iterator(chunk_size=2000):
+        tendencias[filme_id] += 2 ** ((criada_em.timestamp() - agora) / meia_vida)
+    return tendencias
+
+
+def compactar():
+    """
+    Retorna um resumo: {'media', 'zerados', 'recalculados'}
+    """
+    with transaction.atomic():
+        ParametrosRanking.atual()
+        parametros = ParametrosRanking.objects.select_for_update().get(pk=1)
+
+        agora = time.time()
+        meia_vida = meia_vida_segundos()
+        peso = peso_prior()
+
+        totais = Movie.objects.aggregate(soma=Sum('soma_notas'), total=Sum('total_avaliacoes'))
+        media = totais['soma'] / totais['total'] if totais['total'] else MEDIA_PADRAO
+
+        tendencias = tendencias_das_reviews(agora, meia_vida)
+        # Tinha tendência (positiva, negativa ou resto de arredondamento)
+        # e não tem nenhuma review na janela
+        com_tendencia = set(Movie.objects.exclude(tendencia=0).values_list('id', flat=True))
+        Movie.objects.exclude(tendencia=0).update(tendencia=0.0)
+        Movie.objects.bulk_update(
+            [Movie(pk=pk, tendencia=valor) for pk, valor in tendencias.items()],
+            ['tendencia'],
+            batch_size=500,
+        )
+        resumo = {
+            'media': media,
+            'zerados': len(com_tendencia - tendencias.keys()),
+            'recalculados': len(tendencias),
+        }
+
+        Movie.objects.update(nota_bayesiana=ExpressionWrapper(
+            (Value(peso * media) + F('soma_notas')) / (Value(peso) + F('total_avaliacoes')),
+            output_field=FloatField(),
+        ))
+
+        parametros.media = media
+        parametros.peso = peso
+        parametros.epoca = agora
+        parametros.save()
+
+        invalidar()
+
+    return resumo
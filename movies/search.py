@@ -0,0 +1,191 @@
+"""
+MOVIES/SEARCH.PY - Motor de busca de filmes
+
+PESSOA 1 EXPLICA:
+- Antes a busca era "titulo LIKE '%q%' OR sinopse LIKE '%q%'"
+  (lê a tabela inteira, sem ranking, sensível a acento)
+- Agora existe um índice de texto completo:
+    * SQLite   → tabela virtual FTS5 (movies_movie_fts)
+    * Postgres → coluna tsvector "busca" com índice GIN
+- Os dois ignoram acentos, usam radicais em português
+  e ordenam por relevância (título pesa mais que sinopse)
+
+Para trocar o motor: settings.MOVIES_SEARCH_BACKEND = 'caminho.da.Classe'
+"""
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .texto import palavras, radicais
+
+# Peso do título em relação à sinopse
+PESO_TITULO = 10.0
+PESO_SINOPSE = 1.0
+
+
+class BuscaBackend:
+    """
+    Interface comum dos motores de busca
+    """
+
+    def buscar(self, queryset, termo):
+        """
+        Filtra o queryset pelos filmes que combinam com o termo,
+        ordenados do mais relevante para o menos relevante
+        """
+        raise NotImplementedError
+
+    def indexar(self, movie):
+        """
+        Atualiza o índice de UM filme (depois de salvar)
+        """
+
+    def indexar_varios(self, movies):
+        for movie in movies:
+            self.indexar(movie)
+
+    def remover(self, movie_id):
+        """
+        Tira o filme do índice (depois de deletar)
+        """
+
+    def reconstruir(self):
+        """
+        Refaz o índice inteiro. Retorna quantos filmes foram indexados
+        """
+        return 0
+
+
+class IcontainsBackend(BuscaBackend):
+    """
+    Busca simples (sem índice). Usada em bancos sem suporte a FTS
+    """
+
+    def buscar(self, queryset, termo):
+        return queryset.filter(Q(titulo__icontains=termo) | Q(sinopse__icontains=termo))
+
+
+class SQLiteFTSBackend(BuscaBackend):
+    """
+    SQLite FTS5
+
+    - A tabela guarda os textos já sem acento e reduzidos a radicais
+    - rowid da tabela FTS = id do filme
+    - bm25() dá a relevância (quanto MENOR, melhor)
+    """
+
+    TABELA = 'movies_movie_fts'
+
+    def expressao(self, termo):
+        # Cada palavra vira um prefixo entre aspas: "aca"* "heroi"*
+        return ' '.join(f'"{r}"*' for r in radicais(termo))
+
+    def buscar(self, queryset, termo):
+        expressao = self.expressao(termo)
+        if not expressao:
+            return queryset.none()
+        return queryset.extra(
+            tables=[self.TABELA],
+            where=[f'{self.TABELA}.rowid = movies_movie.id', f'{self.TABELA} MATCH %s'],
+            params=[expressao],
+            select={'relevancia': f'bm25({self.TABELA}, {PESO_TITULO}, {PESO_SINOPSE})'},
+        ).order_by('relevancia', 'id')
+
+    def documento(self, movie):
+        return (
+            movie.pk,
+            ' '.join(radicais(movie.titulo)),
+            ' '.join(radicais(movie.sinopse)),
+        )
+
+    def indexar(self, movie):
+        self.indexar_varios([movie])
+
+    def indexar_varios(self, movies):
+        documentos = [self.documento(m) for m in movies]
+        if not documentos:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.TABELA} WHERE rowid = %s',
+                [(doc[0],) for doc in documentos],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.TABELA} (rowid, titulo, sinopse) VALUES (%s, %s, %s)',
+                documentos,
+            )
+
+    def remover(self, movie_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABELA} WHERE rowid = %s', [movie_id])
+
+    def reconstruir(self, batch_size=1000):
+        from .models import Movie
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABELA}')
+
+        total = 0
+        lote = []
+        for movie in Movie.objects.only('id', 'titulo', 'sinopse').order_by().iterator(chunk_size=batch_size):
+            lote.append(movie)
+            if len(lote) >= batch_size:
+                self.indexar_varios(lote)
+                total += len(lote)
+                lote = []
+        self.indexar_varios(lote)
+        return total + len(lote)
+
+
+class PostgresBackend(BuscaBackend):
+    """
+    Postgres: coluna gerada "busca" (tsvector) + índice GIN
+
+    - O próprio banco mantém a coluna em dia (GENERATED ALWAYS ... STORED),
+      então indexar/remover não precisam fazer nada
+    - Configuração "pt_unaccent" = portuguese + unaccent
+    - Título tem peso A, sinopse peso B
+    """
+
+    CONFIG = 'pt_unaccent'
+
+    def expressao(self, termo):
+        # Cada palavra vira prefixo: acao:* & heroi:*
+        return ' & '.join(f'{p}:*' for p in palavras(termo))
+
+    def buscar(self, queryset, termo):
+        expressao = self.expressao(termo)
+        if not expressao:
+            return queryset.none()
+        consulta = f"to_tsquery('{self.CONFIG}', %s)"
+        return queryset.extra(
+            where=[f'movies_movie.busca @@ {consulta}'],
+            params=[expressao],
+            select={'relevancia': f'ts_rank(movies_movie.busca, {consulta})'},
+            select_params=[expressao],
+        ).order_by('-relevancia', 'id')
+
+
+BACKENDS_POR_BANCO = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    """
+    Motor de busca do banco atual (criado uma vez por processo)
+    """
+    global _backend
+    if _backend is None:
+        caminho = getattr(settings, 'MOVIES_SEARCH_BACKEND', None)
+        if caminho:
+            classe = import_string(caminho)
+        else:
+            classe = BACKENDS_POR_BANCO.get(connection.vendor, IcontainsBackend)
+        _backend = classe()
+    return _backend
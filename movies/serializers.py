@@ -10,9 +10,38 @@ Usado para:
 """
 
 from rest_framework import serializers
-from .models import Movie
+from config.campos import CamposDinamicosMixin
+from config.instrumentacao import SerializacaoMedidaMixin
+from config.serializacao import ListaRapidaSerializer
+from .models import FilmeSimilar, Movie
+from . import media
 
-class MovieSerializer(serializers.ModelSerializer):
+
+class ImagemField(serializers.CharField):
+    """
+    Campo de imagem (poster/backdrop)
+    
+    Entrada: aceita data URI (base64), que é salvo em disco,
+    ou URL externa
+    Saída: URL da imagem (cacheável), nunca o base64
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_blank', True)
+        kwargs.setdefault('trim_whitespace', False)
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        valor = super().to_internal_value(data)
+        try:
+            return media.armazenar_imagem(valor)
+        except media.ImagemInvalida as e:
+            raise serializers.ValidationError(str(e))
+    
+    def to_representation(self, value):
+        return media.url_imagem(value, self.context.get('request'))
+
+class MovieSerializer(SerializacaoMedidaMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer completo de filme
     
@@ -20,11 +49,17 @@ class MovieSerializer(serializers.ModelSerializer):
     Movie(titulo="Matrix") → {"titulo": "Matrix", "ano": 1999, ...}
     """
     
-    # Campo calculado (não existe no banco)
-    total_avaliacoes = serializers.ReadOnlyField()
+    # Contador salvo no próprio filme (não faz COUNT nas reviews)
+    total_avaliacoes = serializers.IntegerField(read_only=True)
+    
+    # Imagens viram URL
+    poster = ImagemField(read_only=True)
+    backdrop = ImagemField(read_only=True)
     
     class Meta:
         model = Movie
+        # many=True (lote de filmes) também pelo caminho rápido
+        list_serializer_class = ListaRapidaSerializer
         fields = [
             'id',                # ID único do filme
             'titulo',            # Título
@@ -44,16 +79,24 @@ class MovieSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'nota_media', 'created_at']
 
 
-class MovieListSerializer(serializers.ModelSerializer):
+class MovieListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer resumido para listagem
     
     Retorna menos informações para economizar dados
     Usado na lista de filmes (não nos detalhes)
+    
+    Também é a projeção padrão das listas: só essas colunas
+    são lidas do banco (ver config/campos.py)
+    
+    many=True usa o caminho rápido (ver config/serializacao.py)
     """
     
+    poster = ImagemField(read_only=True)
+    
     class Meta:
         model = Movie
+        list_serializer_class = ListaRapidaSerializer
         fields = [
             'id',
             'titulo',
@@ -64,13 +107,49 @@ class MovieListSerializer(serializers.ModelSerializer):
         ]
 
 
-class MovieCreateSerializer(serializers.ModelSerializer):
+class MovieRankingSerializer(MovieListSerializer):
+    """
+    Lista + dados do ranking (top-rated / trending)
+    """
+    
+    class Meta(MovieListSerializer.Meta):
+        fields = MovieListSerializer.Meta.fields + [
+            'total_avaliacoes',
+            'nota_bayesiana',
+        ]
+
+
+class FilmeSimilarSerializer(serializers.ModelSerializer):
+    """
+    Um filme parecido: dados de lista do filme + a similaridade
+    """
+    
+    id = serializers.IntegerField(source='similar.id', read_only=True)
+    titulo = serializers.CharField(source='similar.titulo', read_only=True)
+    ano = serializers.IntegerField(source='similar.ano', read_only=True)
+    genero = serializers.CharField(source='similar.genero', read_only=True)
+    poster = ImagemField(source='similar.poster', read_only=True)
+    nota_media = serializers.DecimalField(
+        source='similar.nota_media', max_digits=3, decimal_places=1, read_only=True
+    )
+    
+    class Meta:
+        model = FilmeSimilar
+        list_serializer_class = ListaRapidaSerializer
+        fields = ['id', 'titulo', 'ano', 'genero', 'poster', 'nota_media', 'pontuacao']
+
+
+class MovieCreateSerializer(SerializacaoMedidaMixin, serializers.ModelSerializer):
     """
     Serializer para criar/editar filmes
     
     Valida os dados antes de salvar no banco
     """
     
+    # data URI é decodificado e salvo em disco
+    poster = ImagemField(required=True, allow_blank=False)
+    backdrop = ImagemField(required=False)
+    
     class Meta:
         model = Movie
         fields = [
@@ -0,0 +1,36 @@
+"""
+EXPLICAÇÃO - PESSOA 1:
+Sinais dos filmes
+
+Quando um filme é salvo ou deletado:
+- mantém o índice de busca em dia
+- invalida o cache de respostas (sobe as versões)
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidar
+from .models import Movie
+from .search import get_backend
+
+# Só esses campos entram no índice de busca
+CAMPOS_BUSCA = {'titulo', 'sinopse'}
+
+
+@receiver(post_save, sender=Movie)
+def indexar_filme(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not CAMPOS_BUSCA & set(update_fields):
+        return
+    get_backend().indexar(instance)
+
+
+@receiver(post_delete, sender=Movie)
+def remover_filme_do_indice(sender, instance, **kwargs):
+    get_backend().remover(instance.pk)
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def invalidar_cache_filme(sender, instance, **kwargs):
+    invalidar([instance.pk])
@@ -0,0 +1,231 @@
+"""
+MOVIES/SIMILARES.PY - "Filmes parecidos" (recomendação por conteúdo)
+
+PESSOA 1 EXPLICA:
+- Cada filme vira um vetor esparso (quase tudo zero) com três partes:
+    * gênero: uma coluna por gênero ("Ação / Ficção" → acao, ficcao)
+    * elenco: uma coluna por ator (ator raro pesa mais que ator
+      que aparece em tudo: peso IDF)
+    * reviews: uma coluna por usuário, com a nota que ele deu
+      (dois filmes avaliados pelas mesmas pessoas ficam próximos)
+- Cada parte é normalizada e multiplicada pelo seu PESO
+- Similaridade de cosseno = produto escalar dos vetores normalizados
+- Para cada filme guardamos só os K vizinhos mais parecidos (FilmeSimilar)
+
+Escala (100k filmes):
+- Nunca monta a matriz filme × filme inteira (seria n² na memória)
+- Calcula em BLOCOS de linhas: bloco × todos (esparso) → top-K de
+  cada linha → grava → próximo bloco
+- Memória: a matriz de características (esparsa) + um bloco por vez
+
+Incremental:
+- Review nova, gênero ou elenco alterado marcam o filme como
+  "similares_desatualizados"
+- calcular(incremental=True) refaz só esses filmes e os que
+  tinham algum deles como vizinho
+- A marca de cada filme sai na MESMA transação que grava os vizinhos
+  dele, e só se o updated_at ainda for o lido no começo: filme
+  alterado durante o cálculo (ou bloco que falhou) continua marcado
+
+Precisa de numpy e scipy (só este módulo e o comando usam)
+"""
+
+import numpy as np
+from scipy import sparse
+
+from django.db import transaction
+
+from .cache import invalidar
+from .models import FilmeSimilar, Movie
+from .texto import dobrar
+
+# Peso de cada parte na similaridade final
+PESOS = {
+    'genero': 1.0,
+    'elenco': 1.0,
+    'reviews': 1.5,
+}
+
+K_PADRAO = 20
+BLOCO_PADRAO = 500
+
+
+def generos_do_filme(genero):
+    partes = dobrar(genero).replace(',', '/').split('/')
+    return {parte.strip() for parte in partes if parte.strip()}
+
+
+def atores_do_filme(elenco):
+    if isinstance(elenco, str):
+        elenco = elenco.split(',')
+    return {dobrar(ator).strip() for ator in elenco or [] if str(ator).strip()}
+
+
+def matriz_binaria(linhas_por_filme, n_filmes):
+    """
+    [(índice do filme, {chaves})] → matriz esparsa filmes × chaves (0/1)
+    """
+    colunas = {}
+    linhas, cols = [], []
+    for i, chaves in linhas_por_filme:
+        for chave in chaves:
+            linhas.append(i)
+            cols.append(colunas.setdefault(chave, len(colunas)))
+    dados = np.ones(len(linhas), dtype=np.float32)
+    return sparse.csr_matrix((dados, (linhas, cols)), shape=(n_filmes, max(len(colunas), 1)))
+
+
+def normalizar_linhas(matriz):
+    """
+    Cada linha com norma 1 (linha zerada continua zerada)
+    """
+    normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+    normas[normas == 0] = 1.0
+    return sparse.diags(1.0 / normas).dot(matriz).tocsr()
+
+
+def montar_caracteristicas():
+    """
+    Lê o catálogo e as reviews e monta a matriz de características
+
+    Retorna (ids, matriz): ids[i] é o id do filme da linha i
+    """
+    from reviews.models import Review
+
+    ids = []
+    generos = []
+    elencos = []
+    filmes = Movie.objects.order_by('id').values_list('id', 'genero', 'elenco')
+    for i, (movie_id, genero, elenco) in enumerate(filmes.iterator(chunk_size=5000)):
+        ids.append(movie_id)
+        generos.append((i, generos_do_filme(genero)))
+        elencos.append((i, atores_do_filme(elenco)))
+
+    n = len(ids)
+    indice = {movie_id: i for i, movie_id in enumerate(ids)}
+
+    m_genero = matriz_binaria(generos, n)
+
+    # Elenco com peso IDF: ator em muitos filmes diz pouco
+    m_elenco = matriz_binaria(elencos, n)
+    frequencia = np.asarray((m_elenco > 0).sum(axis=0)).ravel()
+    idf = np.log((1 + n) / (1 + frequencia)).astype(np.float32) + 1
+    m_elenco = m_elenco.dot(sparse.diags(idf)).tocsr()
+
+    # Reviews: filme × usuário com a nota centrada (nota - 3):
+    # quem odiou os dois também aproxima os filmes
+    usuarios = {}
+    linhas, cols, dados = [], [], []
+    reviews = Review.objects.values_list('filme_id', 'usuario', 'nota')
+    for filme_id, usuario, nota in reviews.iterator(chunk_size=20000):
+        if filme_id not in indice or nota == 3:
+            continue
+        linhas.append(indice[filme_id])
+        cols.append(usuarios.setdefault(dobrar(usuario), len(usuarios)))
+        dados.append(nota - 3)
+    m_reviews = sparse.csr_matrix(
+        (np.asarray(dados, dtype=np.float32), (linhas, cols)),
+        shape=(n, max(len(usuarios), 1)),
+    )
+    # (filme, usuário) repetido soma; tudo bem, é o mesmo sinal
+
+    partes = [
+        normalizar_linhas(m_genero) * PESOS['genero'],
+        normalizar_linhas(m_elenco) * PESOS['elenco'],
+        normalizar_linhas(m_reviews) * PESOS['reviews'],
+    ]
+    matriz = normalizar_linhas(sparse.hstack(partes, format='csr'))
+    return ids, matriz
+
+
+def top_k_do_bloco(bloco, matriz_t, linhas, k):
+    """
+    Similaridades do bloco contra todos → top-K de cada linha
+
+    bloco: linhas da matriz (esparsa) | matriz_t: matriz transposta
+    linhas: índice global de cada linha do bloco (para tirar o próprio filme)
+    """
+    produto = bloco.dot(matriz_t).tocsr()
+    resultado = []
+    for j, linha in enumerate(linhas):
+        inicio, fim = produto.indptr[j], produto.indptr[j + 1]
+        colunas = produto.indices[inicio:fim]
+        valores = produto.data[inicio:fim]
+
+        manter = (colunas != linha) & (valores > 0)
+        colunas, valores = colunas[manter], valores[manter]
+        if len(valores) > k:
+            melhores = np.argpartition(-valores, k)[:k]
+            colunas, valores = colunas[melhores], valores[melhores]
+
+        ordem = np.lexsort((colunas, -valores))
+        resultado.append(list(zip(colunas[ordem].tolist(), valores[ordem].tolist())))
+    return resultado
+
+
+def calcular(k=K_PADRAO, bloco=BLOCO_PADRAO, incremental=False, progresso=None):
+    """
+    Recalcula os vizinhos; retorna quantos filmes foram recalculados
+
+    progresso(feitos, total): chamado a cada bloco (opcional)
+    """
+    # {id: updated_at} dos marcados, lido ANTES dos dados (ver gravar)
+    versoes = dict(
+        Movie.objects.filter(similares_desatualizados=True).values_list('id', 'updated_at')
+    )
+    if incremental:
+        if not versoes:
+            return 0
+        vizinhos_de = FilmeSimilar.objects.filter(similar_id__in=versoes).values_list('filme_id', flat=True)
+        alvos = set(versoes) | set(vizinhos_de)
+    else:
+        alvos = None
+
+    ids, matriz = montar_caracteristicas()
+    if not ids:
+        return 0
+
+    if alvos is None:
+        linhas = np.arange(len(ids))
+    else:
+        linhas = np.array([i for i, movie_id in enumerate(ids) if movie_id in alvos], dtype=np.int64)
+
+    matriz_t = matriz.T.tocsr()
+    total = len(linhas)
+    for inicio in range(0, total, bloco):
+        parte = linhas[inicio:inicio + bloco]
+        vizinhos = top_k_do_bloco(matriz[parte], matriz_t, parte, k)
+        gravar(ids, parte, vizinhos, versoes)
+        if progresso:
+            progresso(min(inicio + bloco, total), total)
+
+    # Filmes apagados já saem por CASCADE; filmes de fora dos alvos
+    # não mudaram
+    return total
+
+
+def gravar(ids, linhas, vizinhos, versoes):
+    """
+    Troca os vizinhos de um bloco e tira a marca de "desatualizado"
+
+    versoes: {id: updated_at} dos filmes marcados no começo do cálculo;
+    quem mudou depois disso (updated_at diferente) fica marcado
+    """
+    filmes = [ids[i] for i in linhas]
+    novos = [
+        FilmeSimilar(filme_id=ids[i], similar_id=ids[coluna], posicao=posicao, pontuacao=round(valor, 6))
+        for i, lista in zip(linhas, vizinhos)
+        for posicao, (coluna, valor) in enumerate(lista)
+    ]
+    with transaction.atomic():
+        FilmeSimilar.objects.filter(filme_id__in=filmes).delete()
+        FilmeSimilar.objects.bulk_create(novos, batch_size=1000)
+        # Trava as linhas: ninguém muda o filme entre conferir e limpar
+        atuais = (
+            Movie.objects.select_for_update()
+            .filter(pk__in=[f for f in filmes if f in versoes])
+            .values_list('id', 'updated_at')
+        )
+        em_dia = [movie_id for movie_id, updated_at in atuais if updated_at == versoes[movie_id]]
+        Movie.objects.filter(pk__in=em_dia).update(similares_desatualizados=False)
+        invalidar(filmes)
@@ -0,0 +1,84 @@
+"""
+MOVIES/TEXTO.PY - Normalização de texto em português
+
+PESSOA 1 EXPLICA:
+- dobrar(): tira acentos e deixa minúsculo ("Ação" → "acao")
+- palavras(): quebra o texto em palavras já normalizadas
+- radical(): stemmer leve de português ("ações" → "acao", "filmes" → "film")
+
+Usado pela busca (índice e consulta passam pelo MESMO tratamento)
+"""
+
+import re
+import unicodedata
+
+PALAVRA_RE = re.compile(r'\w+')
+
+# (sufixo, substituição) - plural, testados em ordem
+PLURAIS = [
+    ('oes', 'ao'),   # ações → acao
+    ('aes', 'ao'),   # pães → pao
+    ('ais', 'al'),   # animais → animal
+    ('eis', 'el'),   # papéis → papel
+    ('ois', 'ol'),   # lençóis → lencol
+    ('ns', 'm'),     # homens → homem
+    ('res', 'r'),    # flores → flor
+    ('zes', 'z'),    # vezes → vez
+    ('les', 'l'),    # males → mal
+    ('s', ''),       # filmes → filme
+]
+
+# Diminutivos, aumentativos, advérbios e terminações de gênero/número
+SUFIXOS = [
+    'zinhos', 'zinhas', 'zinho', 'zinha',
+    'inhos', 'inhas', 'inho', 'inha',
+    'issimo', 'issima',
+    'mente',
+    'a', 'e', 'o',
+]
+
+
+def dobrar(texto):
+    """
+    Remove acentos e converte para minúsculas
+    """
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acento = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return sem_acento.casefold()
+
+
+def palavras(texto):
+    return PALAVRA_RE.findall(dobrar(texto))
+
+
+def radical(palavra):
+    """
+    Stemmer leve (inspirado no RSLP) para palavras já "dobradas"
+
+    Não precisa ser perfeito: o importante é que "acao",
+    "acoes" e "Ação" caiam no mesmo radical
+    """
+    if len(palavra) <= 3 or palavra.isdigit():
+        return palavra
+
+    for sufixo, troca in PLURAIS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 2:
+            if sufixo == 's' and palavra.endswith(('ss', 'us', 'is')):
+                break
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+
+    for sufixo in SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 3:
+            return palavra[:-len(sufixo)]
+
+    return palavra
+
+
+def radicais(texto):
+    """
+    Texto → lista de radicais (para indexar ou buscar)
+    """
+    return [radical(p) for p in palavras(texto)]
@@ -9,10 +9,18 @@ from django.urls import path
 from .views import (
     MovieListView,
     MovieDetailView,
+    MovieSimilarView,
     MovieSearchView,
+    MovieAutocompleteView,
     MovieByGenreView,
     MovieByYearView,
+    MovieBatchView,
+    MovieFacetsView,
+    MovieTopRatedView,
+    MovieTrendingView,
     MovieCreateView,
+    MovieMediaView,
+    CacheStatsView,
 )
 
 urlpatterns = [
@@ -25,10 +33,18 @@ urlpatterns = [
     # Exemplo: /api/movies/1/
     path('<int:pk>/', MovieDetailView.as_view(), name='movie-detail'),
     
+    # GET /api/movies/{id}/similar/
+    # Filmes parecidos (pré-calculados)
+    path('<int:pk>/similar/', MovieSimilarView.as_view(), name='movie-similar'),
+    
     # GET /api/movies/search/?q=matrix
     # Busca filmes por termo
     path('search/', MovieSearchView.as_view(), name='movie-search'),
     
+    # GET /api/movies/autocomplete/?q=matr
+    # Sugestões enquanto digita (índice em memória, sem banco)
+    path('autocomplete/', MovieAutocompleteView.as_view(), name='movie-autocomplete'),
+    
     # GET /api/movies/genre/Ação/
     # Filtra por gênero
     path('genre/<str:genero>/', MovieByGenreView.as_view(), name='movie-by-genre'),
@@ -37,7 +53,31 @@ urlpatterns = [
     # Filtra por ano
     path('year/<int:ano>/', MovieByYearView.as_view(), name='movie-by-year'),
     
+    # GET /api/movies/top-rated/
+    # Mais bem avaliados (nota bayesiana)
+    path('top-rated/', MovieTopRatedView.as_view(), name='movie-top-rated'),
+    
+    # GET /api/movies/trending/
+    # Em alta (reviews recentes)
+    path('trending/', MovieTrendingView.as_view(), name='movie-trending'),
+    
+    # GET /api/movies/facets/
+    # Totais por gênero/década/nota (barra de filtros)
+    path('facets/', MovieFacetsView.as_view(), name='movie-facets'),
+    
+    # GET /api/movies/batch/?ids=1,5,9
+    # Vários filmes numa requisição só (na ordem pedida)
+    path('batch/', MovieBatchView.as_view(), name='movie-batch'),
+    
     # POST /api/movies/create/
     # Cria novo filme
     path('create/', MovieCreateView.as_view(), name='movie-create'),
+    
+    # GET /api/movies/media/{hash}.jpg
+    # Imagens (poster/backdrop) com cache imutável
+    path('media/<str:nome>', MovieMediaView.as_view(), name='movie-media'),
+    
+    # GET /api/movies/cache/stats/
+    # Hits/misses do cache de respostas
+    path('cache/stats/', CacheStatsView.as_view(), name='movie-cache-stats'),
 ]
\ No newline at end of file
@@ -9,31 +9,135 @@ Fluxo:
 4. View retorna JSON
 """
 
+from django.conf import settings
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.views import View
 
-from .models import Movie
-from .serializers import MovieSerializer, MovieListSerializer, MovieCreateSerializer
+from config.campos import CamposEsparsosMixin, projetar
+from config.metricas import autorizado as metricas_autorizado
+from . import autocomplete
+from .cache import estatisticas, resposta_em_cache
+from .condicional import condicional_catalogo, condicional_filme
+from .models import FilmeSimilar, Movie
+from .search import get_backend
+from .filtros import facetas, filtrar
+from . import media
+from .serializers import (
+    MovieSerializer, MovieListSerializer, MovieRankingSerializer, MovieCreateSerializer,
+    FilmeSimilarSerializer,
+)
 
 
-class MovieListView(generics.ListAPIView):
+class MovieListView(CamposEsparsosMixin, generics.ListAPIView):
     """
     GET /api/movies/
+    GET /api/movies/?genero=acao&ano_min=1990&ano_max=1999&nota_min=4&ordering=-nota_media
     
-    Lista todos os filmes com paginação automática
+    Lista os filmes com filtros e paginação automática
     
     EXPLICAÇÃO:
     - queryset: define quais filmes buscar (todos)
     - serializer_class: define como converter em JSON
     - DRF faz tudo automaticamente (paginação, JSON, etc)
+    - Filtros (todos opcionais, ver movies/filtros.py):
+        genero   → ignora acentos e maiúsculas ("acao" acha "Ação")
+        ano_min, ano_max, nota_min
+    - ordering: um de ORDENACOES (padrão: mais recentes primeiro)
+    - Cada filtro + ordenação tem um índice composto (ver models.py):
+      uma consulta por página, lida direto do índice
+    - Só lê do banco as colunas que o serializer usa
+      (?fields=id,titulo escolhe ainda menos)
+    - Resposta guardada em cache até o catálogo mudar
+    - ETag: se nada mudou, responde 304 sem corpo
     """
     queryset = Movie.objects.all()
     serializer_class = MovieListSerializer
+    
+    # ?ordering= → ordenação completa (o id desempata no fim)
+    ORDENACOES = {
+        '-ano': ['-ano', 'titulo', 'id'],
+        'ano': ['ano', 'id'],
+        '-nota_media': ['-nota_media', '-id'],
+        'nota_media': ['nota_media', 'id'],
+        'titulo': ['titulo', 'id'],
+        '-titulo': ['-titulo', '-id'],
+    }
+    ORDENACAO_PADRAO = '-ano'
+    
+    @condicional_catalogo
+    @resposta_em_cache()
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def get_filtros(self):
+        """
+        Parâmetros de filtro (as rotas antigas completam com a URL)
+        """
+        return self.request.query_params
+    
+    def get_ordering(self):
+        ordering = self.request.query_params.get('ordering') or self.ORDENACAO_PADRAO
+        if ordering not in self.ORDENACOES:
+            raise ValidationError({
+                'ordering': f'Use um de: {", ".join(self.ORDENACOES)}'
+            })
+        return self.ORDENACOES[ordering]
+    
+    def get_queryset(self):
+        # Filtros em movies/filtros.py (os mesmos das facetas)
+        return filtrar(super().get_queryset(), self.get_filtros())
+
+
+class MovieTopRatedView(MovieListView):
+    """
+    GET /api/movies/top-rated/
+    
+    Filmes mais bem avaliados (nota bayesiana, ver ParametrosRanking)
+    
+    EXPLICAÇÃO:
+    - Uma review nota 5 não passa 500 reviews nota 4.8
+    - Só filmes com pelo menos uma avaliação
+    - Leitura direto do índice (nota_bayesiana, id): nada de
+      agregar as reviews na hora
+    - Aceita os filtros da lista (genero, ano_min, ...)
+    """
+    serializer_class = MovieRankingSerializer
+    
+    def get_ordering(self):
+        return ['-nota_bayesiana', '-id']
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(total_avaliacoes__gt=0)
 
 
-class MovieDetailView(generics.RetrieveAPIView):
+class MovieTrendingView(MovieListView):
+    """
+    GET /api/movies/trending/
+    
+    Filmes em alta: mais reviews recentes (a review perde metade
+    do peso a cada RANKING_MEIA_VIDA_HORAS)
+    
+    EXPLICAÇÃO:
+    - A pontuação é atualizada a cada review (sem agregar na hora)
+    - Leitura direto do índice (tendencia, id)
+    - Filmes sem review recente não aparecem
+    """
+    serializer_class = MovieRankingSerializer
+    
+    def get_ordering(self):
+        return ['-tendencia', '-id']
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(tendencia__gt=0)
+
+
+class MovieDetailView(CamposEsparsosMixin, generics.RetrieveAPIView):
     """
     GET /api/movies/{id}/
     
@@ -42,13 +146,50 @@ class MovieDetailView(generics.RetrieveAPIView):
     EXPLICAÇÃO:
     - O {id} vem da URL
     - Django busca o filme automaticamente
-    - Retorna com todas as informações
+    - Retorna com todas as informações (ou só as de ?fields=)
+    - Resposta em cache até o filme (ou suas reviews) mudar
+    - ETag/Last-Modified: se nada mudou, responde 304 sem corpo
     """
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
+    
+    @condicional_filme()
+    @resposta_em_cache(escopo='filme')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
-class MovieSearchView(APIView):
+class MovieSimilarView(APIView):
+    """
+    GET /api/movies/{id}/similar/
+    
+    Filmes parecidos com este (gênero, elenco e quem avaliou)
+    
+    EXPLICAÇÃO:
+    - Os vizinhos são pré-calculados (comando calcular_similares)
+    - Aqui é só uma leitura pelo índice (filme, posicao), com os
+      dados dos filmes no mesmo SELECT
+    - Resposta em cache pela geração do catálogo: muda quando este
+      filme, um VIZINHO (título, poster...) ou os similares mudam
+    """
+    
+    @resposta_em_cache()
+    def get(self, request, pk):
+        similares = (
+            FilmeSimilar.objects.filter(filme_id=pk)
+            .select_related('similar')
+            .order_by('posicao')
+        )
+        dados = FilmeSimilarSerializer(similares, many=True, context={'request': request}).data
+        
+        # Sem vizinhos: o filme existe? (ainda não calculado → lista vazia)
+        if not dados and not Movie.objects.filter(pk=pk).exists():
+            raise Http404('Filme não encontrado')
+        
+        return Response({'filme': pk, 'results': dados})
+
+
+class MovieSearchView(CamposEsparsosMixin, generics.ListAPIView):
     """
     GET /api/movies/search/?q=matrix
     
@@ -56,37 +197,56 @@ class MovieSearchView(APIView):
     
     EXPLICAÇÃO:
     - Pega o parâmetro 'q' da URL (?q=matrix)
-    - Busca no título E na sinopse
-    - Retorna lista de filmes encontrados
+    - Usa o índice de texto completo (ver movies/search.py)
+    - Ignora acentos: "acao" encontra "Ação"
+    - Resultados ordenados por relevância (título vale mais)
+    - Paginado por número de página (a ordem por relevância
+      não serve para cursor)
     """
+    serializer_class = MovieListSerializer
+    pagination_class = PageNumberPagination
     
-    def get(self, request):
-        # Pega o termo de busca da URL
-        query = request.GET.get('q', '').strip()
-        
+    def get_queryset(self):
+        query = self.request.GET.get('q', '').strip()
+        return get_backend().buscar(Movie.objects.all(), query)
+    
+    def list(self, request, *args, **kwargs):
         # Se não tem nada, retorna erro
-        if not query:
+        if not request.GET.get('q', '').strip():
             return Response({
                 'error': 'Parâmetro "q" é obrigatório'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Busca filmes (case-insensitive)
-        # Q permite fazer OR (OU) entre condições
-        # icontains = "contém" (ignora maiúsculas/minúsculas)
-        movies = Movie.objects.filter(
-            Q(titulo__icontains=query) | Q(sinopse__icontains=query)
-        )
-        
-        # Serializa os resultados
-        serializer = MovieListSerializer(movies, many=True)
+        return super().list(request, *args, **kwargs)
+
+
+class MovieAutocompleteView(APIView):
+    """
+    GET /api/movies/autocomplete/?q=matr
+    GET /api/movies/autocomplete/?q=keanu&limite=5
+    
+    Sugestões para a caixa de busca (filmes e pessoas do elenco)
+    
+    EXPLICAÇÃO:
+    - Responde do índice em memória do worker (movies/autocomplete.py):
+      nenhuma consulta ao banco por tecla
+    - Ignora acentos e casa com o começo de qualquer palavra
+      ("chef" acha "O Poderoso Chefão")
+    - Os mais populares primeiro
+    """
+    
+    def get(self, request):
+        texto = request.GET.get('q', '')
+        try:
+            limite = int(request.GET.get('limite', autocomplete.LIMITE_PADRAO))
+        except ValueError:
+            raise ValidationError({'limite': 'Deve ser um número inteiro'})
+        limite = max(1, min(limite, autocomplete.LIMITE_MAXIMO))
         
-        return Response({
-            'count': movies.count(),
-            'results': serializer.data
-        })
+        return Response({'q': texto, 'results': autocomplete.sugerir(texto, limite)})
 
 
-class MovieByGenreView(APIView):
+class MovieByGenreView(MovieListView):
     """
     GET /api/movies/genre/{genero}/
     
@@ -94,60 +254,122 @@ class MovieByGenreView(APIView):
     Exemplo: /api/movies/genre/Ação/
     
     EXPLICAÇÃO:
-    - {genero} vem da URL
-    - Busca todos os filmes desse gênero
+    - Atalho para /api/movies/?genero={genero}
+      (mesmos filtros, ordenação e paginação da lista)
+    - 404 se o gênero não tem nenhum filme
     """
     
-    def get(self, request, genero):
-        # Busca filmes (case-insensitive)
-        movies = Movie.objects.filter(genero__iexact=genero)
+    def get_filtros(self):
+        return {**self.request.query_params.dict(), 'genero': self.kwargs['genero']}
+    
+    def list(self, request, *args, **kwargs):
+        genero = self.kwargs['genero']
+        response = super().list(request, *args, **kwargs)
         
         # Se não encontrou nenhum
-        if not movies.exists():
+        if not response.data['results'] and 'cursor' not in request.query_params:
             return Response({
                 'error': f'Nenhum filme encontrado no gênero "{genero}"'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        serializer = MovieListSerializer(movies, many=True)
-        
-        return Response({
-            'genero': genero,
-            'count': movies.count(),
-            'results': serializer.data
-        })
+        return Response({'genero': genero, **response.data})
 
 
-class MovieByYearView(APIView):
+class MovieByYearView(MovieListView):
     """
     GET /api/movies/year/{ano}/
     
     Filtra filmes por ano
     Exemplo: /api/movies/year/2023/
+    
+    Atalho para /api/movies/?ano_min={ano}&ano_max={ano}
+    """
+    
+    def get_filtros(self):
+        ano = self.kwargs['ano']
+        return {**self.request.query_params.dict(), 'ano_min': ano, 'ano_max': ano}
+    
+    def list(self, request, *args, **kwargs):
+        ano = self.kwargs['ano']
+        response = super().list(request, *args, **kwargs)
+        
+        if not response.data['results'] and 'cursor' not in request.query_params:
+            return Response({
+                'error': f'Nenhum filme encontrado no ano {ano}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({'ano': ano, **response.data})
+
+
+class MovieFacetsView(APIView):
     """
+    GET /api/movies/facets/
+    GET /api/movies/facets/?genero=acao&nota_min=4
+    
+    Quantos filmes existem por gênero, década e nota
+    (para montar a barra de filtros numa requisição só)
+    
+    EXPLICAÇÃO:
+    - Aceita os mesmos filtros da lista (movies/filtros.py)
+    - Cada faceta ignora o próprio filtro: com ?genero=acao,
+      os outros gêneros continuam aparecendo com seus totais
+    - Uma consulta só (UNION ALL de três GROUP BY)
+    - Resposta em cache até o catálogo mudar; ETag → 304
+    """
+    
+    @condicional_catalogo
+    @resposta_em_cache()
+    def get(self, request):
+        return Response(facetas(request.query_params))
+
+
+class MovieBatchView(APIView):
+    """
+    GET /api/movies/batch/?ids=1,5,9&fields=id,titulo,poster
+    
+    Vários filmes de uma vez (ex.: um "trilho" de cards na home)
+    
+    EXPLICAÇÃO:
+    - Uma requisição e UMA consulta no lugar de uma por card
+    - Os filmes voltam na ordem em que os ids foram pedidos
+    - ids repetidos aparecem uma vez só
+    - Ids que não existem vão em "nao_encontrados"
+    - fields= (opcional) escolhe os campos de cada filme
+    - Máximo de MAX_IDS ids por requisição
+    """
+    
+    MAX_IDS = getattr(settings, 'MOVIES_BATCH_MAX_IDS', 100)
     
-    def get(self, request, ano):
-        # Tenta converter ano para número
+    @condicional_catalogo
+    @resposta_em_cache()
+    def get(self, request):
         try:
-            ano = int(ano)
+            ids = [int(i) for i in request.GET.get('ids', '').split(',') if i.strip()]
         except ValueError:
             return Response({
-                'error': 'Ano inválido'
+                'error': 'Parâmetro "ids" deve ser uma lista de números separados por vírgula'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Busca filmes desse ano
-        movies = Movie.objects.filter(ano=ano)
+        if not ids:
+            return Response({
+                'error': 'Parâmetro "ids" é obrigatório'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        if not movies.exists():
+        # Remove repetidos mantendo a ordem pedida
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.MAX_IDS:
             return Response({
-                'error': f'Nenhum filme encontrado no ano {ano}'
-            }, status=status.HTTP_404_NOT_FOUND)
+                'error': f'Máximo de {self.MAX_IDS} ids por requisição'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = MovieListSerializer(movies, many=True)
+        # fields= escolhe os campos do JSON e as colunas lidas
+        serializer = MovieSerializer(many=True, context={'request': request})
+        encontrados = projetar(Movie.objects.all(), serializer.child).in_bulk(ids)
+        serializer.instance = [encontrados[i] for i in ids if i in encontrados]
         
         return Response({
-            'ano': ano,
-            'count': movies.count(),
-            'results': serializer.data
+            'results': serializer.data,
+            'nao_encontrados': [i for i in ids if i not in encontrados],
         })
 
 
@@ -163,4 +385,57 @@ class MovieCreateView(generics.CreateAPIView):
     - Salva no banco
     """
     queryset = Movie.objects.all()
-    serializer_class = MovieCreateSerializer
\ No newline at end of file
+    serializer_class = MovieCreateSerializer
+
+
+class MovieMediaView(View):
+    """
+    GET /api/movies/media/{hash}.{ext}
+    
+    Serve as imagens (poster/backdrop) salvas em disco
+    
+    EXPLICAÇÃO:
+    - O nome do arquivo é o hash do conteúdo, então ele NUNCA muda
+    - Por isso o cache pode ser "immutable" (1 ano)
+    - ETag = hash: se o navegador já tem a imagem, responde 304 sem corpo
+    """
+    
+    CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    
+    def get(self, request, nome):
+        if not media.eh_referencia(nome):
+            raise Http404('Imagem não encontrada')
+        
+        etag = '"%s"' % nome.split('.')[0]
+        
+        # Navegador já tem essa imagem
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (etag in parse_etags(if_none_match) or '*' in if_none_match):
+            response = HttpResponseNotModified()
+        else:
+            try:
+                arquivo = media.abrir(nome)
+            except FileNotFoundError:
+                raise Http404('Imagem não encontrada')
+            response = FileResponse(arquivo, content_type=media.content_type(nome))
+        
+        response['ETag'] = etag
+        response['Cache-Control'] = self.CACHE_CONTROL
+        return response
+
+
+class CacheStatsView(APIView):
+    """
+    GET /api/movies/cache/stats/
+    
+    Contadores do cache de respostas (hits, misses, hit_ratio)
+    
+    EXPLICAÇÃO:
+    - Mesma proteção do /metrics: com METRICAS_TOKEN definido,
+      exige "Authorization: Bearer <token>"
+    """
+    
+    def get(self, request):
+        if not metricas_autorizado(request):
+            return Response({'detail': 'Não autorizado.'}, status=401)
+        return Response(estatisticas())
@@ -0,0 +1,25 @@
+"""
+EXPLICAÇÃO - PESSOA 1:
+Configuração do painel admin para pessoas
+
+Só leitura: as pessoas vêm do elenco dos filmes
+"""
+
+from django.contrib import admin
+from .models import Pessoa
+
+@admin.register(Pessoa)
+class PessoaAdmin(admin.ModelAdmin):
+    """
+    Como as pessoas aparecem no admin
+    """
+    
+    list_display = ['nome']
+    search_fields = ['nome_normalizado']
+    ordering = ['nome_normalizado']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,111 @@
+"""
+PEOPLE/ELENCO.PY - Mantém Pessoa/Participacao iguais ao Movie.elenco
+
+PESSOA 1 EXPLICA:
+- sincronizar(filmes) refaz as participações desses filmes:
+    * nomes novos viram Pessoa (um bulk_create para o lote todo)
+    * participações antigas saem, as novas entram (um DELETE + um INSERT)
+    * quem ficou sem nenhum filme é apagado
+- Chamado pelo sinal post_save do Movie (API, admin, import um a um),
+  só quando o elenco mudou (elenco_mudou), e pelo import_movies --bulk
+  (bulk_* não dispara sinais)
+- Filme apagado: as participações saem em cascata e remover_orfas
+  apaga quem ficou sem filme (ver people/signals.py)
+- A migração usa a mesma função com os models históricos
+"""
+
+from django.db import transaction
+
+from .models import normalizar_nome
+
+# Filmes por rodada (cada rodada = poucas consultas)
+TAMANHO_BLOCO = 500
+
+
+def nomes_do_elenco(elenco):
+    """
+    Movie.elenco → [(nome, nome_normalizado)] na ordem, sem repetidos
+    """
+    if isinstance(elenco, str):
+        elenco = elenco.split(',')
+    vistos = {}
+    for nome in elenco or []:
+        nome = ' '.join(str(nome).split())
+        normalizado = normalizar_nome(nome)
+        if normalizado and normalizado not in vistos:
+            vistos[normalizado] = nome[:255]
+    return [(nome, normalizado) for normalizado, nome in vistos.items()]
+
+
+def elenco_mudou(filme):
+    """
+    As participações gravadas diferem de filme.elenco? (uma consulta)
+
+    Salvar o filme sem mexer no elenco (título, nota...) não refaz nada
+    """
+    from .models import Participacao
+
+    gravado = (
+        Participacao.objects.filter(filme_id=filme.pk)
+        .order_by('ordem')
+        .values_list('pessoa__nome_normalizado', flat=True)
+    )
+    return list(gravado) != [normalizado for _, normalizado in nomes_do_elenco(filme.elenco)]
+
+
+def remover_orfas(pessoa_ids, Pessoa=None):
+    """
+    Apaga, dessas pessoas, as que não estão em mais nenhum filme
+    """
+    if Pessoa is None:
+        from .models import Pessoa
+    if pessoa_ids:
+        Pessoa.objects.filter(pk__in=pessoa_ids, participacoes__isnull=True).delete()
+
+
+def sincronizar(filmes, modelos=None):
+    """
+    Refaz as participações dos filmes (objetos com pk e elenco)
+
+    modelos: (Pessoa, Participacao); a migração passa os históricos
+    """
+    if modelos is None:
+        from .models import Participacao, Pessoa
+    else:
+        Pessoa, Participacao = modelos
+
+    filmes = [filme for filme in filmes if filme.pk is not None]
+    for inicio in range(0, len(filmes), TAMANHO_BLOCO):
+        with transaction.atomic():
+            sincronizar_bloco(filmes[inicio:inicio + TAMANHO_BLOCO], Pessoa, Participacao)
+
+
+def sincronizar_bloco(filmes, Pessoa, Participacao):
+    elencos = {filme.pk: nomes_do_elenco(filme.elenco) for filme in filmes}
+    nomes = {normalizado: nome for elenco in elencos.values() for nome, normalizado in elenco}
+
+    ids = dict(
+        Pessoa.objects.filter(nome_normalizado__in=nomes).values_list('nome_normalizado', 'id')
+    )
+    faltam = [normalizado for normalizado in nomes if normalizado not in ids]
+    if faltam:
+        # ignore_conflicts: outro processo pode ter criado a mesma pessoa
+        Pessoa.objects.bulk_create(
+            [Pessoa(nome=nomes[normalizado], nome_normalizado=normalizado) for normalizado in faltam],
+            ignore_conflicts=True,
+        )
+        ids.update(
+            Pessoa.objects.filter(nome_normalizado__in=faltam).values_list('nome_normalizado', 'id')
+        )
+
+    antigas = Participacao.objects.filter(filme_id__in=elencos)
+    antes = set(antigas.values_list('pessoa_id', flat=True))
+    antigas.delete()
+    Participacao.objects.bulk_create([
+        Participacao(pessoa_id=ids[normalizado], filme_id=filme_id, ordem=ordem)
+        for filme_id, elenco in elencos.items()
+        for ordem, (_, normalizado) in enumerate(elenco)
+    ])
+
+    # Quem saiu do elenco e não está em mais nenhum filme
+    remover_orfas(antes - set(ids.values()), Pessoa)
@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 17:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def preencher_participacoes(apps, schema_editor):
+    """
+    Monta pessoas/participações a partir do elenco dos filmes que já existem
+    """
+    from people.elenco import sincronizar
+
+    Movie = apps.get_model('movies', 'Movie')
+    modelos = (apps.get_model('people', 'Pessoa'), apps.get_model('people', 'Participacao'))
+    bloco = []
+    for movie in Movie.objects.only('id', 'elenco').iterator(chunk_size=500):
+        bloco.append(movie)
+        if len(bloco) == 500:
+            sincronizar(bloco, modelos)
+            bloco = []
+    sincronizar(bloco, modelos)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('movies', '0008_filmes_similares'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Pessoa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255, verbose_name='Nome')),
+                ('nome_normalizado', models.CharField(editable=False, max_length=255, unique=True, verbose_name='Nome (normalizado)')),
+            ],
+            options={
+                'verbose_name': 'Pessoa',
+                'verbose_name_plural': 'Pessoas',
+                'ordering': ['nome_normalizado'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Participacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ordem', models.PositiveSmallIntegerField(default=0, verbose_name='Ordem no elenco')),
+                ('filme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participacoes', to='movies.movie', verbose_name='Filme')),
+                ('pessoa', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='participacoes', to='people.pessoa', verbose_name='Pessoa')),
+            ],
+            options={
+                'verbose_name': 'Participação',
+                'verbose_name_plural': 'Participações',
+                'ordering': ['filme', 'ordem'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='participacao',
+            constraint=models.UniqueConstraint(fields=('pessoa', 'filme'), name='people_participacao_uniq'),
+        ),
+        migrations.RunPython(preencher_participacoes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pessoa',
+            index=models.Index(fields=['nome_normalizado'], name='people_nome_prefixo_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,104 @@
+"""
+PEOPLE/MODELS.PY - Pessoas do elenco
+
+PESSOA 1 EXPLICA:
+- O elenco continua no Movie.elenco (JSON), que é o que a API devolve
+- Só que "em quais filmes o Keanu Reeves aparece?" no JSON exige ler
+  TODAS as linhas de filmes (o banco não indexa dentro da lista)
+- Aqui cada nome vira uma Pessoa (uma linha por pessoa) e cada
+  aparição vira uma Participacao (pessoa, filme): um índice invertido
+- Pessoa.nome_normalizado é o nome sem acento e minúsculo (índice
+  único): "José", "jose" e "JOSÉ" são a mesma pessoa
+- As tabelas são mantidas por people/elenco.py (nunca editar na mão)
+"""
+
+from django.db import models
+
+from movies.texto import dobrar
+
+
+def normalizar_nome(nome):
+    """
+    "  José   Wilker " → "jose wilker"
+    """
+    return ' '.join(dobrar(nome).split())
+
+
+class Pessoa(models.Model):
+    """
+    Uma pessoa do elenco
+    """
+    
+    nome = models.CharField(
+        max_length=255,
+        verbose_name="Nome"
+    )
+    
+    # Preenchido no save() a partir de nome (busca sem acento, por prefixo)
+    nome_normalizado = models.CharField(
+        max_length=255,
+        unique=True,
+        editable=False,
+        verbose_name="Nome (normalizado)"
+    )
+    
+    class Meta:
+        verbose_name = "Pessoa"
+        verbose_name_plural = "Pessoas"
+        ordering = ['nome_normalizado']
+        indexes = [
+            # Busca por prefixo (LIKE 'jose%') no PostgreSQL: o índice
+            # único segue a collation do banco e não serve para LIKE
+            # (nos outros bancos é um índice comum)
+            models.Index(
+                fields=['nome_normalizado'],
+                name='people_nome_prefixo_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+        ]
+    
+    def __str__(self):
+        return self.nome
+    
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome(self.nome)
+        super().save(*args, **kwargs)
+
+
+class Participacao(models.Model):
+    """
+    Pessoa X aparece no filme Y (na posição "ordem" do elenco)
+    """
+    
+    # Sem índice próprio: o índice único (pessoa, filme) já começa por pessoa
+    pessoa = models.ForeignKey(
+        Pessoa,
+        on_delete=models.CASCADE,
+        related_name='participacoes',
+        db_index=False,
+        verbose_name="Pessoa"
+    )
+    
+    filme = models.ForeignKey(
+        'movies.Movie',
+        on_delete=models.CASCADE,
+        related_name='participacoes',
+        verbose_name="Filme"
+    )
+    
+    ordem = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Ordem no elenco"
+    )
+    
+    class Meta:
+        verbose_name = "Participação"
+        verbose_name_plural = "Participações"
+        ordering = ['filme', 'ordem']
+        constraints = [
+            # "Filmes desta pessoa" = leitura deste índice
+            models.UniqueConstraint(fields=['pessoa', 'filme'], name='people_participacao_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.pessoa} em {self.filme_id}"
@@ -0,0 +1,21 @@
+"""
+EXPLICAÇÃO - PESSOA 2:
+Converte Pessoa em JSON
+"""
+
+from rest_framework import serializers
+
+from config.instrumentacao import SerializacaoMedidaMixin
+from config.serializacao import ListaRapidaSerializer
+from .models import Pessoa
+
+
+class PessoaSerializer(SerializacaoMedidaMixin, serializers.ModelSerializer):
+    """
+    Pessoa do elenco: só id e nome
+    """
+    
+    class Meta:
+        model = Pessoa
+        list_serializer_class = ListaRapidaSerializer
+        fields = ['id', 'nome']
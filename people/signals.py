@@ -0,0 +1,40 @@
+"""
+EXPLICAÇÃO - PESSOA 1:
+Sinais das pessoas
+
+Quando um filme é salvo (API, admin, import um a um) com o elenco
+diferente do gravado, refaz as participações dele (ver people/elenco.py)
+
+Quando um filme é apagado, apaga as pessoas que só estavam nele
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from movies.models import Movie
+from .elenco import elenco_mudou, remover_orfas, sincronizar
+from .models import Participacao
+
+
+@receiver(post_save, sender=Movie)
+def sincronizar_elenco(sender, instance, update_fields=None, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and 'elenco' not in update_fields:
+        return
+    if not created and not elenco_mudou(instance):
+        return
+    sincronizar([instance])
+
+
+@receiver(pre_delete, sender=Movie)
+def guardar_elenco(sender, instance, **kwargs):
+    # Depois do DELETE as participações já saíram (cascata)
+    instance._pessoas_do_elenco = list(
+        Participacao.objects.filter(filme_id=instance.pk).values_list('pessoa_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Movie)
+def remover_pessoas_sem_filme(sender, instance, **kwargs):
+    remover_orfas(getattr(instance, '_pessoas_do_elenco', None))
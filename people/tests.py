@@ -0,0 +1,129 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from movies.models import Movie
+from .models import Participacao, Pessoa
+from .views import filtro_prefixo
+
+
+def criar_filme(titulo, elenco, ano=2000):
+    return Movie.objects.create(
+        titulo=titulo, ano=ano, genero='Drama', elenco=elenco,
+        sinopse='...', poster='https://exemplo.com/p.jpg',
+    )
+
+
+class PessoasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.matrix = criar_filme('Matrix', ['Keanu Reeves', 'Carrie-Anne Moss'], ano=1999)
+        self.wick = criar_filme('John Wick', ['Keanu Reeves', 'Willem Dafoe'], ano=2014)
+        self.central = criar_filme('Central do Brasil', ['Fernanda Montenegro', 'José Wilker'])
+
+    def test_elenco_vira_pessoas_e_participacoes(self):
+        keanu = Pessoa.objects.get(nome='Keanu Reeves')
+        self.assertEqual(keanu.participacoes.count(), 2)
+        self.assertEqual(Pessoa.objects.count(), 5)
+        self.assertEqual(
+            list(self.matrix.participacoes.values_list('pessoa__nome', flat=True)),
+            ['Keanu Reeves', 'Carrie-Anne Moss'],
+        )
+
+    def test_trocar_elenco_remove_quem_saiu(self):
+        self.wick.elenco = ['Keanu Reeves', 'Ian McShane']
+        self.wick.save()
+
+        self.assertFalse(Pessoa.objects.filter(nome='Willem Dafoe').exists())
+        self.assertTrue(Pessoa.objects.filter(nome='Ian McShane').exists())
+        self.assertEqual(Pessoa.objects.get(nome='Keanu Reeves').participacoes.count(), 2)
+
+    def test_salvar_sem_mudar_elenco_nao_refaz(self):
+        self.matrix.titulo = 'The Matrix'
+        with CaptureQueriesContext(connection) as consultas:
+            self.matrix.save()
+        tabelas = ' '.join(q['sql'] for q in consultas.captured_queries)
+        self.assertNotIn('DELETE FROM "people_participacao"', tabelas)
+        self.assertNotIn('INSERT INTO "people_participacao"', tabelas)
+
+        # Mesmo elenco com outra grafia: nada muda
+        self.matrix.elenco = ['KEANU  REEVES', 'Carrie-Anne Moss']
+        self.matrix.save()
+        self.assertEqual(Pessoa.objects.get(nome_normalizado='keanu reeves').nome, 'Keanu Reeves')
+
+        # Ordem trocada: refaz
+        self.matrix.elenco = ['Carrie-Anne Moss', 'Keanu Reeves']
+        self.matrix.save()
+        self.assertEqual(
+            list(self.matrix.participacoes.values_list('pessoa__nome', flat=True)),
+            ['Carrie-Anne Moss', 'Keanu Reeves'],
+        )
+
+    def test_apagar_filme_remove_quem_ficou_sem_filme(self):
+        self.wick.delete()
+        self.assertFalse(Pessoa.objects.filter(nome='Willem Dafoe').exists())
+        self.assertEqual(Pessoa.objects.get(nome='Keanu Reeves').participacoes.count(), 1)
+
+        Movie.objects.filter(pk=self.central.pk).delete()
+        self.assertEqual(set(Pessoa.objects.values_list('nome', flat=True)), {'Keanu Reeves', 'Carrie-Anne Moss'})
+
+    def test_elenco_da_api_nao_muda(self):
+        response = self.client.get(reverse('movie-detail', args=[self.matrix.pk]))
+        self.assertEqual(response.data['elenco'], ['Keanu Reeves', 'Carrie-Anne Moss'])
+
+    def test_busca_por_prefixo_sem_acento(self):
+        response = self.client.get(reverse('people-list'), {'q': 'JOSE'})
+        self.assertEqual([p['nome'] for p in response.data['results']], ['José Wilker'])
+
+        response = self.client.get(reverse('people-list'), {'q': 'k'})
+        self.assertEqual([p['nome'] for p in response.data['results']], ['Keanu Reeves'])
+
+    def test_filmes_da_pessoa(self):
+        keanu = Pessoa.objects.get(nome='Keanu Reeves')
+        response = self.client.get(reverse('people-movies', args=[keanu.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pessoa'], {'id': keanu.pk, 'nome': 'Keanu Reeves'})
+        self.assertEqual([f['titulo'] for f in response.data['results']], ['John Wick', 'Matrix'])
+
+        self.assertEqual(self.client.get(reverse('people-movies', args=[99999])).status_code, 404)
+
+    def test_consultas_usam_indices(self):
+        if connection.vendor != 'sqlite':
+            return
+        keanu = Pessoa.objects.get(nome='Keanu Reeves')
+        plano = Movie.objects.filter(participacoes__pessoa_id=keanu.pk).explain()
+        # Índice único (pessoa, filme) → filmes pela chave primária
+        self.assertIn('SEARCH people_participacao USING COVERING INDEX', plano)
+        self.assertNotIn('SCAN movies_movie', plano)
+
+        plano = Pessoa.objects.filter(filtro_prefixo('kea')).explain()
+        self.assertIn('SEARCH', plano)
+
+    def test_prefixo_fora_do_sqlite_usa_like(self):
+        # Intervalo só vale com comparação caractere a caractere
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertEqual(filtro_prefixo('jose'), Q(nome_normalizado__startswith='jose'))
+        self.assertEqual(
+            list(Pessoa.objects.filter(Q(nome_normalizado__startswith='ke')).values_list('nome', flat=True)),
+            ['Keanu Reeves'],
+        )
+
+    def test_import_bulk_preenche_pessoas(self):
+        Movie.objects.all().delete()
+        Pessoa.objects.all().delete()
+        call_command('import_movies', '--bulk', stdout=StringIO())
+
+        self.assertTrue(Participacao.objects.filter(pessoa__nome='Cillian Murphy').exists())
+        self.assertEqual(
+            Participacao.objects.count(),
+            sum(len(elenco) for elenco in Movie.objects.values_list('elenco', flat=True)),
+        )
@@ -0,0 +1,19 @@
+"""
+EXPLICAÇÃO - PESSOA 2:
+Define as rotas do app de pessoas (elenco)
+
+Todas começam com /api/people/
+"""
+
+from django.urls import path
+from .views import PessoaFilmesView, PessoaListView
+
+urlpatterns = [
+    # GET /api/people/?q=keanu
+    # Busca pessoas pelo começo do nome (sem acento)
+    path('', PessoaListView.as_view(), name='people-list'),
+    
+    # GET /api/people/{id}/movies/
+    # Filmes da pessoa
+    path('<int:pk>/movies/', PessoaFilmesView.as_view(), name='people-movies'),
+]
@@ -0,0 +1,93 @@
+"""
+EXPLICAÇÃO - PESSOA 2:
+Views das pessoas do elenco
+
+- /api/people/?q=keanu → pessoas cujo nome começa com "keanu"
+- /api/people/{id}/movies/ → filmes em que a pessoa aparece
+
+Ambas leem índices (nome_normalizado e (pessoa, filme));
+nenhuma varre o JSON do elenco dos filmes
+"""
+
+from django.db import connection
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from rest_framework import generics
+from rest_framework.response import Response
+
+from config.campos import CamposEsparsosMixin
+from movies.cache import resposta_em_cache
+from movies.condicional import condicional_catalogo
+from movies.views import MovieListView
+from .models import Pessoa, normalizar_nome
+from .serializers import PessoaSerializer
+
+# Maior caractere Unicode: "prefixo" <= nome < "prefixo" + FIM
+FIM = '\U0010ffff'
+
+
+def filtro_prefixo(prefixo):
+    """
+    nome_normalizado começa com prefixo
+
+    O intervalo só é certo se o banco compara caractere por caractere
+    (SQLite: collation BINARY, a padrão). PostgreSQL/MySQL ordenam pela
+    collation do idioma ("a" < "B"), e aí vai LIKE 'prefixo%', que lê
+    o índice people_nome_prefixo_idx (varchar_pattern_ops)
+    """
+    if connection.vendor == 'sqlite':
+        return Q(nome_normalizado__gte=prefixo, nome_normalizado__lt=prefixo + FIM)
+    return Q(nome_normalizado__startswith=prefixo)
+
+
+class PessoaListView(CamposEsparsosMixin, generics.ListAPIView):
+    """
+    GET /api/people/
+    GET /api/people/?q=jose
+    
+    EXPLICAÇÃO:
+    - q ignora acentos e maiúsculas ("jose" acha "José Wilker")
+    - Busca por PREFIXO do nome lendo só esse trecho de um índice:
+      no SQLite como intervalo (nome_normalizado >= 'jose' AND
+      < 'jose' + FIM; um LIKE 'jose%' não usa índice sem COLLATE
+      NOCASE), nos outros bancos com LIKE (ver filtro_prefixo)
+    - Ordem alfabética, paginação por cursor
+    - Resposta em cache até o catálogo mudar
+    """
+    queryset = Pessoa.objects.all()
+    serializer_class = PessoaSerializer
+    ordering = ['nome_normalizado']
+    
+    @condicional_catalogo
+    @resposta_em_cache()
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        prefixo = normalizar_nome(self.request.query_params.get('q', ''))
+        if prefixo:
+            queryset = queryset.filter(filtro_prefixo(prefixo))
+        return queryset
+
+
+class PessoaFilmesView(MovieListView):
+    """
+    GET /api/people/{id}/movies/
+    
+    Filmes em que a pessoa aparece
+    
+    EXPLICAÇÃO:
+    - Lê o índice (pessoa, filme) das participações e busca os
+      filmes pela chave primária
+    - Mesmos filtros, ordenação e paginação da lista de filmes
+    - 404 se a pessoa não existe
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(participacoes__pessoa_id=self.kwargs['pk'])
+    
+    def list(self, request, *args, **kwargs):
+        pessoa = get_object_or_404(Pessoa.objects.only('id', 'nome'), pk=self.kwargs['pk'])
+        response = super().list(request, *args, **kwargs)
+        return Response({'pessoa': PessoaSerializer(pessoa).data, **response.data})
@@ -30,4 +30,19 @@ class ReviewAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
     
     # Campos não editáveis
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+    
+    # O filme (coluna "filme" e o __str__ da review) vem no mesmo SELECT
+    list_select_related = ['filme']
+    
+    def get_queryset(self, request):
+        """
+        Do filme, só as colunas do __str__ (titulo, ano):
+        nada de sinopse/elenco/imagens em cada linha
+        """
+        campos_review = [campo.name for campo in Review._meta.concrete_fields]
+        return (
+            super().get_queryset(request)
+            .select_related('filme')
+            .only(*campos_review, 'filme__titulo', 'filme__ano')
+        )
\ No newline at end of file
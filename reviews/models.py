@@ -5,9 +5,11 @@ PESSOA 2 EXPLICA:
 - Review relaciona usuário com filme
 - ForeignKey cria relacionamento Many-to-One
 - Quando salva, atualiza nota média do filme
+  (só soma/subtrai nos contadores, na mesma transação)
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Now
 from movies.models import Movie
 
 class Review(models.Model):
@@ -52,10 +54,46 @@ class Review(models.Model):
         verbose_name = "Avaliação"
         verbose_name_plural = "Avaliações"
         ordering = ['-created_at']
+        indexes = [
+            # Paginação por cursor na ordenação padrão (-created_at, -id)
+            models.Index(fields=['-created_at', '-id'], name='reviews_created_id_idx'),
+            # Reviews de UM filme, mais recentes primeiro, sem ordenar na hora
+            models.Index(fields=['filme', '-created_at', '-id'], name='reviews_filme_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario} - {self.filme.titulo} ({self.nota}⭐)"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.filme.atualizar_nota_media()
\ No newline at end of file
+        with transaction.atomic():
+            anterior = None
+            if not self._state.adding:
+                # Valores antigos (trava a linha até o fim da transação)
+                anterior = (
+                    Review.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('filme_id', 'nota')
+                    .first()
+                )
+            
+            # Filmes cujo cache precisa ser invalidado (ver signals.py)
+            self._filmes_afetados = {self.filme_id}
+            if anterior is not None:
+                self._filmes_afetados.add(anterior[0])
+            
+            super().save(*args, **kwargs)
+            
+            if anterior is None:
+                # Nova avaliação (entra também na tendência)
+                Movie.registrar_avaliacao(self.filme_id, self.nota, 1, self.created_at)
+            elif anterior[0] != self.filme_id:
+                # Trocou de filme: sai de um, entra no outro
+                Movie.registrar_avaliacao(anterior[0], -anterior[1], -1, self.created_at)
+                Movie.registrar_avaliacao(self.filme_id, self.nota, 1, self.created_at)
+            elif anterior[1] != self.nota:
+                # Só mudou a nota
+                Movie.registrar_avaliacao(self.filme_id, self.nota - anterior[1], 0)
+            else:
+                # Só o comentário: contadores iguais, mas o ETag/Last-Modified
+                # do filme (ver movies/condicional.py) precisa mudar
+                Movie.objects.filter(pk=self.filme_id).update(updated_at=Now())
\ No newline at end of file
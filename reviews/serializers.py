@@ -6,13 +6,17 @@ Convertem Review (Python) ←→ JSON (API)
 """
 
 from rest_framework import serializers
+from config.campos import CamposDinamicosMixin
+from config.instrumentacao import SerializacaoMedidaMixin
+from config.serializacao import ListaRapidaSerializer
 from .models import Review
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SerializacaoMedidaMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer completo de avaliação
     
     Usado para listar e exibir avaliações
+    (many=True usa o caminho rápido: ver config/serializacao.py)
     """
     
     # Campos adicionais
@@ -23,6 +27,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Review
+        list_serializer_class = ListaRapidaSerializer
         fields = [
             'id',            # ID da avaliação
             'usuario',       # Nome do usuário
@@ -35,7 +40,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ReviewCreateSerializer(serializers.ModelSerializer):
+class ReviewCreateSerializer(SerializacaoMedidaMixin, serializers.ModelSerializer):
     """
     Serializer para criar avaliação
     
@@ -0,0 +1,43 @@
+"""
+EXPLICAÇÃO - PESSOA 2:
+Sinais das avaliações
+
+Quando uma review é deletada (pela API, pelo admin ou em massa),
+desconta a nota dos contadores do filme (menos quando é o próprio
+filme que está sendo apagado: as reviews saem junto com ele)
+
+Quando uma review é salva ou deletada, invalida o cache
+do filme e das listas (nota_media/total_avaliacoes mudaram)
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from movies.cache import invalidar
+from movies.models import Movie
+from .models import Review
+
+
+def filme_sendo_apagado(origin):
+    """
+    A review sai em cascata porque o próprio filme (ou uma lista
+    de filmes) está sendo apagado?
+    """
+    return isinstance(origin, Movie) or getattr(origin, 'model', None) is Movie
+
+
+@receiver(post_delete, sender=Review)
+def descontar_avaliacao(sender, instance, origin=None, **kwargs):
+    # Filme sendo apagado: nada a descontar (seria um UPDATE por review)
+    if filme_sendo_apagado(origin):
+        return
+    Movie.registrar_avaliacao(instance.filme_id, -instance.nota, -1, instance.created_at)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidar_cache_avaliacao(sender, instance, origin=None, **kwargs):
+    # Filme sendo apagado: o post_delete do filme já invalida
+    if filme_sendo_apagado(origin):
+        return
+    invalidar(getattr(instance, '_filmes_afetados', None) or [instance.filme_id])
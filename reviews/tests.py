@@ -1,3 +1,287 @@
-from django.test import TestCase
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from movies.models import Movie
+from .models import Review
+from .serializers import ReviewSerializer
+
+
+def criar_filme(**kwargs):
+    dados = {
+        'titulo': 'Matrix',
+        'ano': 1999,
+        'genero': 'Ficção',
+        'sinopse': 'Neo',
+        'poster': 'https://exemplo.com/matrix.jpg',
+    }
+    dados.update(kwargs)
+    return Movie.objects.create(**dados)
+
+
+class ContadoresAvaliacaoTests(TestCase):
+
+    def setUp(self):
+        self.filme = criar_filme()
+
+    def assertContadores(self, soma, total, media):
+        self.filme.refresh_from_db()
+        self.assertEqual(self.filme.soma_notas, soma)
+        self.assertEqual(self.filme.total_avaliacoes, total)
+        self.assertEqual(self.filme.nota_media, Decimal(media))
+
+    def test_criar_atualizar_e_deletar(self):
+        r1 = Review.objects.create(usuario='Ana', filme=self.filme, nota=5)
+        Review.objects.create(usuario='Bia', filme=self.filme, nota=4)
+        self.assertContadores(9, 2, '4.5')
+
+        r1.nota = 2
+        r1.save()
+        self.assertContadores(6, 2, '3.0')
+
+        r1.delete()
+        self.assertContadores(4, 1, '4.0')
+
+        Review.objects.all().delete()
+        self.assertContadores(0, 0, '0.0')
+
+    def test_trocar_de_filme(self):
+        outro = criar_filme(titulo='Duna', ano=2021)
+        review = Review.objects.create(usuario='Ana', filme=self.filme, nota=5)
+
+        review.filme = outro
+        review.save()
+
+        self.assertContadores(0, 0, '0.0')
+        outro.refresh_from_db()
+        self.assertEqual((outro.soma_notas, outro.total_avaliacoes), (5, 1))
+
+    def test_escrita_nao_depende_do_total_de_reviews(self):
+        for nota in (1, 2, 3):
+            Review.objects.create(usuario='Ana', filme=self.filme, nota=nota)
+
+        # SAVEPOINT + INSERT + UPDATE dos contadores + RELEASE
+        # (sem AVG sobre todas as reviews)
+        with self.assertNumQueries(4):
+            Review.objects.create(usuario='Bia', filme=self.filme, nota=5)
+
+    def test_save_de_instancia_velha_nao_zera_contadores(self):
+        velho = Movie.objects.get(pk=self.filme.pk)
+        Review.objects.create(usuario='Ana', filme=self.filme, nota=5)
+
+        velho.titulo = 'Matrix Reloaded'
+        velho.save()
+
+        self.assertContadores(5, 1, '5.0')
+        self.filme.refresh_from_db()
+        self.assertEqual(self.filme.titulo, 'Matrix Reloaded')
+        self.assertGreater(self.filme.nota_bayesiana, 0)
+
+    def test_admin_nao_edita_contadores(self):
+        from django.contrib.admin.sites import site
+        readonly = site._registry[Movie].get_readonly_fields(None)
+        self.assertTrue(Movie.CAMPOS_CONTADORES <= set(readonly))
+
+    def test_apagar_filme_nao_atualiza_contador_por_review(self):
+        for i in range(50):
+            Review.objects.create(usuario=f'u{i}', filme=self.filme, nota=1 + i % 5)
+
+        # SELECT das reviews e das pessoas do elenco + DELETEs em lote
+        # (similares, elenco, reviews, filme, índice de busca): nenhum
+        # UPDATE por review
+        with self.assertNumQueries(7):
+            self.filme.delete()
+
+        self.assertFalse(Review.objects.exists())
+
+    def test_api_deletar_desconta(self):
+        review = Review.objects.create(usuario='Ana', filme=self.filme, nota=3)
+
+        response = self.client.delete(reverse('review-delete', kwargs={'pk': review.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContadores(0, 0, '0.0')
+
+    def test_recompute_ratings_corrige_divergencia(self):
+        Review.objects.create(usuario='Ana', filme=self.filme, nota=5)
+        Review.objects.create(usuario='Bia', filme=self.filme, nota=2)
+        Movie.objects.filter(pk=self.filme.pk).update(
+            soma_notas=100, total_avaliacoes=1, nota_media=Decimal('1.0')
+        )
+
+        out = StringIO()
+        call_command('recompute_ratings', stdout=out)
+
+        self.assertIn('1 filmes corrigidos', out.getvalue())
+        self.assertContadores(7, 2, '3.5')
+
+
+class PaginacaoReviewsTests(TestCase):
+
+    def test_cursor_por_data(self):
+        filme = criar_filme()
+        for i in range(25):
+            Review.objects.create(usuario=f'u{i}', filme=filme, nota=1 + i % 5)
+
+        primeira = self.client.get(reverse('review-list')).json()
+        segunda = self.client.get(primeira['next']).json()
+
+        ids = [r['id'] for r in primeira['results'] + segunda['results']]
+        esperado = list(Review.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperado)
+        self.assertIsNone(segunda['next'])
+
+
+class CamposEsparsosReviewsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.filme = criar_filme()
+        Review.objects.create(usuario='Ana', filme=self.filme, nota=4, comentario='Bom')
+
+    def test_fields_nas_reviews(self):
+        response = self.client.get(reverse('review-list'), {'fields': 'id,nota'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nota'})
+
+        url = reverse('movie-reviews', kwargs={'movie_id': self.filme.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'usuario,nota'})
+
+        self.assertEqual(response.data['avaliacoes'], [{'usuario': 'Ana', 'nota': 4}])
+        self.assertNotIn('"comentario"', queries.captured_queries[-1]['sql'])
+
+
+class ListaRapidaReviewsTests(TestCase):
+
+    def test_json_identico_ao_drf(self):
+        filme = criar_filme()
+        Review.objects.create(usuario='Ana', filme=filme, nota=4, comentario='Ótimo')
+        Review.objects.create(usuario='Bia', filme=filme, nota=1)
+
+        queryset = Review.objects.all()
+        esperado = JSONRenderer().render(
+            serializers.ListSerializer(list(queryset), child=ReviewSerializer()).data
+        )
+
+        for dados in (queryset, list(queryset)):
+            self.assertEqual(
+                JSONRenderer().render(ReviewSerializer(dados, many=True).data), esperado
+            )
+
+
+class ReviewsDoFilmeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.filme = criar_filme()
+        self.outro = criar_filme(titulo='Outro')
+        for i in range(25):
+            Review.objects.create(usuario=f'u{i}', filme=self.filme, nota=1 + i % 5)
+        Review.objects.create(usuario='x', filme=self.outro, nota=3)
+        self.url = reverse('movie-reviews', kwargs={'movie_id': self.filme.pk})
+
+    def test_paginado_por_cursor_numa_query(self):
+        # validadores do ETag + página de reviews com o filme (JOIN)
+        with self.assertNumQueries(2):
+            primeira = self.client.get(self.url).json()
+        segunda = self.client.get(primeira['next']).json()
+
+        self.assertEqual(primeira['total_avaliacoes'], 25)
+        self.assertEqual(primeira['filme'], self.filme.titulo)
+        self.assertEqual(len(primeira['avaliacoes']), 20)
+        self.assertIsNone(segunda['next'])
+
+        ids = [r['id'] for r in primeira['avaliacoes'] + segunda['avaliacoes']]
+        esperado = list(
+            self.filme.reviews.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, esperado)
+
+    def test_filme_sem_reviews_e_inexistente(self):
+        sem_reviews = criar_filme(titulo='Vazio')
+        response = self.client.get(reverse('movie-reviews', kwargs={'movie_id': sem_reviews.pk}))
+        self.assertEqual(response.json()['avaliacoes'], [])
+        self.assertEqual(response.json()['filme'], 'Vazio')
+
+        response = self.client.get(reverse('movie-reviews', kwargs={'movie_id': 9999}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_consulta_usa_indice_sem_ordenar(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('plano de consulta do SQLite')
+        reviews = Review.objects.filter(filme_id=self.filme.pk).order_by('-created_at', '-id')[:21]
+        plano = reviews.explain()
+        self.assertIn('reviews_filme_created_idx', plano)
+        self.assertNotIn('TEMP B-TREE', plano)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class SemNMaisUmTests(TestCase):
+    """
+    Listas de reviews: número constante de queries, com só o titulo do filme
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def criar_reviews(self, quantidade):
+        for i in range(quantidade):
+            filme = criar_filme(titulo=f'Filme {Review.objects.count()}')
+            Review.objects.create(usuario=f'u{i}', filme=filme, nota=3)
+
+    def contar_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return ctx.captured_queries
+
+    def test_lista_de_reviews_uma_query_por_pagina(self):
+        self.criar_reviews(20)
+
+        queries = self.contar_queries(reverse('review-list'))
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"movies_movie"."titulo"', queries[0]['sql'])
+        self.assertNotIn('"movies_movie"."sinopse"', queries[0]['sql'])
+
+        response = self.client.get(reverse('review-list'))
+        self.assertEqual(response.json()['results'][0]['filme_titulo'], 'Filme 19')
+
+    def test_detalhe_da_review_uma_query(self):
+        self.criar_reviews(1)
+        review = Review.objects.get()
+
+        queries = self.contar_queries(reverse('review-detail', kwargs={'pk': review.pk}))
+        self.assertEqual(len(queries), 1)
+
+    def test_fields_sem_titulo_nao_faz_join(self):
+        self.criar_reviews(2)
+
+        queries = self.contar_queries(reverse('review-list') + '?fields=id,nota')
+        self.assertNotIn('movies_movie', queries[0]['sql'])
+
+    def test_admin_numero_constante_de_queries(self):
+        admin = User.objects.create_superuser('admin', 'admin@exemplo.com', 'senha')
+        self.client.force_login(admin)
+        url = reverse('admin:reviews_review_changelist')
+
+        self.criar_reviews(3)
+        poucas = self.contar_queries(url)
+
+        self.criar_reviews(15)
+        muitas = self.contar_queries(url)
+
+        self.assertEqual(len(poucas), len(muitas))
+        listagem = [q['sql'] for q in muitas if 'INNER JOIN "movies_movie"' in q['sql']]
+        self.assertTrue(listagem)
+        self.assertNotIn('"movies_movie"."sinopse"', listagem[-1])
@@ -8,12 +8,16 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
+from config.campos import CamposEsparsosMixin, projetar
+from config.pagination import KeysetPagination
 from .models import Review
 from .serializers import ReviewSerializer, ReviewCreateSerializer
+from movies.cache import resposta_em_cache
+from movies.condicional import condicional_filme
 from movies.models import Movie
 
 
-class ReviewListView(generics.ListAPIView):
+class ReviewListView(CamposEsparsosMixin, generics.ListAPIView):
     """
     GET /api/reviews/
     
@@ -22,8 +26,10 @@ class ReviewListView(generics.ListAPIView):
     EXPLICAÇÃO:
     - Busca todas as reviews
     - Paginação automática
+    - select_related: o título do filme vem no mesmo SELECT
+      (só a coluna titulo, não o filme inteiro)
     """
-    queryset = Review.objects.all()
+    queryset = Review.objects.select_related('filme')
     serializer_class = ReviewSerializer
 
 
@@ -70,39 +76,65 @@ class MovieReviewsView(APIView):
     """
     GET /api/reviews/movie/{movie_id}/
     
-    Lista todas as avaliações de UM filme específico
+    Lista as avaliações de UM filme específico, paginadas por cursor
     
     EXPLICAÇÃO:
     - Recebe ID do filme na URL
-    - Busca todas as reviews desse filme
-    - Retorna ordenado por mais recente
+    - Retorna ordenado por mais recente (índice filme + created_at)
+    - Uma consulta só: a página de reviews já traz título, nota média
+      e total do filme (JOIN); o total é o contador salvo no filme
+    - Só consulta o filme sozinho se a página vier vazia (ou 404)
+    - Resposta em cache até o filme (ou suas reviews) mudar
+    - ETag/Last-Modified: se nada mudou, responde 304 sem corpo
     """
     
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
+    
+    # Cabeçalho da resposta (filme_titulo do serializer entra sozinho)
+    CAMPOS_FILME = ['filme__titulo', 'filme__nota_media', 'filme__total_avaliacoes']
+    
+    @condicional_filme(kwarg_filme='movie_id')
+    @resposta_em_cache(escopo='filme', kwarg_filme='movie_id')
     def get(self, request, movie_id):
-        # Busca o filme (retorna 404 se não existir)
-        movie = get_object_or_404(Movie, id=movie_id)
+        # Serializer com os campos pedidos (?fields=)
+        serializer = ReviewSerializer(many=True, context={'request': request})
+        
+        # Página de reviews + colunas do filme no mesmo SELECT
+        reviews = Review.objects.filter(filme_id=movie_id).select_related('filme')
+        reviews = projetar(reviews, serializer.child, self.CAMPOS_FILME)
         
-        # Busca todas as reviews desse filme
-        reviews = Review.objects.filter(filme=movie)
+        paginator = self.pagination_class()
+        pagina = paginator.paginate_queryset(reviews, request, view=self)
         
-        # Serializa
-        serializer = ReviewSerializer(reviews, many=True)
+        if pagina:
+            movie = pagina[0].filme
+        else:
+            # Sem reviews nessa página: busca o filme (retorna 404 se não existir)
+            movie = get_object_or_404(
+                Movie.objects.only('titulo', 'nota_media', 'total_avaliacoes'), id=movie_id
+            )
+        
+        serializer.instance = pagina
+        dados = paginator.get_paginated_response(serializer.data).data
+        avaliacoes = dados.pop('results')
         
         return Response({
             'filme': movie.titulo,
             'nota_media': movie.nota_media,
-            'total_avaliacoes': reviews.count(),
-            'avaliacoes': serializer.data
+            'total_avaliacoes': movie.total_avaliacoes,
+            **dados,
+            'avaliacoes': avaliacoes,
         })
 
 
-class ReviewDetailView(generics.RetrieveAPIView):
+class ReviewDetailView(CamposEsparsosMixin, generics.RetrieveAPIView):
     """
     GET /api/reviews/{id}/
     
     Detalhes de uma avaliação específica
     """
-    queryset = Review.objects.all()
+    queryset = Review.objects.select_related('filme')
     serializer_class = ReviewSerializer
 
 
@@ -115,20 +147,17 @@ class ReviewDeleteView(generics.DestroyAPIView):
     EXPLICAÇÃO:
     - Recebe ID da avaliação
     - Deleta do banco
-    - Recalcula nota média do filme automaticamente
+    - Nota média do filme é atualizada pelo sinal post_delete
+      (na mesma transação do DELETE)
     """
     queryset = Review.objects.all()
     
     def destroy(self, request, *args, **kwargs):
         review = self.get_object()
-        filme = review.filme
         
         # Deleta a review
         self.perform_destroy(review)
         
-        # Recalcula nota média do filme
-        filme.atualizar_nota_media()
-        
         return Response({
             'message': 'Avaliação deletada com sucesso!'
         }, status=status.HTTP_200_OK)
\ No newline at end of file